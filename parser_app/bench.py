@@ -0,0 +1,195 @@
+"""Entrypoint of benchmarks: measures extraction, connector's writes, fetching and parsers on saved pages, served by a
+local stub of habr.com, and reports results as JSON"""
+
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+from pathlib import Path
+from typing import Any
+
+from parser_app.benchmarks.bench_tools import BenchTools
+from parser_app.benchmarks.connector_bench import ConnectorBenchmark
+from parser_app.benchmarks.corpus import Corpus
+from parser_app.benchmarks.extraction_bench import ExtractionBenchmark
+from parser_app.benchmarks.parsers_bench import FetchBenchmark, ParsersBenchmark
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.benchmarks.stub_server import StubProcess
+from parser_app.utils.constants import ENV_FILE_PATH, WRITE_BATCH_SIZE, DB_GROUP_COMMIT_SIZE, HTTP_LIMIT_PER_HOST, \
+    HUB_MAX_PAGES
+from parser_app.utils.env_reader import EnvReader
+from parser_app.utils.env_setter import EnvSetter
+
+
+SUITES = ('extraction', 'connector', 'fetch', 'parsers')
+"""Benchmarks, that can be run"""
+
+BACKENDS = ('html.parser', 'lxml', 'strainer', 'lxml-strainer')
+"""Soup-backends, extraction is measured with by default"""
+
+BENCH_ENV = {'FETCH_RATE': '0'}
+"""Settings, that override .env in benchmarks: the stub is local, so requests to it are not rate-limited"""
+
+
+def parse_args() -> argparse.Namespace:
+    """Reads command-line arguments
+
+    Returns:
+        Arguments"""
+
+    parser = argparse.ArgumentParser(description='Benchmarks of parser-app on saved pages')
+    parser.add_argument('--suites', nargs='+', choices=SUITES, default=list(SUITES), help='Benchmarks to run')
+    parser.add_argument('--output', type=Path, help='File to save results into (printed, if not set)')
+    parser.add_argument('--compare', type=Path, help='Results of a previous run to compare with')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), help='Soup-backends for extraction')
+    parser.add_argument('--repeats', type=int, default=5, help='Times each page is extracted')
+    parser.add_argument('--rows', type=int, default=5000, help='Rows, written by each connector\'s method')
+    parser.add_argument('--batch-size', type=int, help='Rows per write (WRITE_BATCH_SIZE from .env by default)')
+    parser.add_argument('--fetch-pages', type=int, default=500, help='Pages to load without parsing')
+    parser.add_argument('--hubs', type=int, default=5, help='Habrs to parse')
+    parser.add_argument('--articles', type=int, default=300, help='Articles to parse')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds, the stub delays each response for')
+    parser.add_argument('--no-compress', action='store_true', help='Do not compress stub\'s responses')
+    parser.add_argument('--db', type=Path, help='Migrated SQLite-DB to copy (DB_FILE_PATH from .env by default)')
+    parser.add_argument('--set', nargs='+', default=[], metavar='KEY=VALUE', help='Settings to override .env with')
+
+    return parser.parse_args()
+
+
+def set_envs(overrides: list[str]) -> dict[str, str]:
+    """Sets variables from .env, then benchmark's settings, then settings from command-line
+
+    Args:
+        overrides: Settings from command-line in form KEY=VALUE
+    Returns:
+        Settings, that differ from .env"""
+
+    EnvSetter.set_envs(ENV_FILE_PATH)
+
+    changed = dict(BENCH_ENV)
+    for override in overrides:
+        key, _, value = override.partition('=')
+        changed[key] = value
+
+    for key, value in changed.items():
+        os.environ[key] = value
+
+    return changed
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Runs selected benchmarks
+
+    Args:
+        args: Command-line arguments
+    Returns:
+        Results by benchmarks"""
+
+    corpus = Corpus.load()
+    batch_size = args.batch_size or EnvReader.get_int('WRITE_BATCH_SIZE', WRITE_BATCH_SIZE)
+    group_size = EnvReader.get_int('DB_GROUP_COMMIT_SIZE', DB_GROUP_COMMIT_SIZE)
+    results = {}
+
+    if 'extraction' in args.suites:
+        print('Measuring extraction...', file=sys.stderr)
+        results['extraction'] = ExtractionBenchmark(corpus, args.backends, args.repeats).run()
+
+    if 'connector' not in args.suites and 'fetch' not in args.suites and 'parsers' not in args.suites:
+        return results
+
+    scratch = ScratchDB(args.db or Path(os.getenv('DB_FILE_PATH')))
+    stub = StubProcess(HUB_MAX_PAGES, args.latency, not args.no_compress)
+    try:
+        if 'connector' in args.suites or 'parsers' in args.suites:
+            scratch.create()
+
+        if 'connector' in args.suites:
+            print('Measuring connector...', file=sys.stderr)
+            results['connector'] = ConnectorBenchmark(scratch, args.rows, batch_size, group_size).run()
+
+        if 'fetch' in args.suites or 'parsers' in args.suites:
+            base_url = stub.start()
+
+            if 'fetch' in args.suites:
+                print('Measuring fetching...', file=sys.stderr)
+                concurrency = EnvReader.get_int('HTTP_LIMIT_PER_HOST', HTTP_LIMIT_PER_HOST)
+                results['fetch'] = FetchBenchmark(base_url, args.fetch_pages, concurrency).run()
+
+            if 'parsers' in args.suites:
+                print('Measuring parsers...', file=sys.stderr)
+                results['parsers'] = ParsersBenchmark(scratch, base_url, args.hubs, args.articles, group_size).run()
+    finally:
+        stub.stop()
+        scratch.remove()
+
+    return results
+
+
+def compare(baseline: dict[str, Any], results: dict[str, Any]) -> dict[str, dict[str, float]]:
+    """Compares numbers of two runs
+
+    Args:
+        baseline: Results of a previous run
+        results: Results of this run
+    Returns:
+        Baseline's and this run's values and change in percents by paths of numbers (e.g. 'fetch.pages_per_sec')"""
+
+    def flatten(data: dict[str, Any], prefix: str = '') -> dict[str, float]:
+        numbers = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                numbers.update(flatten(value, f'{prefix}{key}.'))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                numbers[f'{prefix}{key}'] = value
+        return numbers
+
+    old = flatten({key: value for key, value in baseline.items() if key not in ('meta', 'comparison')})
+    new = flatten({key: value for key, value in results.items() if key not in ('meta', 'comparison')})
+
+    return {
+        path: {
+            'baseline': old[path],
+            'current': new[path],
+            'change_pct': round((new[path] - old[path]) / old[path] * 100, 1) if old[path] else None
+        }
+        for path in new if path in old
+    }
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    started = time.perf_counter()
+    started_at = datetime.datetime.now()
+    changed_envs = set_envs(args.set)
+
+    # Connectors and parsers print a lot, only results are printed
+    with BenchTools.quiet():
+        results = run(args)
+    report = {
+        'meta': {
+            'started_at': started_at.isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - started, 1),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'max_rss_kb': BenchTools.max_rss_kb(),
+            'corpus': Corpus.load().size(),
+            'arguments': {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+            'changed_settings': changed_envs
+        },
+        **results
+    }
+    if args.compare:
+        report['comparison'] = compare(json.loads(args.compare.read_text(encoding='utf-8')), results)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output, encoding='utf-8')
+        print(f'Results are saved into "{args.output}"', file=sys.stderr)
+    else:
+        print(output)
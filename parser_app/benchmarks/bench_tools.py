@@ -0,0 +1,105 @@
+"""Tools to measure time and memory in benchmarks"""
+
+
+import contextlib
+import os
+import sys
+import tracemalloc
+
+from typing import Any, Callable, Iterator, Optional
+
+
+class BenchTools:
+    """Tools to measure time and memory in benchmarks"""
+
+    @staticmethod
+    def summarize_ms(durations: list[float]) -> dict[str, float]:
+        """Summarizes durations of repeated actions
+
+        Args:
+            durations: Seconds, each action took
+        Returns:
+            Mean, median, 95th percentile and min in milliseconds"""
+
+        ordered = sorted(durations)
+
+        return {
+            'mean': round(sum(ordered) / len(ordered) * 1000, 3),
+            'median': round(ordered[len(ordered) // 2] * 1000, 3),
+            'p95': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 3),
+            'min': round(ordered[0] * 1000, 3)
+        }
+
+    @staticmethod
+    def rate(count: int, seconds: float) -> float:
+        """Counts items per second
+
+        Args:
+            count: Number of items (pages, rows)
+            seconds: Time, they took
+        Returns:
+            Items per second"""
+
+        return round(count / seconds, 1) if seconds else 0.0
+
+    @staticmethod
+    def peak_memory_kb(action: Callable[[], Any]) -> float:
+        """Runs an action and tells, how much memory it took at most (see PeakMemory)
+
+        Args:
+            action: Action to measure
+        Returns:
+            Peak of memory in KB"""
+
+        with PeakMemory() as peak_memory:
+            action()
+
+        return peak_memory.kb
+
+    @staticmethod
+    def max_rss_kb() -> Optional[int]:
+        """Tells, how much memory this process took at most
+
+        Returns:
+            Peak resident set size in KB or None, if OS does not report it (e.g. Windows)"""
+
+        try:
+            import resource
+        except ImportError:
+            return None
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # macOS reports it in bytes, others – in KB
+        return max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+    @staticmethod
+    @contextlib.contextmanager
+    def quiet() -> Iterator[None]:
+        """Sends everything, that is printed (parsers print every page), to nowhere, so speed of a terminal does not
+        affect results and printed pages do not get mixed with them"""
+
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+
+
+class PeakMemory:
+    """Context manager, that traces memory, allocated by Python (in all threads), while it is entered. Tracing makes
+    code slower, so code should not be timed at the same run
+
+    Attributes:
+        kb: Peak of memory in KB, set on exit"""
+
+    def __init__(self):
+        """Init"""
+
+        self.kb: float = 0.0
+
+    def __enter__(self) -> 'PeakMemory':
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.kb = round(peak / 1024, 1)
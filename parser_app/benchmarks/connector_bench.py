@@ -0,0 +1,217 @@
+"""Benchmark of connector's writes"""
+
+
+import concurrent.futures
+import datetime
+import time
+
+from typing import Any, Callable
+
+from parser_app.benchmarks.bench_tools import BenchTools, PeakMemory
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.db_connector.async_connector import AsyncConnector
+from parser_app.db_connector.connector_interface import IConnector
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+
+
+class ConnectorBenchmark:
+    """Measures, how many rows per second SQLiteFromFileConnector writes with each bulk-method, in batches of the same
+    size, parsers write them in. Every method starts with empty tables (bulk_update – with just inserted Articles)
+
+    Attributes:
+        scratch: Copy of DB to write into
+        rows: Number of rows, written by each method
+        batch_size: Number of rows in one call of a method
+        group_size: Max number of calls, committed together by AsyncConnector"""
+
+    def __init__(self, scratch: ScratchDB, rows: int, batch_size: int, group_size: int):
+        """Init
+
+        Args:
+            scratch: Copy of DB to write into
+            rows: Number of rows, written by each method
+            batch_size: Number of rows in one call of a method
+            group_size: Max number of calls, committed together by AsyncConnector"""
+
+        self.scratch: ScratchDB = scratch
+        self.rows: int = rows
+        self.batch_size: int = max(batch_size, 1)
+        self.group_size: int = group_size
+
+    def run(self) -> dict[str, Any]:
+        """Runs benchmark
+
+        Returns:
+            Results by connector's methods"""
+
+        now = datetime.datetime.now()
+        habr_id = None
+
+        def prepare(with_articles: bool) -> None:
+            nonlocal habr_id
+            self.scratch.reset()
+            habr_id = self.scratch.add_habrs(['https://habr.com/ru/hubs/bench/articles/'])[0]
+            if with_articles:
+                self.scratch.add_articles([self._article_url(number) for number in range(self.rows)], habr_id)
+
+        logs = self._make_batches(self.scratch.logs_table, 'data', lambda number: {
+            'parser_name': 'Bench parser',
+            'log_dt': now,
+            'log_text': f'Page {number} was parsed'
+        })
+        articles = self._make_batches(self.scratch.articles_table, 'data', lambda number: {
+            'url': self._article_url(number),
+            'date_collected': now,
+            'parse_this': True,
+            'header': f'Bench article {number}',
+            'habr_id': habr_id
+        })
+        updates = self._make_batches(self.scratch.articles_table, 'rows', lambda number: {
+            'where': {'header': f'Bench article {number}'},
+            'data': {
+                'date_parsed': now,
+                'last_status': 'Success!',
+                'parse_this': False,
+                'article_text': f'Text of article {number}. ' * 50,
+                'article_date': now,
+                'author_name': 'bench_author',
+                'author_url': 'https://habr.com/ru/users/bench_author/',
+                'content_hash': f'{number:064x}'
+            }
+        })
+
+        updated = "last_status = 'Success!'"
+
+        return {
+            'bulk_insert': self._measure(lambda: prepare(False),
+                                         logs,
+                                         self._write_one_by_one('bulk_insert'),
+                                         self.scratch.logs_table),
+            'bulk_insert_or_ignore': self._measure(lambda: prepare(False),
+                                                   articles,
+                                                   self._write_one_by_one('bulk_insert_or_ignore'),
+                                                   self.scratch.articles_table),
+            'bulk_update': self._measure(lambda: prepare(True),
+                                         updates,
+                                         self._write_one_by_one('bulk_update'),
+                                         self.scratch.articles_table,
+                                         updated),
+            'bulk_update_group_commit': self._measure(lambda: prepare(True),
+                                                      updates,
+                                                      self._write_grouped,
+                                                      self.scratch.articles_table,
+                                                      updated)
+        }
+
+    def _measure(self,
+                 prepare: Callable[[], None],
+                 batches: Callable[[], list[dict]],
+                 write: Callable[[IConnector, list[dict]], dict[str, int]],
+                 table_name: str,
+                 condition: str = '1 = 1') -> dict[str, Any]:
+        """Measures one way of writing
+
+        Args:
+            prepare: Brings DB into the state, writing starts with
+            batches: Makes data for calls of a connector's method (after DB is prepared)
+            write: Makes all calls with a new connector
+            table_name: Table, that is written into
+            condition: SQL-condition, written rows match (rows are counted, as connector does not raise, if a write
+                fails)
+        Returns:
+            Rows per second, seconds, commits and peak of memory, taken by writing"""
+
+        prepare()
+        data = batches()
+        connector = SQLiteFromFileConnector(self.scratch.path)
+        started = time.perf_counter()
+        stats = write(connector, data)
+        seconds = time.perf_counter() - started
+        connector.close()
+        rows_written = self.scratch.count(table_name, condition)
+
+        prepare()
+        data = batches()
+        connector = SQLiteFromFileConnector(self.scratch.path)
+        with PeakMemory() as peak_memory:
+            write(connector, data)
+        connector.close()
+
+        return {
+            'rows': self.rows,
+            'rows_written': rows_written,
+            'batch_size': self.batch_size,
+            'seconds': round(seconds, 3),
+            'rows_per_sec': BenchTools.rate(self.rows, seconds),
+            **stats,
+            'peak_memory_kb': peak_memory.kb
+        }
+
+    @staticmethod
+    def _write_one_by_one(method_name: str) -> Callable[[IConnector, list[dict]], dict]:
+        """Makes writer, that calls connector's method for each batch right away (each call is committed)
+
+        Args:
+            method_name: Name of connector's bulk-method
+        Returns:
+            Writer"""
+
+        def write(connector: IConnector, data: list[dict]) -> dict[str, int]:
+            method = getattr(connector, method_name)
+            for batch in data:
+                method(batch)
+
+            return {'commits': len(data)}
+
+        return write
+
+    def _write_grouped(self, connector: IConnector, data: list[dict]) -> dict[str, int]:
+        """Queues all batches into AsyncConnector at once (as parsers do), so they are committed in groups
+
+        Args:
+            connector: Connector to write with
+            data: Data for bulk_update
+        Returns:
+            Number of commits"""
+
+        db = AsyncConnector(connector, self.group_size)
+        db.start()
+        try:
+            concurrent.futures.wait([db.write(connector.bulk_update, batch) for batch in data])
+        finally:
+            db.close()
+
+        return {'commits': db.stats()['commits']}
+
+    def _make_batches(self,
+                      table_name: str,
+                      key: str,
+                      make_row: Callable[[int], dict]) -> Callable[[], list[dict]]:
+        """Makes function, that splits rows into data for calls of connector's bulk-methods
+
+        Args:
+            table_name: Table to write into
+            key: Key of rows in data ('data' for inserts, 'rows' for updates)
+            make_row: Makes a row by its number
+        Returns:
+            Function, that makes data for calls"""
+
+        def make_batches() -> list[dict]:
+            return [
+                {'table_name': table_name,
+                 key: [make_row(number) for number in range(start, min(start + self.batch_size, self.rows))]}
+                for start in range(0, self.rows, self.batch_size)
+            ]
+
+        return make_batches
+
+    @staticmethod
+    def _article_url(number: int) -> str:
+        """Makes URL of an article
+
+        Args:
+            number: Number of the article
+        Returns:
+            URL"""
+
+        return f'https://habr.com/ru/articles/{number}/'
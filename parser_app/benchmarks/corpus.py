@@ -0,0 +1,69 @@
+"""Saved pages, that benchmarks are run on"""
+
+
+from pathlib import Path
+
+
+CORPUS_DIR = Path(__file__).parent / 'corpus'
+"""Folder with saved pages: Habrs' pages in 'hubs', Articles' pages in 'articles'"""
+
+
+class Corpus:
+    """Saved Habrs' and Articles' pages (layout of habr.com with synthetic text), so benchmarks are run on the same
+    HTML every time and do not need the Internet
+
+    Attributes:
+        hubs: Habrs' pages by names of their files
+        articles: Articles' pages by names of their files"""
+
+    def __init__(self, hubs: dict[str, str], articles: dict[str, str]):
+        """Init
+
+        Args:
+            hubs: Habrs' pages by names of their files
+            articles: Articles' pages by names of their files"""
+
+        self.hubs: dict[str, str] = hubs
+        self.articles: dict[str, str] = articles
+
+    @staticmethod
+    def load(path: Path = CORPUS_DIR) -> 'Corpus':
+        """Loads all pages from a folder
+
+        Args:
+            path: Folder with saved pages
+        Returns:
+            Corpus"""
+
+        return Corpus(
+            hubs=Corpus._load_pages(path / 'hubs'),
+            articles=Corpus._load_pages(path / 'articles')
+        )
+
+    def size(self) -> dict[str, int]:
+        """Tells, how many pages there are and how big they are
+
+        Returns:
+            Number of pages and their size in bytes for Habrs and Articles"""
+
+        return {
+            'hub_pages': len(self.hubs),
+            'hub_bytes': sum(len(page.encode()) for page in self.hubs.values()),
+            'article_pages': len(self.articles),
+            'article_bytes': sum(len(page.encode()) for page in self.articles.values())
+        }
+
+    @staticmethod
+    def _load_pages(path: Path) -> dict[str, str]:
+        """Loads all HTML-files from a folder
+
+        Args:
+            path: Folder with pages
+        Returns:
+            Pages by names of their files (sorted, so pages always go in the same order)"""
+
+        pages = {file.name: file.read_text(encoding='utf-8') for file in sorted(path.glob('*.html'))}
+        if not pages:
+            raise FileNotFoundError(f'There are no pages in "{path}"')
+
+        return pages
@@ -0,0 +1,81 @@
+"""Benchmark of extraction of data from HTML"""
+
+
+import time
+
+from typing import Any, Callable
+
+from parser_app.benchmarks.bench_tools import BenchTools
+from parser_app.benchmarks.corpus import Corpus
+from parser_app.parsers.articles_parser.a_extractor import ArticleExtractor
+from parser_app.parsers.habs_parser.h_extractor import HabExtractor
+
+
+class ExtractionBenchmark:
+    """Measures, how long each extraction function takes per page of the corpus, with each soup-backend
+
+    Attributes:
+        corpus: Saved pages
+        backends: Names of soup-backends to measure (see SoupBackendFactory)
+        repeats: Number of times, each page is extracted"""
+
+    def __init__(self, corpus: Corpus, backends: list[str], repeats: int):
+        """Init
+
+        Args:
+            corpus: Saved pages
+            backends: Names of soup-backends to measure
+            repeats: Number of times, each page is extracted"""
+
+        self.corpus: Corpus = corpus
+        self.backends: list[str] = backends
+        self.repeats: int = max(repeats, 1)
+
+    def run(self) -> dict[str, Any]:
+        """Runs benchmark
+
+        Returns:
+            Results by extraction functions (and by backends for functions, that build soup)"""
+
+        hubs = list(self.corpus.hubs.values())
+        articles = list(self.corpus.articles.values())
+
+        results = {'HabExtractor.extract': {}, 'ArticleExtractor.extract': {}}
+        for backend_name in self.backends:
+            results['HabExtractor.extract'][backend_name] = self._measure(
+                lambda html: HabExtractor.extract(html, backend_name), hubs)
+            results['ArticleExtractor.extract'][backend_name] = self._measure(
+                lambda html: ArticleExtractor.extract(html, backend_name), articles)
+        results['ArticleExtractor.fingerprint'] = self._measure(ArticleExtractor.fingerprint, articles)
+
+        return results
+
+    def _measure(self, extract: Callable[[str], Any], pages: list[str]) -> dict[str, Any]:
+        """Measures one extraction function
+
+        Args:
+            extract: Function, that only needs HTML
+            pages: Pages to extract data from
+        Returns:
+            Milliseconds per page, pages per second and peak of memory, taken by extraction of a page"""
+
+        # Warming up: backends import their libraries and build their caches on the first page
+        extract(pages[0])
+
+        durations = []
+        for _ in range(self.repeats):
+            for html in pages:
+                started = time.perf_counter()
+                extract(html)
+                durations.append(time.perf_counter() - started)
+
+        def extract_all() -> None:
+            for page in pages:
+                extract(page)
+
+        return {
+            'pages': len(durations),
+            'ms_per_page': BenchTools.summarize_ms(durations),
+            'pages_per_sec': BenchTools.rate(len(durations), sum(durations)),
+            'peak_memory_kb': BenchTools.peak_memory_kb(extract_all)
+        }
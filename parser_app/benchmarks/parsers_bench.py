@@ -0,0 +1,293 @@
+"""Benchmarks of fetching and of parsers, that fetch pages from the stub"""
+
+
+import asyncio
+import datetime
+import time
+
+from typing import Any, Callable
+
+from parser_app.benchmarks.bench_tools import BenchTools, PeakMemory
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.db_connector.async_connector import AsyncConnector
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+from parser_app.logger.standard_logger import STDLogger
+from parser_app.metrics.parser_metrics import ParserMetrics
+from parser_app.parsers.articles_parser.a_parser import ArticleParser
+from parser_app.parsers.extraction_executor import ExtractionExecutor
+from parser_app.parsers.fetch_throttle import FetchThrottle
+from parser_app.parsers.habs_parser.h_parser import HabsParser
+from parser_app.parsers.http_client import HttpClient
+from parser_app.parsers.http_validators import ValidatorStore
+from parser_app.parsers.known_articles import KnownArticlesFactory
+from parser_app.parsers.single_flight import SingleFlight
+from parser_app.utils.constants import ACCEPT_ENCODING, ARTICLES_CHUNK_SIZE, EXTRACTION_WORKERS, \
+    KNOWN_ARTICLES_INDEX, LEASE_DURATION, METRICS_ENABLED
+from parser_app.utils.env_reader import EnvReader
+
+
+BENCH_WORKER_ID = 'bench'
+"""Id of a worker, that leases Articles in benchmarks"""
+
+
+class FetchBenchmark:
+    """Measures, how many pages per second HttpClient loads from the stub without parsing them – the ceiling for
+    parsers' throughput
+
+    Attributes:
+        base_url: Base URL of the stub
+        pages: Number of pages to load
+        concurrency: Number of pages, loaded at the same time"""
+
+    def __init__(self, base_url: str, pages: int, concurrency: int):
+        """Init
+
+        Args:
+            base_url: Base URL of the stub
+            pages: Number of pages to load
+            concurrency: Number of pages, loaded at the same time"""
+
+        self.base_url: str = base_url
+        self.pages: int = pages
+        self.concurrency: int = max(concurrency, 1)
+
+    def run(self) -> dict[str, Any]:
+        """Runs benchmark
+
+        Returns:
+            Pages and megabytes per second, connections and peak of memory"""
+
+        started = time.perf_counter()
+        loaded_bytes, stats = asyncio.run(self._fetch_all())
+        seconds = time.perf_counter() - started
+
+        with PeakMemory() as peak_memory:
+            asyncio.run(self._fetch_all())
+
+        return {
+            'pages': self.pages,
+            'concurrency': self.concurrency,
+            'seconds': round(seconds, 3),
+            'pages_per_sec': BenchTools.rate(self.pages, seconds),
+            'mb_per_sec': BenchTools.rate(loaded_bytes / 1024 / 1024, seconds),
+            'new_connections': stats['new_connections'],
+            'reused_connections': stats['reused_connections'],
+            'peak_memory_kb': peak_memory.kb
+        }
+
+    async def _fetch_all(self) -> tuple[int, dict[str, Any]]:
+        """Loads all pages with a new client
+
+        Returns:
+            Number of loaded (decompressed) bytes and client's stats"""
+
+        http_client = HttpClient.from_env()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(number: int) -> int:
+            async with semaphore:
+                session = await http_client.get_session()
+                async with session.get(f'{self.base_url}/ru/articles/{number}/',
+                                       headers={'Accept-Encoding': ACCEPT_ENCODING}) as response:
+                    response.raise_for_status()
+                    return len(await response.read())
+
+        try:
+            sizes = await asyncio.gather(*(fetch(number) for number in range(self.pages)))
+        finally:
+            await http_client.close()
+
+        return sum(sizes), http_client.stats()
+
+
+class ParsersBenchmark:
+    """Measures, how many pages per second HabsParser and ArticleParser parse: pages are loaded from the stub,
+    extracted and saved into a copy of DB. Parsers get the same HTTP-client, throttle, pool of processes, DB's thread and
+    metrics (if METRICS_ENABLED, so their overhead is measured too), as MainController gives them, with settings from .env
+
+    Attributes:
+        scratch: Copy of DB to write into
+        base_url: Base URL of the stub
+        hubs: Number of Habrs to parse (each one is crawled as deep, as a new Habr is)
+        articles: Number of Articles to parse
+        group_size: Max number of writes, committed together by AsyncConnector"""
+
+    def __init__(self, scratch: ScratchDB, base_url: str, hubs: int, articles: int, group_size: int):
+        """Init
+
+        Args:
+            scratch: Copy of DB to write into
+            base_url: Base URL of the stub
+            hubs: Number of Habrs to parse
+            articles: Number of Articles to parse
+            group_size: Max number of writes, committed together by AsyncConnector"""
+
+        self.scratch: ScratchDB = scratch
+        self.base_url: str = base_url
+        self.hubs: int = hubs
+        self.articles: int = articles
+        self.group_size: int = group_size
+
+    def run(self) -> dict[str, Any]:
+        """Runs benchmark
+
+        Returns:
+            Results by parsers"""
+
+        return {
+            'HabsParser': self._measure(self._prepare_habrs,
+                                        self._parse_habrs,
+                                        {'articles_saved': (self.scratch.articles_table, '1 = 1')}),
+            'ArticleParser': self._measure(self._prepare_articles,
+                                           self._parse_articles,
+                                           {'articles_parsed': (self.scratch.articles_table,
+                                                                "parse_this = 0 AND last_status = 'Success!'")})
+        }
+
+    def _measure(self,
+                 prepare: Callable[[], None],
+                 parse: Callable[[SQLiteFromFileConnector, AsyncConnector, STDLogger, dict[str, Any]], None],
+                 counters: dict[str, tuple[str, str]]) -> dict[str, Any]:
+        """Measures one parser
+
+        Args:
+            prepare: Brings DB into the state, parsing starts with
+            parse: Runs parser with connector, DB's thread, logger and objects, that parsers share
+            counters: Names of results -> (table, SQL-condition) to count rows, that parser has written
+        Returns:
+            Pages per second, seconds, requests, counted rows and peak of memory (of this process, pool of processes
+            is not included)"""
+
+        prepare()
+        started = time.perf_counter()
+        stats = self._run(parse)
+        seconds = time.perf_counter() - started
+        written = {name: self.scratch.count(table, condition) for name, (table, condition) in counters.items()}
+
+        prepare()
+        with PeakMemory() as peak_memory:
+            self._run(parse)
+
+        return {
+            'pages': stats['requests'],
+            'seconds': round(seconds, 3),
+            'pages_per_sec': BenchTools.rate(stats['requests'], seconds),
+            **written,
+            'new_connections': stats['new_connections'],
+            'reused_connections': stats['reused_connections'],
+            'peak_memory_kb': peak_memory.kb
+        }
+
+    def _run(self, parse: Callable[[SQLiteFromFileConnector, AsyncConnector, STDLogger, dict[str, Any]], None]) \
+            -> dict[str, Any]:
+        """Makes everything, MainController gives parsers, runs a parser and closes it all
+
+        Args:
+            parse: Runs parser
+        Returns:
+            HTTP-client's stats"""
+
+        connector = SQLiteFromFileConnector(self.scratch.path)
+        metrics = ParserMetrics() if EnvReader.get_bool('METRICS_ENABLED', METRICS_ENABLED) else None
+        db = AsyncConnector(connector, self.group_size, metrics=metrics)
+        db.start()
+        logger = STDLogger(connector, db=db)
+        http_client = HttpClient.from_env()
+        executor = ExtractionExecutor(EnvReader.get_int('EXTRACTION_WORKERS', EXTRACTION_WORKERS))
+        loop = asyncio.new_event_loop()
+        shared = {
+            'executor': executor,
+            'http_client': http_client,
+            'throttle': FetchThrottle.from_env(),
+            'single_flight': SingleFlight(),
+            'db': db,
+            'metrics': metrics,
+            'loop': loop
+        }
+
+        try:
+            with BenchTools.quiet():
+                parse(connector, db, logger, shared)
+                logger.flush()
+        finally:
+            loop.run_until_complete(http_client.close())
+            loop.close()
+            executor.shutdown()
+            db.close()
+
+        return http_client.stats()
+
+    def _prepare_habrs(self) -> None:
+        """Empties DB and adds Habrs, that were never parsed"""
+
+        self.scratch.reset()
+        self.scratch.add_habrs([f'{self.base_url}/ru/hubs/{number}/articles/' for number in range(self.hubs)])
+
+    def _prepare_articles(self) -> None:
+        """Empties DB and adds Articles, that should be parsed"""
+
+        self.scratch.reset()
+        habr_id = self.scratch.add_habrs([f'{self.base_url}/ru/hubs/0/articles/'])[0]
+        self.scratch.add_articles([f'{self.base_url}/ru/articles/{number}/' for number in range(self.articles)],
+                                  habr_id)
+
+    @staticmethod
+    def _parse_habrs(connector: SQLiteFromFileConnector,
+                     db: AsyncConnector,
+                     logger: STDLogger,
+                     shared: dict[str, Any]) -> None:
+        """Parses all Habrs with HabsParser
+
+        Args:
+            connector: Connector to DB
+            db: DB's thread
+            logger: Logger
+            shared: Objects, that parsers share"""
+
+        index_name = EnvReader.get_str('KNOWN_ARTICLES_INDEX', KNOWN_ARTICLES_INDEX)
+        known_articles = KnownArticlesFactory.make_index(index_name, connector)
+        if isinstance(known_articles, Exception):
+            raise known_articles
+
+        parser = HabsParser(db.call(connector.get_hubs_to_do),
+                            logger,
+                            connector,
+                            executor=shared['executor'],
+                            http_client=shared['http_client'],
+                            throttle=shared['throttle'],
+                            validators=ValidatorStore(),
+                            single_flight=shared['single_flight'],
+                            known_articles=known_articles,
+                            db=db,
+                            metrics=shared['metrics'])
+        shared['loop'].run_until_complete(parser.aparse())
+
+    @staticmethod
+    def _parse_articles(connector: SQLiteFromFileConnector,
+                        db: AsyncConnector,
+                        logger: STDLogger,
+                        shared: dict[str, Any]) -> None:
+        """Parses all Articles with ArticleParser, chunk by chunk, as MainController does
+
+        Args:
+            connector: Connector to DB
+            db: DB's thread
+            logger: Logger
+            shared: Objects, that parsers share"""
+
+        chunk_size = EnvReader.get_int('ARTICLES_CHUNK_SIZE', ARTICLES_CHUNK_SIZE)
+        lease_duration = datetime.timedelta(seconds=EnvReader.get_float('LEASE_DURATION', LEASE_DURATION))
+
+        for articles_chunk in db.iterate(connector.iter_articles_to_do(chunk_size, BENCH_WORKER_ID, lease_duration)):
+            parser = ArticleParser(articles_chunk,
+                                   logger,
+                                   connector,
+                                   executor=shared['executor'],
+                                   http_client=shared['http_client'],
+                                   throttle=shared['throttle'],
+                                   single_flight=shared['single_flight'],
+                                   db=db,
+                                   metrics=shared['metrics'])
+            shared['loop'].run_until_complete(parser.aparse())
+            article_ids = [article['article_id'] for article in articles_chunk.values()]
+            db.call(connector.release_articles, article_ids, BENCH_WORKER_ID)
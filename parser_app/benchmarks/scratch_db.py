@@ -0,0 +1,142 @@
+"""Temporary copy of DB, that benchmarks write into"""
+
+
+import contextlib
+import datetime
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+class ScratchDB:
+    """Copy of a migrated SQLite-DB in a temporary folder, so benchmarks get the same schema and indexes, as the real
+    DB has, but never write into it
+
+    Attributes:
+        source: Path to a migrated DB (it is only read)
+        path: Path to the copy, None until it is created
+        articles_table: Name of Articles' table
+        habs_table: Name of Habrs' table
+        logs_table: Name of logs' table
+        _folder: Temporary folder with the copy"""
+
+    def __init__(self, source: Path):
+        """Init
+
+        Args:
+            source: Path to a migrated DB"""
+
+        self.source: Path = source
+        self.path: Optional[Path] = None
+        self.articles_table: str = os.getenv('ARTICLES_TABLE')
+        self.habs_table: str = os.getenv('HABS_TABLE')
+        self.logs_table: str = os.getenv('LOGS_TABLE')
+        self._folder: Optional[str] = None
+
+    def create(self) -> Path:
+        """Copies source DB into a temporary folder
+
+        Returns:
+            Path to the copy"""
+
+        if not self.source.exists():
+            raise FileNotFoundError(f'There is no DB "{self.source}"')
+
+        self._folder = tempfile.mkdtemp(prefix='habr_parser_bench_')
+        self.path = Path(self._folder) / 'bench.sqlite3'
+
+        # Backup copies DB consistently, even if it is being written right now
+        source = sqlite3.connect(self.source)
+        copy = sqlite3.connect(self.path)
+        try:
+            source.backup(copy)
+            columns = [row[1] for row in copy.execute(f'PRAGMA table_info({self.articles_table})')]
+        finally:
+            source.close()
+            copy.close()
+
+        if 'lease_owner' not in columns:
+            self.remove()
+            raise LookupError(f'DB "{self.source}" is not migrated, run "python manage.py migrate" in parser_console')
+
+        return self.path
+
+    def remove(self) -> None:
+        """Removes the copy"""
+
+        if self._folder is not None:
+            shutil.rmtree(self._folder, ignore_errors=True)
+            self._folder = None
+            self.path = None
+
+    def reset(self) -> None:
+        """Removes all Articles, Habrs and logs from the copy"""
+
+        with self._connect() as conn:
+            for table in (self.logs_table, self.articles_table, self.habs_table):
+                conn.execute(f'DELETE FROM {table}')
+
+    def add_habrs(self, urls: list[str]) -> list[int]:
+        """Adds active Habrs, that were never parsed
+
+        Args:
+            urls: URLs of Habrs
+        Returns:
+            Ids of added Habrs"""
+
+        with self._connect() as conn:
+            ids = []
+            for number, url in enumerate(urls):
+                cursor = conn.execute(f'INSERT INTO {self.habs_table} '
+                                      f'(name, url, last_parsed, parse_interval_minutes, is_active) '
+                                      f'VALUES (?, ?, NULL, 60, 1)',
+                                      (f'Bench Habr {number}', url))
+                ids.append(cursor.lastrowid)
+
+        return ids
+
+    def add_articles(self, urls: list[str], habr_id: int) -> None:
+        """Adds Articles, that should be parsed
+
+        Args:
+            urls: URLs of Articles
+            habr_id: Id of Habr, Articles belong to"""
+
+        now = datetime.datetime.now()
+        with self._connect() as conn:
+            conn.executemany(f'INSERT INTO {self.articles_table} (url, date_collected, parse_this, header, habr_id) '
+                             f'VALUES (?, ?, 1, ?, ?)',
+                             [(url, now, f'Bench article {number}', habr_id) for number, url in enumerate(urls)])
+
+    def count(self, table: str, condition: str = '1 = 1') -> int:
+        """Counts rows in a table of the copy
+
+        Args:
+            table: Name of the table
+            condition: SQL-condition, rows should match
+        Returns:
+            Number of rows"""
+
+        with self._connect() as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM {table} WHERE {condition}').fetchone()[0]
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Opens connection to the copy, commits and closes it on exit
+
+        Yields:
+            Connection"""
+
+        if self.path is None:
+            raise RuntimeError('Scratch DB is not created')
+
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
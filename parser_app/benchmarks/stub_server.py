@@ -0,0 +1,226 @@
+"""Local stand-in for habr.com, that serves saved pages"""
+
+
+import asyncio
+import hashlib
+import multiprocessing
+import re
+import socket
+
+from multiprocessing.connection import Connection
+from typing import Optional
+
+from aiohttp import web
+
+from parser_app.benchmarks.corpus import Corpus
+
+
+ARTICLE_LINK = re.compile(r'/ru/articles/(\d+)/')
+"""Links to articles on Habrs' pages"""
+
+ARTICLE_TITLE = re.compile(r'(class="tm-title__link"><span>)')
+"""Beginnings of articles' titles on Habrs' pages"""
+
+STUB_START_TIMEOUT = 30.0
+"""Seconds to wait for stub's process to start listening"""
+
+
+class HabrStub:
+    """Serves saved pages with the same URLs, as habr.com does:
+
+    - /ru/hubs/{hub}/articles/ and /ru/hubs/{hub}/articles/page{page}/ – Habr's pages, where hub is a number. Links to
+      articles are renumbered and titles are marked with Habr and page, so every page has its own articles (with
+      unique titles), as on a real Habr
+    - /ru/articles/{article}/ – Article's pages, where article is a number
+
+    Habrs and articles are mapped onto saved pages by their numbers, so any number of them can be served.
+
+    With etags, every page is sent with ETag, and a conditional request for a page, that has the same ETag, is answered
+    with 304 and no body.
+
+    Attributes:
+        corpus: Saved pages
+        hub_pages: Number of pages of each Habr, deeper pages are not found (404)
+        latency: Seconds, each response is delayed for (imitates network)
+        compress: True to compress responses (as habr.com does), if client accepts it
+        etags: True to send ETags and answer conditional requests
+        _hub_pages: Habrs' pages, that were already renumbered, by (hub, page)"""
+
+    def __init__(self, corpus: Corpus, hub_pages: int, latency: float, compress: bool, etags: bool = False):
+        """Init
+
+        Args:
+            corpus: Saved pages
+            hub_pages: Number of pages of each Habr, deeper pages are not found (404)
+            latency: Seconds, each response is delayed for (imitates network)
+            compress: True to compress responses, if client accepts it
+            etags: True to send ETags and answer conditional requests"""
+
+        self.corpus: Corpus = corpus
+        self.hub_pages: int = hub_pages
+        self.latency: float = latency
+        self.compress: bool = compress
+        self.etags: bool = etags
+        self._hub_pages: dict[tuple[int, int], str] = {}
+
+    def make_app(self) -> web.Application:
+        """Makes web-application with routes of habr.com
+
+        Returns:
+            AIOHttp's application"""
+
+        app = web.Application()
+        app.router.add_get(r'/ru/hubs/{hub:\d+}/articles/', self._hub)
+        app.router.add_get(r'/ru/hubs/{hub:\d+}/articles/page{page:\d+}/', self._hub)
+        app.router.add_get(r'/ru/articles/{article:\d+}/', self._article)
+
+        return app
+
+    async def _hub(self, request: web.Request) -> web.Response:
+        """Serves Habr's page
+
+        Args:
+            request: Request for Habr's page
+        Returns:
+            Response with the page"""
+
+        hub = int(request.match_info['hub'])
+        page = int(request.match_info.get('page', 1))
+        if page > self.hub_pages:
+            raise web.HTTPNotFound()
+
+        return await self._respond(request, self._get_hub_page(hub, page))
+
+    async def _article(self, request: web.Request) -> web.Response:
+        """Serves Article's page
+
+        Args:
+            request: Request for Article's page
+        Returns:
+            Response with the page"""
+
+        pages = list(self.corpus.articles.values())
+
+        return await self._respond(request, pages[int(request.match_info['article']) % len(pages)])
+
+    async def _respond(self, request: web.Request, html: str) -> web.Response:
+        """Makes response with a page (or 304, if client already has it), after a delay
+
+        Args:
+            request: Request for the page
+            html: Page
+        Returns:
+            Response"""
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        headers = {}
+        if self.etags:
+            headers['ETag'] = f'"{hashlib.md5(html.encode()).hexdigest()}"'
+            if request.headers.get('If-None-Match') == headers['ETag']:
+                return web.Response(status=304, headers=headers)
+
+        response = web.Response(text=html, content_type='text/html', headers=headers)
+        if self.compress:
+            response.enable_compression()
+
+        return response
+
+    def _get_hub_page(self, hub: int, page: int) -> str:
+        """Gets a saved Habr's page with links and titles, changed for this Habr and page
+
+        Args:
+            hub: Number of Habr
+            page: Number of page
+        Returns:
+            Page"""
+
+        if (hub, page) not in self._hub_pages:
+            pages = list(self.corpus.hubs.values())
+            html = ARTICLE_LINK.sub(lambda link: f'/ru/articles/{hub}{page:03d}{link[1]}/', pages[hub % len(pages)])
+            self._hub_pages[hub, page] = ARTICLE_TITLE.sub(f'\\g<1>[{hub}:{page}] ', html)
+
+        return self._hub_pages[hub, page]
+
+
+class StubProcess:
+    """Runs HabrStub in a separate process, so serving pages does not take CPU-time of parsers, that are measured
+
+    Attributes:
+        hub_pages: Number of pages of each Habr
+        latency: Seconds, each response is delayed for
+        compress: True to compress responses
+        etags: True to send ETags and answer conditional requests
+        _process: Stub's process, None until it is started"""
+
+    def __init__(self, hub_pages: int, latency: float, compress: bool, etags: bool = False):
+        """Init
+
+        Args:
+            hub_pages: Number of pages of each Habr
+            latency: Seconds, each response is delayed for
+            compress: True to compress responses
+            etags: True to send ETags and answer conditional requests"""
+
+        self.hub_pages: int = hub_pages
+        self.latency: float = latency
+        self.compress: bool = compress
+        self.etags: bool = etags
+        self._process: Optional[multiprocessing.Process] = None
+
+    def start(self) -> str:
+        """Starts stub on a free local port
+
+        Returns:
+            Base URL of the stub, e.g. 'http://127.0.0.1:51234'"""
+
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        args = (sender, self.hub_pages, self.latency, self.compress, self.etags)
+        self._process = multiprocessing.Process(target=StubProcess._serve,
+                                                args=args,
+                                                name='habr-stub',
+                                                daemon=True)
+        self._process.start()
+        sender.close()
+
+        if not receiver.poll(STUB_START_TIMEOUT):
+            self.stop()
+            raise TimeoutError('Stub did not start')
+
+        return f'http://127.0.0.1:{receiver.recv()}'
+
+    def stop(self) -> None:
+        """Stops stub"""
+
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    @staticmethod
+    def _serve(sender: Connection, hub_pages: int, latency: float, compress: bool, etags: bool) -> None:
+        """Stub's process: serves pages on a free port, until it is terminated. Port is sent to the parent, when stub
+        already listens on it
+
+        Args:
+            sender: Pipe to send port to the parent
+            hub_pages: Number of pages of each Habr
+            latency: Seconds, each response is delayed for
+            compress: True to compress responses
+            etags: True to send ETags and answer conditional requests"""
+
+        async def serve() -> None:
+            sock = socket.socket()
+            sock.bind(('127.0.0.1', 0))
+
+            stub = HabrStub(Corpus.load(), hub_pages, latency, compress, etags)
+            runner = web.AppRunner(stub.make_app(), access_log=None)
+            await runner.setup()
+            await web.SockSite(runner, sock).start()
+
+            sender.send(sock.getsockname()[1])
+            sender.close()
+            await asyncio.Event().wait()
+
+        asyncio.run(serve())
@@ -0,0 +1,140 @@
+"""Scheduler, that knows when each Habr should be parsed next"""
+
+
+import datetime
+import heapq
+
+from typing import Optional
+
+
+class HabrScheduler:
+    """Keeps next-due times of Habrs in a min-heap, so the earliest Habr is always known without checking all of them.
+
+    Heap is rebuilt from DB-data only with load() (when DB has changed). After Habrs are parsed, they are put back into
+    the heap with reschedule(). Entries of a Habr, that was rescheduled or removed, stay in the heap until they are
+    popped, and are skipped then (they do not match self._due).
+
+    Attributes:
+        _habrs: Habrs' data, as loaded from DB
+        _due: Next-due DT of each Habr
+        _heap: Tuples (next-due DT, Habr's name)"""
+
+    def __init__(self):
+        """Init"""
+
+        self._habrs: dict[str, dict] = {}
+        self._due: dict[str, datetime.datetime] = {}
+        self._heap: list[tuple[datetime.datetime, str]] = []
+
+    def load(self, habrs: dict) -> None:
+        """Rebuilds schedule from Habrs, loaded from DB
+
+        Args:
+            habrs: Active Habrs with their respective data"""
+
+        now = datetime.datetime.now()
+
+        self._habrs = habrs
+        self._due = {}
+        for hab_name, data in habrs.items():
+            last_parsed = data['last_parsed']
+
+            # In case this Habr have never being parsed before (new Habr)
+            if not last_parsed:
+                self._due[hab_name] = now
+            else:
+                last_parsed_dt = datetime.datetime.fromisoformat(str(last_parsed))
+                self._due[hab_name] = last_parsed_dt + self._get_interval(data)
+
+        self._heap = [(due, hab_name) for hab_name, due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def pop_due(self, now: datetime.datetime) -> dict:
+        """Takes all Habrs, that should be parsed by now, out of the schedule
+
+        Args:
+            now: Current DT
+        Returns:
+            Habrs, that should be parsed now"""
+
+        due_habrs = {}
+        while self._heap and self._heap[0][0] <= now:
+            due, hab_name = heapq.heappop(self._heap)
+            if self._due.get(hab_name) == due:
+                due_habrs[hab_name] = self._habrs[hab_name]
+                del self._due[hab_name]
+
+        return due_habrs
+
+    def reschedule(self, habrs: dict, parsed_at: datetime.datetime) -> None:
+        """Puts parsed Habrs back into the schedule
+
+        Args:
+            habrs: Habrs, that were parsed
+            parsed_at: DT, when they were parsed"""
+
+        for hab_name, data in habrs.items():
+            if hab_name not in self._habrs:
+                continue
+
+            data['last_parsed'] = parsed_at
+            due = parsed_at + self._get_interval(data)
+            self._due[hab_name] = due
+            heapq.heappush(self._heap, (due, hab_name))
+
+            msg = f'Hab "{hab_name}" is completed, next schedule is {due}'
+            print(msg)
+
+    def postpone(self, habrs: dict, due: datetime.datetime) -> None:
+        """Puts Habrs, that were not parsed (e.g. another worker is parsing them), back into the schedule
+
+        Args:
+            habrs: Habrs, that were not parsed
+            due: DT, when they should be checked again"""
+
+        for hab_name in habrs:
+            if hab_name not in self._habrs:
+                continue
+
+            self._due[hab_name] = due
+            heapq.heappush(self._heap, (due, hab_name))
+
+    def seconds_until_next(self, now: datetime.datetime, max_seconds: float) -> float:
+        """Tells, how long to wait for the next Habr
+
+        Args:
+            now: Current DT
+            max_seconds: Max time to wait (e.g. to check DB for changes)
+        Returns:
+            Seconds until the earliest Habr is due (0, if it is already due), but no more than max_seconds"""
+
+        next_due = self.next_due()
+        if next_due is None:
+            return max_seconds
+
+        seconds = (next_due - now).total_seconds()
+
+        return min(max(seconds, 0), max_seconds)
+
+    def next_due(self) -> Optional[datetime.datetime]:
+        """Returns DT, when the earliest Habr is due
+
+        Returns:
+            DT or None, if there are no Habrs in the schedule"""
+
+        # Dropping entries of Habrs, that were rescheduled or removed
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+        return self._heap[0][0] if self._heap else None
+
+    @staticmethod
+    def _get_interval(data: dict) -> datetime.timedelta:
+        """Returns parsing interval of a Habr
+
+        Args:
+            data: Habr's data
+        Returns:
+            Interval between two parsings of this Habr"""
+
+        return datetime.timedelta(minutes=data['parse_interval_minutes'])
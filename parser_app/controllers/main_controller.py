@@ -1,141 +1,398 @@
 """Main application controller"""
 
 
+import asyncio
 import datetime
 import os
+import socket
 import time
 
-from pathlib import Path
-from typing import Optional
+from typing import Awaitable, Optional
 
+from parser_app.controllers.habr_scheduler import HabrScheduler
+from parser_app.db_connector.async_connector import AsyncConnector
 from parser_app.db_connector.connector_factory import ConnectorFactory
 from parser_app.db_connector.connector_interface import IConnector
 from parser_app.logger.standard_logger import STDLogger
+from parser_app.metrics.metrics_server import MetricsServer
+from parser_app.metrics.parser_metrics import ParserMetrics
+from parser_app.parsers.extraction_executor import ExtractionExecutor
+from parser_app.parsers.fetch_throttle import FetchThrottle
+from parser_app.parsers.http_client import HttpClient
+from parser_app.parsers.http_validators import ValidatorStore
+from parser_app.parsers.job_feed import JobFeed
+from parser_app.parsers.known_articles import KnownArticlesFactory, KnownArticlesSet
 from parser_app.parsers.parser_factory import ParserFactory
+from parser_app.parsers.pasrser_interface import ParserInterface
+from parser_app.parsers.single_flight import SingleFlight
+from parser_app.utils.constants import EXTRACTION_WORKERS, ARTICLES_CHUNK_SIZE, KNOWN_ARTICLES_INDEX, \
+    KNOWN_ARTICLES_CHUNK_SIZE, LEASE_DURATION, DB_GROUP_COMMIT_SIZE, METRICS_ENABLED
+from parser_app.utils.env_reader import EnvReader
 
 
 class MainController:
-    """Main application controller
+    """Main application controller.
+
+    Several controllers (workers) can run at once, on one or many machines, with the same DB: each Habr and each chunk
+    of articles is leased to a single worker before it is parsed (see IConnector.claim_habrs), so no page is fetched
+    twice. Leases are renewed while a parser runs and are released, when it is done. Leases of a worker, that stopped
+    without releasing them, expire after lease_duration and are taken by other workers.
+
+    All parsers run in one event loop, that lives as long as the controller. Due Habrs and articles, found on them, are
+    parsed in one pass: Articles' parser runs at the same time with Habrs' parser and gets new articles through a feed.
+
+    All queries are run in DB's thread (see AsyncConnector), so event loop keeps fetching pages, while DB is busy.
+
+    If metrics are enabled in .env, durations of cycles, fetches, extraction, saving and queries are collected and are
+    served to Prometheus from a separate thread (see MetricsServer).
 
     Attributes:
-        interval: Interval in seconds, in which DB will be checked for updates
+        interval: Seconds between two checks of DB for User's changes, while controller waits for the next Habr (only
+            if DB does not notify about them, see IConnector.wait_for_changes)
         connector: Connector to DB
-        logger: Logger, to log anything into DB"""
+        db: Runs connector's queries in DB's thread, shared by controller, logger and parsers
+        logger: Logger, to log anything into DB
+        executor: Pool of processes, shared by all parsers to extract data from HTML
+        scheduler: Knows, when each Habr should be parsed next
+        validators: HTTP-validators of Habrs' pages, kept between parsings to make conditional requests
+        http_client: Client with a pool of connections, shared by all parsers
+        throttle: Regulates number and rate of requests to each host, shared by all parsers
+        single_flight: Collapses concurrent loads of the same URL into one, shared by all parsers
+        known_articles: In-memory index of saved articles, filled from DB at start and updated by Habrs' parser
+        worker_id: Id of this worker, unique among all workers, that use the same DB
+        lease_duration: Time, Habrs and articles are leased to this worker for (lease is renewed, while they are parsed)
+        loop: Event loop, all parsers are run in (HTTP-client's connections are bound to it)
+        metrics: Metrics of this worker, shared by DB's thread and parsers. None, if metrics are disabled
+        metrics_server: Serves metrics to Prometheus. None, if metrics are disabled"""
 
     def __init__(self,
-                 interval: int,
+                 interval: float,
                  logger: type[STDLogger]):
         """Init
 
         Args:
-            interval: Interval in seconds, in which DB will be checked for updates
+            interval: Seconds between two checks of DB for User's changes, while controller waits for the next Habr
             logger: Logger, to log anything into DB"""
 
         self.interval = interval
         self.connector: Optional[IConnector] = None
+        self.db: Optional[AsyncConnector] = None
         self.logger: type[STDLogger] | STDLogger = logger
+        self.executor: Optional[ExtractionExecutor] = None
+        self.scheduler: HabrScheduler = HabrScheduler()
+        self.validators: ValidatorStore = ValidatorStore()
+        self.http_client: Optional[HttpClient] = None
+        self.throttle: Optional[FetchThrottle] = None
+        self.single_flight: SingleFlight = SingleFlight()
+        self.known_articles: Optional[KnownArticlesSet] = None
+        self.worker_id: str = ''
+        self.lease_duration: datetime.timedelta = datetime.timedelta(seconds=LEASE_DURATION)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.metrics: Optional[ParserMetrics] = None
+        self.metrics_server: Optional[MetricsServer] = None
 
     def start(self):
-        """Starts an endless cycle"""
-
-        self._get_connector()
-        self._activate_logger()
+        """Starts an endless cycle. Whatever was started, is stopped, when it ends (even if it failed to start), so the
+        next start (see main.py) gets the metrics' port and does not leak threads and processes"""
+
+        try:
+            self._get_metrics()
+            self._get_connector()
+            self._get_lease_settings()
+            self._activate_logger()
+            self._get_executor()
+            self._get_http_client()
+            self._get_known_articles()
+            self._run()
+        finally:
+            self._stop()
+
+    def _stop(self) -> None:
+        """Releases leases of this worker and stops everything, that was started"""
+
+        if self.db is not None:
+            self.db.call(self.connector.release_leases, self.worker_id)
+        if self.loop is not None:
+            # Loop is made the last one, with HTTP-client and throttle already made
+            self._close_http_client()
+        if self.executor is not None:
+            self.executor.shutdown()
+        if isinstance(self.logger, STDLogger):
+            self.logger.flush()
+        if self.db is not None:
+            print(f'DB stats: {self.db.stats()}')
+            self.db.close()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+
+    def _run(self) -> None:
+        """Endless cycle: waits for the next due Habr (or for changes in DB) and executes tasks"""
+
+        data_version = None
+        next_reclaim = datetime.datetime.now()
 
         while True:
-            # Waiting a bit, not to overload DB with queries
-            time.sleep(self.interval)
-
-            # Getting Habrs and Articles, that need to be parsed (or empty collection, if all done)
-            tasks = self._check_tasks()
-            habrs = tasks['habrs']
-            articles = tasks['articles']
-
+            cycle_started = time.perf_counter()
+            # Schedule is reloaded only when User has changed Habrs or marked articles to be parsed (not on every write
+            # of other workers)
+            current_data_version = self.db.call(self.connector.get_data_version)
+            db_changed = current_data_version is None or current_data_version != data_version
+            data_version = current_data_version
+            if db_changed:
+                self.scheduler.load(self.db.call(self.connector.get_hubs_to_do))
+
+            habrs = self._claim_habrs(self.scheduler.pop_due(datetime.datetime.now()))
+            # Logs, that failed to be saved, are retried, while worker waits for the next Habr
+            self.logger.flush_due()
+            self._observe_stage('check_db', cycle_started)
             if habrs:
-                self._parse_this(habrs, 'habrs')
-            if articles:
-                self._parse_this(articles, 'articles')
-
-            if not habrs and not articles:
+                stage_started = time.perf_counter()
+                try:
+                    self._crawl_habrs(habrs)
+                finally:
+                    # Habrs and articles, found on them, are released together
+                    self.db.call(self.connector.release_leases, self.worker_id)
+                self.scheduler.reschedule(habrs, datetime.datetime.now())
+                self._observe_stage('crawl_habrs', stage_started)
+
+            # Articles from parsed Habrs are already parsed, others can appear only from changes in DB. Articles, that
+            # were leased by a worker, that stopped (or failed to load), become available, when their leases expire
+            articles_found = False
+            if db_changed or datetime.datetime.now() >= next_reclaim:
+                stage_started = time.perf_counter()
+                articles_found = self._parse_articles()
+                next_reclaim = datetime.datetime.now() + self.lease_duration
+                self._observe_stage('parse_articles', stage_started)
+
+            if self.metrics is not None:
+                self.metrics.cycle_seconds.observe(time.perf_counter() - cycle_started)
+
+            if db_changed and not habrs and not articles_found:
                 print('👍 Nothing to do right now, all tasks are completed! 👍')
+                print(f'Next Habr is due at {self.scheduler.next_due()}')
                 print('–––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––')
 
+            # Waiting until the next Habr is due or leases of stopped workers expire, unless User changes something
+            # earlier (PostgreSQL notifies about it, SQLite is checked once per self.interval)
+            now = datetime.datetime.now()
+            timeout = self.scheduler.seconds_until_next(now, max((next_reclaim - now).total_seconds(), 0))
+            if timeout > 0:
+                self.db.call(self.connector.wait_for_changes, data_version, timeout, self.interval)
+
+    def _observe_stage(self, stage: str, started: float) -> None:
+        """Adds duration of a stage of the cycle to metrics, if they are enabled
+
+        Args:
+            stage: Name of the stage
+            started: Time (perf_counter), the stage was started at"""
+
+        if self.metrics is not None:
+            self.metrics.cycle_stage_seconds.observe(time.perf_counter() - started, stage)
+
+    def _parse_articles(self) -> bool:
+        """Loads articles, that need to be parsed, chunk by chunk and parses them
+
+        Returns:
+            True, if there were any articles to parse"""
+
+        chunk_size = EnvReader.get_int('ARTICLES_CHUNK_SIZE', ARTICLES_CHUNK_SIZE)
+
+        articles_found = False
+        articles_chunks = self.connector.iter_articles_to_do(chunk_size, self.worker_id, self.lease_duration)
+        for articles_chunk in self.db.iterate(articles_chunks):
+            articles_found = True
+            try:
+                self._parse_this(articles_chunk, 'articles')
+            finally:
+                article_ids = [article['article_id'] for article in articles_chunk.values()]
+                self.db.call(self.connector.release_articles, article_ids, self.worker_id)
+
+        return articles_found
+
+    def _claim_habrs(self, habrs: dict) -> dict:
+        """Leases due Habrs to this worker. Habrs, that are taken by other workers, are checked again, when their leases
+        expire (or earlier, if DB changes)
+
+        Args:
+            habrs: Habrs, that are due by schedule
+        Returns:
+            Habrs, that this worker should parse"""
+
+        if not habrs:
+            return habrs
+
+        claimed = self.db.call(self.connector.claim_habrs, habrs, self.worker_id, self.lease_duration)
+        taken = {hab_name: data for hab_name, data in habrs.items() if hab_name not in claimed}
+        if taken:
+            print(f'Habrs {", ".join(taken)} are taken by another worker')
+            self.scheduler.postpone(taken, datetime.datetime.now() + self.lease_duration)
+
+        return claimed
+
     def _get_connector(self) -> None:
-        """Gets connector, specified in for for DB, set in .env"""
+        """Gets connector, specified in for for DB, set in .env, and starts DB's thread to run its queries"""
 
         db_type = os.getenv('DB_TYPE')
-        db_file_path = os.getenv('DB_FILE_PATH')
 
         connector = ConnectorFactory.get_parser(db_type)
         if isinstance(connector, Exception):
             raise connector
         else:
-            self.connector = connector(Path(db_file_path))
+            self.connector = connector.from_env()
+
+        self.db = AsyncConnector(self.connector,
+                                 EnvReader.get_int('DB_GROUP_COMMIT_SIZE', DB_GROUP_COMMIT_SIZE),
+                                 metrics=self.metrics)
+        self.db.start()
+
+    def _get_metrics(self) -> None:
+        """Creates metrics and starts serving them, if they are enabled in .env"""
+
+        if not EnvReader.get_bool('METRICS_ENABLED', METRICS_ENABLED):
+            return
+
+        self.metrics = ParserMetrics()
+        self.metrics_server = MetricsServer.from_env(self.metrics)
+        self.metrics_server.start()
+
+    def _get_lease_settings(self) -> None:
+        """Reads id of this worker (host and process by default) and duration of leases, set in .env"""
+
+        self.worker_id = EnvReader.get_str('PARSER_WORKER_ID', f'{socket.gethostname()}:{os.getpid()}')
+        self.lease_duration = datetime.timedelta(seconds=EnvReader.get_float('LEASE_DURATION', LEASE_DURATION))
+        print(f'Worker "{self.worker_id}" leases tasks for {self.lease_duration}')
+
+    def _get_executor(self) -> None:
+        """Creates a pool of processes for extraction, with number of workers, set in .env"""
+
+        workers = EnvReader.get_int('EXTRACTION_WORKERS', EXTRACTION_WORKERS)
+        self.executor = ExtractionExecutor(workers)
+
+    def _get_http_client(self) -> None:
+        """Creates HTTP-client and throttle with settings, set in .env, and an event loop to use them in"""
+
+        self.http_client = HttpClient.from_env()
+        self.throttle = FetchThrottle.from_env()
+        self.loop = asyncio.new_event_loop()
+
+    def _get_known_articles(self) -> None:
+        """Creates index of saved articles of type, set in .env, and fills it with articles from DB"""
+
+        index_name = EnvReader.get_str('KNOWN_ARTICLES_INDEX', KNOWN_ARTICLES_INDEX)
+        known_articles = KnownArticlesFactory.make_index(index_name, self.connector)
+        if isinstance(known_articles, Exception):
+            raise known_articles
+
+        self.known_articles = known_articles
+        for urls in self.db.iterate(self.connector.iter_article_urls(KNOWN_ARTICLES_CHUNK_SIZE)):
+            self.known_articles.update(urls)
+        print(f'Index of saved articles ({index_name}) is filled with {len(self.known_articles)} articles')
+
+    def _close_http_client(self) -> None:
+        """Closes HTTP-client's connections and the event loop"""
+
+        print(f'HTTP-client stats: {self.http_client.stats()}')
+        print(f'Throttle stats: {self.throttle.stats()}')
+        print(f'Single-flight stats: {self.single_flight.stats()}')
+        self.loop.run_until_complete(self.http_client.close())
+        self.loop.close()
 
     def _activate_logger(self) -> None:
         """Activates provided Logger"""
 
-        self.logger = self.logger(self.connector)
+        self.logger = self.logger(self.connector, db=self.db)
 
-    def _check_tasks(self) -> dict:
-        """Reads DB and checks, which Habrs and Articles can be parsed
+    def _parse_this(self, parsing_tasks: dict, parsing_type: str, **parser_kwargs) -> None:
+        """Selects a parser and activates it
 
-        Returns:
-            Dict with Habrs and Articles, if there is any to do right now"""
+        Args:
+            parsing_tasks: Collection with Habrs or Articles to parse
+            parsing_type: String, that indicates which parser should be used
+            parser_kwargs: Additional arguments, that are specific for this parser"""
+
+        parser = self._get_parser(parsing_tasks, parsing_type, **parser_kwargs)
+        self.loop.run_until_complete(self._run_stages(parser.aparse()))
+        self.logger.flush()
 
-        tasks = {
-            'habrs': {},
-            'articles': {}
-        }
+    def _crawl_habrs(self, habrs: dict) -> None:
+        """Parses Habrs and articles, found on them, in one pass: Articles' parser runs at the same time with Habrs'
+        parser and fetches new articles, as soon as they are saved
 
-        habs = self.connector.get_hubs_to_do()
-        tasks['articles'] = self.connector.get_articles_to_do()
+        Args:
+            habrs: Habrs, leased to this worker"""
 
-        habs_to_parse = self._check_habs(habs)
-        tasks['habrs'] = habs_to_parse
+        feed = JobFeed(self.worker_id, self.lease_duration)
+        habs_parser = self._get_parser(habrs,
+                                       'habrs',
+                                       validators=self.validators,
+                                       known_articles=self.known_articles,
+                                       article_feed=feed)
+        articles_parser = self._get_parser({}, 'articles', job_feed=feed)
 
-        return tasks
+        async def crawl() -> None:
+            try:
+                await habs_parser.aparse()
+            finally:
+                feed.close()
 
-    def _check_habs(self, habrs: dict) -> dict:
-        """Checks, which Habrs can be executed now (each Habrs have a specific time-window)
+        self.loop.run_until_complete(self._run_stages(crawl(), articles_parser.aparse()))
+        self.logger.flush()
 
-        Args:
-            habrs: Habrs from DB
-        Returns:
-            Only those Habrs, that can be executed now"""
-
-        # This will be Habrs, which can be parsed now (due to their timing, specified in DB)
-        parse_this = {}
-
-        current_dt = datetime.datetime.now()
-        for hab_name, data in habrs.items():
-            last_parsed = data['last_parsed']
-            parse_interval_minutes = data['parse_interval_minutes']
-
-            # In case this Habr have never being parsed before (new Habr)
-            if not last_parsed:
-                parse_this[hab_name] = data
-            else:
-                delta = datetime.timedelta(minutes=parse_interval_minutes)
-                last_parsed_dt = datetime.datetime.strptime(last_parsed, '%Y-%m-%d %H:%M:%S.%f')
-                next_parsing_dt = last_parsed_dt + delta
-                if current_dt >= next_parsing_dt:
-                    parse_this[hab_name] = data
-                else:
-                    msg = f'Hab "{hab_name}" is completed, next schedule is {next_parsing_dt}'
-                    print(msg)
-
-        return parse_this
-
-    def _parse_this(self, parsing_tasks: dict, parsing_type: str) -> None:
-        """Selects a parser and activates it
+    def _get_parser(self, parsing_tasks: dict, parsing_type: str, **parser_kwargs) -> ParserInterface:
+        """Selects a parser and makes it with shared HTTP-client, throttle and pool of processes
 
         Args:
             parsing_tasks: Collection with Habrs or Articles to parse
-            parsing_type: String, that indicates which parser should be used"""
+            parsing_type: String, that indicates which parser should be used
+            parser_kwargs: Additional arguments, that are specific for this parser
+        Returns:
+            Parser with its tasks"""
 
         parser = ParserFactory.get_parser(parsing_type)
         if isinstance(parser, Exception):
             raise Exception
         else:
-            parser = parser(parsing_tasks, self.logger, self.connector)
-            parser.parse()
+            return parser(parsing_tasks,
+                          self.logger,
+                          self.connector,
+                          executor=self.executor,
+                          http_client=self.http_client,
+                          throttle=self.throttle,
+                          single_flight=self.single_flight,
+                          db=self.db,
+                          metrics=self.metrics,
+                          **parser_kwargs)
+
+    async def _run_stages(self, *stages: Awaitable[None]) -> None:
+        """Runs stages (e.g. parsers) at the same time and renews leases of this worker and saves buffered logs, until
+        all of them are done
+
+        Args:
+            stages: Coroutines to run"""
+
+        renewal = asyncio.create_task(self._renew_leases())
+        log_flushes = asyncio.create_task(self._flush_logs())
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in [renewal, log_flushes, *tasks]:
+                task.cancel()
+
+    async def _renew_leases(self) -> None:
+        """Renews leases of this worker three times per lease_duration, so they do not expire, while parsers run"""
+
+        while True:
+            await asyncio.sleep(self.lease_duration.total_seconds() / 3)
+            await self.db.awrite(self.connector.renew_leases, self.worker_id, self.lease_duration)
+
+    async def _flush_logs(self) -> None:
+        """Saves buffered logs, when their flush interval passes, even if parsers log nothing new"""
+
+        if self.logger.sink.flush_interval <= 0:
+            # Every record is saved right away
+            return
+
+        while True:
+            await asyncio.sleep(self.logger.sink.flush_interval)
+            self.logger.flush_due()
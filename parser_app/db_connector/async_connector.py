@@ -0,0 +1,290 @@
+"""Connector, that runs all queries in its own thread, so event loop does not wait for DB"""
+
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+import traceback
+
+from typing import TYPE_CHECKING, Any, Callable, Iterator, NamedTuple, Optional, TypeVar
+
+
+if TYPE_CHECKING:
+    from parser_app.db_connector.connector_interface import IConnector
+    from parser_app.metrics.parser_metrics import ParserMetrics
+
+
+T = TypeVar('T')
+
+
+class DBJob(NamedTuple):
+    """Call of connector's method, waiting to be run in DB's thread
+
+    Attributes:
+        action: Method of connector (or any function, that uses it)
+        args: Arguments of the action
+        future: Future, that gets result of the action
+        grouped: True, if action is a write, that can be committed together with other writes
+        queued_at: Time (perf_counter), the call was queued at"""
+
+    action: Callable[..., Any]
+    args: tuple
+    future: concurrent.futures.Future
+    grouped: bool
+    queued_at: float
+
+
+class AsyncConnector:
+    """Runs methods of a connector in a dedicated thread, one by one, so neither event loop nor parsers wait for disk.
+
+    Connector's connection is made and used only in this thread (connector makes it lazily, on the first query).
+
+    Writes, that are queued one after another, are committed together (see IConnector.group_commit), up to group_size
+    writes per commit. If a group fails, it is rolled back and its writes are run once again one by one, so a single
+    bad write does not lose the others. Reads are run one by one, after the writes, queued before them, are committed.
+
+    Attributes:
+        connector: Connector, which methods are run in DB's thread
+        group_size: Max number of writes, committed together
+        _jobs: Calls, waiting to be run, None to stop the thread
+        _thread: DB's thread, None until start() is called
+        metrics: Durations of calls, their waits in the queue and commits. None to not collect them
+        _stats: Number of reads, writes and commits, made so far"""
+
+    def __init__(self, connector: IConnector, group_size: int, metrics: Optional[ParserMetrics] = None):
+        """Init
+
+        Args:
+            connector: Connector, which methods are run in DB's thread
+            group_size: Max number of writes, committed together
+            metrics: Metrics to collect durations of calls into, None to not collect them"""
+
+        self.connector: IConnector = connector
+        self.group_size: int = max(group_size, 1)
+        self.metrics: Optional[ParserMetrics] = metrics
+        self._jobs: queue.Queue[Optional[DBJob]] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: dict[str, int] = {'reads': 0, 'writes': 0, 'commits': 0}
+
+    def start(self) -> None:
+        """Starts DB's thread"""
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._serve, name='db-connector', daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Runs all queued calls, closes connector's connection and stops DB's thread"""
+
+        if self._thread is not None:
+            self.call(self.connector.close)
+            self._jobs.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def call(self, action: Callable[..., T], *args: Any) -> T:
+        """Runs a method of connector in DB's thread and waits for its result (to be used outside of event loop)
+
+        Args:
+            action: Method of connector (or any function, that uses it)
+            args: Arguments of the action
+        Returns:
+            Whatever action returns"""
+
+        return self._submit(action, args, False).result()
+
+    async def acall(self, action: Callable[..., T], *args: Any) -> T:
+        """Runs a method of connector in DB's thread. Event loop keeps running, while it waits for the result
+
+        Args:
+            action: Method of connector (or any function, that uses it)
+            args: Arguments of the action
+        Returns:
+            Whatever action returns"""
+
+        return await asyncio.wrap_future(self._submit(action, args, False))
+
+    def write(self, action: Callable[..., T], *args: Any) -> concurrent.futures.Future:
+        """Queues a write, that can be committed together with other writes, and returns right away
+
+        Args:
+            action: Method of connector, that writes into DB
+            args: Arguments of the action
+        Returns:
+            Future, that gets the result of the action, after it is committed"""
+
+        return self._submit(action, args, True)
+
+    async def awrite(self, action: Callable[..., T], *args: Any) -> T:
+        """Queues a write, that can be committed together with other writes, and waits, until it is committed. Event
+        loop keeps running in the meantime
+
+        Args:
+            action: Method of connector, that writes into DB
+            args: Arguments of the action
+        Returns:
+            Whatever action returns"""
+
+        return await asyncio.wrap_future(self.write(action, *args))
+
+    def iterate(self, iterator: Iterator[T]) -> Iterator[T]:
+        """Iterates over connector's iterator (e.g. IConnector.iter_articles_to_do) in DB's thread: each next item is
+        loaded there, only when it is requested
+
+        Args:
+            iterator: Iterator, made by a method of connector
+        Yields:
+            Items of the iterator"""
+
+        end = object()
+        while (item := self.call(next, iterator, end)) is not end:
+            yield item
+
+    def stats(self) -> dict[str, int]:
+        """Tells, how many reads and writes were made and how many commits they took
+
+        Returns:
+            Dict with stats"""
+
+        return dict(self._stats)
+
+    def _submit(self, action: Callable[..., Any], args: tuple, grouped: bool) -> concurrent.futures.Future:
+        """Queues a call to be run in DB's thread
+
+        Args:
+            action: Method of connector (or any function, that uses it)
+            args: Arguments of the action
+            grouped: True, if action is a write, that can be committed together with other writes
+        Returns:
+            Future, that gets the result of the action"""
+
+        if self._thread is None:
+            raise RuntimeError('DB-thread is not started')
+
+        future = concurrent.futures.Future()
+        self._jobs.put(DBJob(action, args, future, grouped, time.perf_counter()))
+
+        return future
+
+    def _serve(self) -> None:
+        """DB's thread: takes queued calls and runs them, until None is received"""
+
+        stopping = False
+        while not stopping:
+            jobs = [self._jobs.get()]
+            # Writes, that are already queued, are taken together, to commit them at once
+            while len(jobs) < self.group_size and jobs[-1] is not None:
+                try:
+                    jobs.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            if jobs[-1] is None:
+                stopping = True
+                jobs.pop()
+
+            group = []
+            for job in jobs:
+                if job.grouped:
+                    group.append(job)
+                    continue
+                self._run_group(group)
+                group = []
+                self._run_job(job)
+                self._stats['reads'] += 1
+            self._run_group(group)
+
+    def _run_group(self, group: list[DBJob]) -> None:
+        """Runs writes and commits them together. If any of them fails, they are rolled back and run one by one
+
+        Args:
+            group: Writes to run"""
+
+        if not group:
+            return
+
+        self._stats['writes'] += len(group)
+        if len(group) == 1:
+            self._stats['commits'] += 1
+            self._run_job(group[0])
+            return
+
+        results = []
+        durations = []
+        try:
+            with self.connector.group_commit():
+                for job in group:
+                    started = time.perf_counter()
+                    results.append(job.action(*job.args))
+                    durations.append((started, time.perf_counter() - started))
+                committing = time.perf_counter()
+        except Exception:
+            error = traceback.format_exc()
+            print(error)
+            print(f'Group of {len(group)} writes was rolled back, they are made one by one')
+            self._stats['commits'] += len(group)
+            for job in group:
+                self._run_job(job)
+            return
+
+        self._stats['commits'] += 1
+        # Writes of a rolled back group are measured, when they are run once again
+        if self.metrics is not None:
+            self.metrics.db_commit_seconds.observe(time.perf_counter() - committing)
+            for job, (started, seconds) in zip(group, durations):
+                self._observe(job, started, seconds)
+        for job, result in zip(group, results):
+            job.future.set_result(result)
+
+    def _run_job(self, job: DBJob) -> None:
+        """Runs a single call and passes its result (or error) to its future
+
+        Args:
+            job: Call to run"""
+
+        started = time.perf_counter()
+        try:
+            result = job.action(*job.args)
+        except Exception as e:
+            self._observe(job, started, time.perf_counter() - started, failed=True)
+            job.future.set_exception(e)
+            return
+
+        self._observe(job, started, time.perf_counter() - started)
+        job.future.set_result(result)
+
+    def _observe(self, job: DBJob, started: float, seconds: float, failed: bool = False) -> None:
+        """Adds duration of a call and its wait in the queue to metrics, if there are any
+
+        Args:
+            job: Call, that was run
+            started: Time (perf_counter), the call was started at
+            seconds: Duration of the call
+            failed: True, if the call raised"""
+
+        if self.metrics is None:
+            return
+
+        action = self._action_name(job)
+        self.metrics.db_seconds.observe(seconds, action)
+        self.metrics.db_wait_seconds.observe(started - job.queued_at, 'write' if job.grouped else 'read')
+        if failed:
+            self.metrics.db_errors.inc(action)
+
+    @staticmethod
+    def _action_name(job: DBJob) -> str:
+        """Names a call for metrics: by connector's method, or by method, that made the iterator (see iterate)
+
+        Args:
+            job: Call
+        Returns:
+            Name of the call"""
+
+        if job.action is next and job.args:
+            return getattr(job.args[0], '__name__', 'next')
+
+        return getattr(job.action, '__name__', type(job.action).__name__)
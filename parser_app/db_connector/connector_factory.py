@@ -17,6 +17,11 @@ class ConnectorFactory:
     def get_parser(db_type: str) -> type[IConnector] | LookupError:
         """"""
 
+        if db_type == 'postgres':
+            # psycopg is imported only when PostgreSQL is used, so SQLite does not need it installed
+            from parser_app.db_connector.postgres.postgres_connector import PostgresConnector
+            return PostgresConnector
+
         selected_connector = ConnectorFactory.__connectors.get(db_type, None)
         if not selected_connector:
             selected_connector = LookupError(f'Connector for DB "{db_type}" does not exist!')
@@ -2,23 +2,55 @@
 SQL-dialects."""
 
 
+import contextlib
+import datetime
+import time
 import traceback
 
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, TypeVar
 
 from parser_app.db_connector.sqlite.queries import INSERT_TEMPLATE, INSERT_OR_IGNORE_TEMPLATE, UPDATE_TEMPLATE
-from parser_app.utils.annotation_support import UpdateDict, InsertIgnoreDict
+from parser_app.db_connector.statement_cache import StatementCache
+from parser_app.utils.annotation_support import UpdateDict, InsertIgnoreDict, BulkUpdateDict, BulkInsertIgnoreDict
+
+
+T = TypeVar('T')
 
 
 class IConnector(ABC):
-    """Interface to build different connectors to different DBs"""
+    """Interface to build different connectors to different DBs
+
+    Connection is not probed before each query. Instead, if a query fails with one of _connection_errors, that means
+    broken connection (see _is_broken), connection is recreated and the query is executed once again (see
+    _with_reconnect).
+
+    Writes can be grouped (see group_commit), so many of them are committed at once.
+
+    Attributes:
+        _connection_errors: Errors, which can mean that connection is broken and should be recreated
+        _grouped: True, while writes are grouped (they are not committed one by one then)"""
+
+    _connection_errors: tuple[type[Exception], ...] = ()
+    _grouped: bool = False
 
     @abstractmethod
     def __init__(self, db_file_path: Path):
         self._db_file_path: Path = db_file_path
         self._cur = None
         self._conn = None
+        self._statements = StatementCache(INSERT_TEMPLATE, INSERT_OR_IGNORE_TEMPLATE, UPDATE_TEMPLATE)
+
+    @staticmethod
+    @abstractmethod
+    def from_env() -> 'IConnector':
+        """Makes connector with connection settings, set in .env
+
+        Returns:
+            Connector"""
+
+        pass
 
     @abstractmethod
     def _check_cur(self) -> None:
@@ -32,13 +64,159 @@ class IConnector(ABC):
 
         pass
 
-    def _check_conn(self) -> None:
-        """Checks if connection is still alive. If not — makes new cursor"""
+    @abstractmethod
+    def _reconnect(self) -> None:
+        """Drops broken connection and makes a new one"""
+
+        pass
+
+    def _with_reconnect(self, action: Callable[[], T]) -> T:
+        """Executes action. If connection turns out to be broken, reconnects and executes action once again
+
+        Args:
+            action: Function, that uses self._cur and self._conn
+        Returns:
+            Whatever action returns"""
+
+        self._check_cur()
 
         try:
-            self._cur.execute('SELECT 1')
+            return action()
+        except self._connection_errors as e:
+            if not self._is_broken(e):
+                raise
+            print(f'Connection to DB is broken ({e}), reconnecting...')
+            self._reconnect()
+            return action()
+
+    def _is_broken(self, error: Exception) -> bool:
+        """Tells, if an error from _connection_errors means, that connection is broken (and not, e.g., a mistake in a
+        query, that would fail again after reconnect)
+
+        Args:
+            error: Error, raised by a query
+        Returns:
+            True, if connection should be recreated"""
+
+        return True
+
+    @staticmethod
+    def _group_inserts(get_statement: Callable[[str, tuple[str, ...]], str],
+                       data: BulkInsertIgnoreDict) -> list[tuple[str, list[tuple[Any, ...]]]]:
+        """Groups rows by their columns, so rows with the same columns are inserted with a single parametrized query
+
+        Args:
+            get_statement: Method of StatementCache, that returns SQL-text for a table and columns
+            data: dict, in format {'table_name': '', 'data': [{'col_name': value}, ...]}
+        Returns:
+            Tuples (SQL-text, parameters for each row)"""
+
+        rows_by_columns: dict[tuple[str, ...], list[tuple[Any, ...]]] = {}
+        for row in data['data']:
+            rows_by_columns.setdefault(tuple(row.keys()), []).append(tuple(row.values()))
+
+        return [(get_statement(data['table_name'], columns), rows) for columns, rows in rows_by_columns.items()]
+
+    def _group_updates(self, data: BulkUpdateDict) -> list[tuple[str, list[tuple[Any, ...]]]]:
+        """Groups rows by their updated and conditional columns, so rows with the same columns are updated with a single
+        parametrized query
+
+        Args:
+            data: dict, in format {'table_name': '', 'rows': [{'where': {'col': 'val'}, 'data': {'col': 'val'}}, ...]}
+        Returns:
+            Tuples (SQL-text, parameters for each row)"""
+
+        params_by_columns: dict[tuple[tuple[str, ...], tuple[str, ...]], list[tuple[Any, ...]]] = {}
+        for row in data['rows']:
+            columns = (tuple(row['data'].keys()), tuple(row['where'].keys()))
+            params = (*row['data'].values(), *row['where'].values())
+            params_by_columns.setdefault(columns, []).append(params)
+
+        statements = []
+        for (update_columns, where_columns), params in params_by_columns.items():
+            query = self._statements.update(data['table_name'], update_columns, where_columns)
+            statements.append((query, params))
+
+        return statements
+
+    def _write(self, statements: list[tuple[str, list[tuple[Any, ...]]]]) -> bool:
+        """Executes parametrized statements and commits them in one transaction
+
+        Args:
+            statements: Tuples (SQL-text, parameters for each row)
+        Returns:
+            True, if transaction was committed"""
+
+        def execute_and_commit() -> bool:
+            for query, params in statements:
+                self._cur.executemany(query, params)
+            self._commit()
+            return True
+
+        return self._transaction(execute_and_commit, False)
+
+    def _transaction(self, action: Callable[[], T], default: T) -> T:
+        """Executes action, that ends with commit. If action fails, transaction is rolled back
+
+        Args:
+            action: Function, that uses self._cur and self._conn and commits its changes
+            default: Result in case action fails
+        Returns:
+            Whatever action returns or default"""
+
+        if self._grouped:
+            # Errors are handled by group_commit(), so the whole group is rolled back
+            self._check_cur()
+            return action()
+
+        try:
+            return self._with_reconnect(action)
+
+        except:
+            error = traceback.format_exc()
+            print(error)
+            try:
+                self._conn.rollback()
+            except:
+                pass
+            return default
+
+    def _commit(self) -> None:
+        """Commits current transaction, unless writes are grouped (then the group is committed at once)"""
+
+        if not self._grouped:
+            self._conn.commit()
+
+    @contextlib.contextmanager
+    def group_commit(self) -> Iterator[None]:
+        """Writes, made inside, are committed together, with a single commit at the end. If any of them fails, all of
+        them are rolled back and the error is raised (connection is not recreated inside the group, because the rest of
+        the group would be lost with the broken connection)"""
+
+        self._grouped = True
+        try:
+            yield
+            self._conn.commit()
+        except:
+            try:
+                self._conn.rollback()
+            except:
+                pass
+            raise
+        finally:
+            self._grouped = False
+
+    def close(self) -> None:
+        """Closes connection (a new one is made, if connector is used again)"""
+
+        try:
+            if self._conn is not None:
+                self._conn.close()
         except:
-            self._make_cur()
+            pass
+
+        self._conn = None
+        self._cur = None
 
     @abstractmethod
     def get_hubs_to_do(self) -> dict:
@@ -50,63 +228,175 @@ class IConnector(ABC):
         pass
 
     @abstractmethod
-    def get_articles_to_do(self) -> dict:
-        """Loads articles, that need to be parsed
+    def get_data_version(self) -> Optional[int]:
+        """Returns a number, that changes every time, when User changes Habrs (adds, removes, turns on or off, changes
+        URL or interval) or marks an article to be parsed. Parsing (of this or other workers) does not change it, so
+        schedule is reloaded only when it may have changed
 
         Returns:
-            Articles with their respective data"""
+            Current data version or None, if DB can not tell (then any data should be treated as changed)"""
 
         pass
 
-    def insert(self, data: InsertIgnoreDict) -> None:
-        """Inserts provided data into desired table
+    def wait_for_changes(self, version: Optional[int], timeout: float, poll_interval: float) -> None:
+        """Waits, until data version (see get_data_version) differs from the given one or timeout passes. Connectors,
+        that DB does not notify about changes, check data version once per poll_interval
 
         Args:
-            data: dict, in format {'table_name': '', 'data': {'col_name': value}}"""
+            version: Data version, that caller knows
+            timeout: Max seconds to wait
+            poll_interval: Seconds between two checks of data version"""
 
-        self._check_cur()
+        deadline = time.monotonic() + timeout
+        while self.get_data_version() == version and (remaining := deadline - time.monotonic()) > 0:
+            time.sleep(min(remaining, poll_interval))
 
-        try:
-            columns = data['data'].keys()
-            values = data['data'].values()
+    @abstractmethod
+    def get_known_article_urls(self, urls: list[str]) -> set[str]:
+        """Finds out, which articles are already saved
 
-            # Join column names and values with commas
-            cols = ", ".join(columns)
-            vals = ", ".join(["'{}'".format(v) for v in values])
+        Args:
+            urls: URLs of articles
+        Returns:
+            URLs, that are already saved"""
 
-            # Build the query string
-            query = INSERT_TEMPLATE.format(data['table_name'], cols, vals)
-            self._cur.execute(query)
-            self._conn.commit()
+        pass
 
-        except:
-            error = traceback.format_exc()
-            print(error)
+    @abstractmethod
+    def get_leased_articles(self, urls: list[str], worker_id: str) -> dict[str, int]:
+        """Finds out, which of articles are leased by a worker (e.g. which of just saved articles were not saved before
+        by another worker)
 
-    def insert_or_ignore(self, data: InsertIgnoreDict) -> None:
-        """Inserts data into requested table, in case data is not yet present in table
+        Args:
+            urls: URLs of articles
+            worker_id: Id of the worker
+        Returns:
+            Ids of leased articles by their URLs"""
+
+        pass
+
+    @abstractmethod
+    def iter_articles_to_do(self,
+                            chunk_size: int,
+                            worker_id: str,
+                            lease_duration: datetime.timedelta) -> Iterator[dict]:
+        """Loads articles, that need to be parsed, chunk by chunk (ordered by id), and leases each chunk to a worker,
+        so other workers skip these articles until they are released or lease expires. Next chunk is loaded only when
+        it is requested, so only one chunk is kept in memory
 
         Args:
-            data: dict, in format {'table_name': '', 'data': {'col_name': value}}"""
+            chunk_size: Max number of articles in a chunk
+            worker_id: Id of the worker, that leases articles
+            lease_duration: Time, after which articles can be leased by another worker, unless lease is renewed
+        Yields:
+            Articles with their respective data (habr_id, url, header, article_id and content_hash) by headers"""
 
-        self._check_cur()
+        pass
 
-        try:
-            columns = data['data'].keys()
-            values = data['data'].values()
+    @abstractmethod
+    def claim_habrs(self, habrs: dict, worker_id: str, lease_duration: datetime.timedelta) -> dict:
+        """Leases Habrs to a worker. Habr is not leased, if another worker holds it or has already parsed it within its
+        interval
 
-            # Join column names and values with commas
-            cols = ", ".join(columns)
-            vals = ", ".join(["'{}'".format(v) for v in values])
+        Args:
+            habrs: Habrs with their respective data, as get_hubs_to_do() returns them
+            worker_id: Id of the worker, that leases Habrs
+            lease_duration: Time, after which Habrs can be leased by another worker, unless lease is renewed
+        Returns:
+            Habrs, that were leased"""
 
-            # Build the query string
-            query = INSERT_OR_IGNORE_TEMPLATE.format(data['table_name'], cols, vals)
-            self._cur.execute(query)
-            self._conn.commit()
+        pass
 
-        except:
-            error = traceback.format_exc()
-            print(error)
+    @abstractmethod
+    def renew_leases(self, worker_id: str, lease_duration: datetime.timedelta) -> None:
+        """Extends all leases of a worker
+
+        Args:
+            worker_id: Id of the worker
+            lease_duration: Time from now, after which rows can be leased by another worker"""
+
+        pass
+
+    @abstractmethod
+    def release_articles(self, article_ids: list[int], worker_id: str) -> None:
+        """Releases articles, leased by a worker
+
+        Args:
+            article_ids: Ids of articles
+            worker_id: Id of the worker"""
+
+        pass
+
+    @abstractmethod
+    def release_leases(self, worker_id: str) -> None:
+        """Releases all rows, leased by a worker (e.g. when worker stops)
+
+        Args:
+            worker_id: Id of the worker"""
+
+        pass
+
+    @abstractmethod
+    def iter_article_urls(self, chunk_size: int) -> Iterator[list[str]]:
+        """Loads URLs of all saved articles chunk by chunk (e.g. to fill an in-memory index of saved articles)
+
+        Args:
+            chunk_size: Max number of URLs in a chunk
+        Yields:
+            URLs of articles"""
+
+        pass
+
+    @abstractmethod
+    def bulk_insert(self, data: BulkInsertIgnoreDict) -> bool:
+        """Inserts many rows into requested table, in one transaction
+
+        Args:
+            data: dict, in format {'table_name': '', 'data': [{'col_name': value}, ...]}
+        Returns:
+            True, if rows were saved, False if transaction failed"""
+
+        pass
+
+    @abstractmethod
+    def bulk_insert_or_ignore(self, data: BulkInsertIgnoreDict) -> bool:
+        """Inserts many rows into requested table (skipping rows, that are already present), in one transaction
+
+        Args:
+            data: dict, in format {'table_name': '', 'data': [{'col_name': value}, ...]}
+        Returns:
+            True, if rows were saved (or were already present), False if transaction failed"""
+
+        pass
+
+    @abstractmethod
+    def bulk_update(self, data: BulkUpdateDict) -> bool:
+        """Updates many rows in requested table, in one transaction
+
+        Args:
+            data: dict, in format {'table_name': '', 'rows': [{'where': {'col': 'val'}, 'data': {'col': 'val'}}, ...]}
+        Returns:
+            True, if rows were updated, False if transaction failed"""
+
+        pass
+
+    def insert(self, data: InsertIgnoreDict) -> None:
+        """Inserts provided data into desired table
+
+        Args:
+            data: dict, in format {'table_name': '', 'data': {'col_name': value}}"""
+
+        query = self._statements.insert(data['table_name'], tuple(data['data'].keys()))
+        self._write([(query, [tuple(data['data'].values())])])
+
+    def insert_or_ignore(self, data: InsertIgnoreDict) -> None:
+        """Inserts data into requested table, in case data is not yet present in table
+
+        Args:
+            data: dict, in format {'table_name': '', 'data': {'col_name': value}}"""
+
+        query = self._statements.insert_or_ignore(data['table_name'], tuple(data['data'].keys()))
+        self._write([(query, [tuple(data['data'].values())])])
 
     def update(self, data: UpdateDict) -> None:
         """Updates one row
@@ -114,30 +404,6 @@ class IConnector(ABC):
         Args:
             data: dict, in format {'table_name': '', 'where': {'col': 'val'}, 'data': {'col': 'val'}}"""
 
-        self._check_cur()
-
-        try:
-            table_name = data['table_name']
-            where_clause = data['where']
-            data_dict = data['data']
-
-            # Create the list of updates
-            update_list = [f"{col}=?" for col in data_dict.keys()]
-            update_string = ", ".join(update_list)
-            params = tuple(data_dict.values())
-
-            # Create the list of conditions
-            condition_list = [f"{col}='{val}'" for col, val in where_clause.items()]
-            condition_string = " AND ".join(condition_list)
-
-            # Build the final query string
-            query_string = UPDATE_TEMPLATE.format(
-                table=table_name,
-                updates=update_string,
-                conditions=condition_string)
-            self._cur.execute(query_string, params)
-            self._conn.commit()
-
-        except:
-            error = traceback.format_exc()
-            print(error)
+        query = self._statements.update(data['table_name'], tuple(data['data'].keys()), tuple(data['where'].keys()))
+        params = (*data['data'].values(), *data['where'].values())
+        self._write([(query, [params])])
@@ -0,0 +1,374 @@
+"""Connector for PostgreSQL"""
+
+
+import datetime
+
+from typing import Any, Iterator, Optional
+
+import psycopg
+
+from psycopg import sql
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
+
+from parser_app.db_connector.connector_interface import IConnector
+from parser_app.db_connector.postgres.queries import CLAIM_ARTICLES_CHUNK, GET_HUB_TO_DO, \
+    INSERT_TEMPLATE, INSERT_OR_IGNORE_TEMPLATE, UPDATE_TEMPLATE, COPY_TEMPLATE, GET_KNOWN_ARTICLE_URLS, \
+    GET_LEASED_ARTICLES, GET_ARTICLE_URLS, CLAIM_HABR, RENEW_LEASES_TEMPLATE, RELEASE_ARTICLE, \
+    RELEASE_LEASES_TEMPLATE, LEASED_TABLES, SET_TIME_ZONE_TEMPLATE, LISTEN_CHANGES
+from parser_app.db_connector.statement_cache import StatementCache
+from parser_app.utils.annotation_support import BulkInsertIgnoreDict, BulkUpdateDict
+from parser_app.utils.constants import PG_HOST, PG_PORT, PG_NAME, PG_USER, PG_PASSWORD, PG_POOL_MIN_SIZE, \
+    PG_POOL_MAX_SIZE, PG_CURSOR_ITERSIZE
+from parser_app.utils.env_reader import EnvReader
+
+
+class PostgresConnector(IConnector):
+    """Connector for PostgreSQL
+
+    Connections are taken from a pool: connector keeps one of them for its queries and returns it into the pool, when it
+    breaks (pool checks connections before giving them out and replaces broken ones). Big reads (to-do queries, URLs
+    of all articles) are made with server-side cursors on a separate connection from the pool, so rows are sent chunk
+    by chunk, and connector's own connection can be used in between.
+
+    Logs are saved with COPY, other bulk writes are sent with executemany (in pipeline mode, so all rows take a single
+    round trip).
+
+    Naive DTs, that parser uses, are read and written in the local time zone of this machine (see _configure).
+
+    Data version is kept by connector: it listens to notifications, that tables send, when User changes them, and
+    counts those, sent by other connections (see get_data_version). Idle worker blocks on them (see wait_for_changes)
+    instead of polling DB.
+
+    Attributes:
+        conninfo: Connection string
+        pool_min_size: Number of connections, that pool keeps open
+        pool_max_size: Max number of connections in pool
+        cursor_itersize: Number of rows, that server-side cursor sends at once
+        _pool: Pool of connections, made on the first query
+        _conn: Connection-object, taken from pool
+        _cur: Cursor
+        _statements: Cache of parametrized SQL-texts
+        _data_version: Number of changes, made by other connections, that connector has noticed so far
+        _listening: True, if connector's connection listens to notifications about changes"""
+
+    _connection_errors = (psycopg.OperationalError, psycopg.InterfaceError)
+
+    def __init__(self, conninfo: str, pool_min_size: int = 1, pool_max_size: int = 4, cursor_itersize: int = 2000):
+        """Init
+
+        Args:
+            conninfo: Connection string, e.g. 'host=localhost dbname=habr_parser user=postgres'
+            pool_min_size: Number of connections, that pool keeps open
+            pool_max_size: Max number of connections in pool (connector's own one, and one per open server-side
+                cursor)
+            cursor_itersize: Number of rows, that server-side cursor sends at once"""
+
+        self.conninfo: str = conninfo
+        self.pool_min_size: int = max(pool_min_size, 1)
+        self.pool_max_size: int = max(pool_max_size, self.pool_min_size, 2)
+        self.cursor_itersize: int = cursor_itersize
+        self._pool: Optional[ConnectionPool] = None
+        self._conn: Optional[psycopg.Connection] = None
+        self._cur: Optional[psycopg.Cursor] = None
+        self._statements = StatementCache(INSERT_TEMPLATE, INSERT_OR_IGNORE_TEMPLATE, UPDATE_TEMPLATE, placeholder='%s')
+        self._data_version: int = 0
+        self._listening: bool = False
+
+    @staticmethod
+    def from_env() -> 'PostgresConnector':
+        """Makes connector with connection settings, set in .env
+
+        Returns:
+            Connector"""
+
+        conninfo = make_conninfo(
+            host=EnvReader.get_str('PG_HOST', PG_HOST),
+            port=EnvReader.get_int('PG_PORT', PG_PORT),
+            dbname=EnvReader.get_str('PG_NAME', PG_NAME),
+            user=EnvReader.get_str('PG_USER', PG_USER),
+            password=EnvReader.get_str('PG_PASSWORD', PG_PASSWORD)
+        )
+
+        return PostgresConnector(
+            conninfo=conninfo,
+            pool_min_size=EnvReader.get_int('PG_POOL_MIN_SIZE', PG_POOL_MIN_SIZE),
+            pool_max_size=EnvReader.get_int('PG_POOL_MAX_SIZE', PG_POOL_MAX_SIZE),
+            cursor_itersize=EnvReader.get_int('PG_CURSOR_ITERSIZE', PG_CURSOR_ITERSIZE)
+        )
+
+    def _check_cur(self) -> None:
+        """Makes cursor, if there is none yet"""
+
+        try:
+            if not self._cur:
+                self._make_cur()
+        except Exception as e:
+            print(e)
+
+    def _make_cur(self) -> None:
+        """Takes a connection from pool (makes pool, if there is none yet) and saves its cursor to self._cur"""
+
+        if self._conn is None:
+            self._conn = self._get_pool().getconn()
+        self._cur = self._conn.cursor()
+
+    def _get_pool(self) -> ConnectionPool:
+        """Makes pool of connections on the first use and waits, until it has pool_min_size connections
+
+        Returns:
+            Pool of connections"""
+
+        if self._pool is None:
+            self._pool = ConnectionPool(self.conninfo,
+                                        min_size=self.pool_min_size,
+                                        max_size=self.pool_max_size,
+                                        configure=self._configure,
+                                        check=ConnectionPool.check_connection,
+                                        name='parser_app',
+                                        open=True)
+            self._pool.wait()
+            print(f'PostgreSQL pool is open: {self._pool.get_stats()}')
+
+        return self._pool
+
+    @staticmethod
+    def _configure(conn: psycopg.Connection) -> None:
+        """Sets session's time zone to the local one, so naive DTs mean the same for parser and for DB. Is called by
+        pool for each new connection
+
+        Args:
+            conn: New connection"""
+
+        offset = datetime.datetime.now().astimezone().strftime('%z')
+        conn.execute(sql.SQL(SET_TIME_ZONE_TEMPLATE).format(sql.Literal(f'{offset[:3]}:{offset[3:]}')))
+        # Pool requires connection to be idle, when it is configured
+        conn.commit()
+
+    def _reconnect(self) -> None:
+        """Returns broken connection into pool (pool drops it) and takes another one"""
+
+        try:
+            self._get_pool().putconn(self._conn)
+        except:
+            pass
+
+        self._conn = None
+        self._cur = None
+        self._listening = False
+        self._make_cur()
+
+    def _read(self, query: str, params: Any = None) -> list[tuple]:
+        """Runs a query on connector's connection and ends its transaction, so connection is not left idle in it
+
+        Args:
+            query: Query to run
+            params: Parameters of the query
+        Returns:
+            Rows"""
+
+        rows = self._with_reconnect(lambda: self._cur.execute(query, params).fetchall())
+        self._commit()
+
+        return rows
+
+    def _iter_server_side(self, query: str, params: Any = None, chunk_size: Optional[int] = None) -> Iterator[list]:
+        """Runs a query with a server-side cursor on a separate connection from pool: rows are sent by DB chunk by
+        chunk, only when they are requested
+
+        Args:
+            query: Query to run
+            params: Parameters of the query
+            chunk_size: Number of rows in a chunk, None to use cursor_itersize
+        Yields:
+            Rows"""
+
+        chunk_size = chunk_size or self.cursor_itersize
+        with self._get_pool().connection() as conn:
+            with conn.cursor(name='parser_app_cursor') as cur:
+                cur.itersize = chunk_size
+                cur.execute(query, params)
+                while rows := cur.fetchmany(chunk_size):
+                    yield rows
+
+    def _receive_changes(self, timeout: float) -> int:
+        """Counts notifications about changes, sent by other connections, as one change. Starts to listen to them, if
+        connection does not listen yet
+
+        Args:
+            timeout: Max seconds to wait for a notification of another connection, 0 to take only received ones
+        Returns:
+            Data version"""
+
+        if not self._listening:
+            self._cur.execute(LISTEN_CHANGES)
+            self._conn.commit()
+            self._listening = True
+            # Changes, made before connection started to listen, are missed, so everything is treated as changed
+            self._data_version += 1
+            return self._data_version
+
+        own_pid = self._conn.info.backend_pid
+        notifies = self._conn.notifies(timeout=timeout)
+        try:
+            changed = any(notify.pid != own_pid for notify in notifies)
+        finally:
+            # Generator holds connection's lock, until it is closed
+            notifies.close()
+
+        if changed:
+            # Notifications, that are already received too, are about the same changes
+            list(self._conn.notifies(timeout=0))
+            self._data_version += 1
+
+        return self._data_version
+
+    @staticmethod
+    def _to_local(dt: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+        """Makes DT, read from DB, naive (in the local time zone, as parser's own DTs are)
+
+        Args:
+            dt: DT with session's time zone or None
+        Returns:
+            Naive DT or None"""
+
+        if dt is None:
+            return None
+
+        return dt.astimezone().replace(tzinfo=None)
+
+    # PUBLIC
+
+    def close(self) -> None:
+        if self._pool is None:
+            return
+
+        try:
+            if self._conn is not None:
+                self._pool.putconn(self._conn)
+        except:
+            pass
+
+        self._conn = None
+        self._cur = None
+        self._listening = False
+        self._pool.close()
+        self._pool = None
+
+    def get_hubs_to_do(self) -> dict:
+        results = {}
+        for rows in self._iter_server_side(GET_HUB_TO_DO):
+            for row in rows:
+                results[row[0]] = {
+                    'url': row[1],
+                    'last_parsed': self._to_local(row[2]),
+                    'parse_interval_minutes': row[3],
+                    'hab_id': row[4],
+                }
+
+        return results
+
+    def get_data_version(self) -> Optional[int]:
+        return self._with_reconnect(lambda: self._receive_changes(0))
+
+    def wait_for_changes(self, version: Optional[int], timeout: float, poll_interval: float) -> None:
+        # DB notifies about changes, so there is nothing to poll
+        def wait() -> None:
+            if self._receive_changes(0) == version:
+                self._receive_changes(timeout)
+
+        self._with_reconnect(wait)
+
+    def get_known_article_urls(self, urls: list[str]) -> set[str]:
+        rows = self._read(GET_KNOWN_ARTICLE_URLS, (urls, ))
+
+        return {row[0] for row in rows}
+
+    def get_leased_articles(self, urls: list[str], worker_id: str) -> dict[str, int]:
+        rows = self._read(GET_LEASED_ARTICLES, (urls, worker_id))
+
+        return dict(rows)
+
+    def iter_articles_to_do(self,
+                            chunk_size: int,
+                            worker_id: str,
+                            lease_duration: datetime.timedelta) -> Iterator[dict]:
+        last_id = 0
+        while True:
+            now = datetime.datetime.now()
+            params = (worker_id, now + lease_duration, last_id, now, chunk_size)
+
+            def claim() -> list[tuple]:
+                claimed = self._cur.execute(CLAIM_ARTICLES_CHUNK, params).fetchall()
+                self._commit()
+                return claimed
+
+            rows = self._transaction(claim, [])
+            if not rows:
+                return
+
+            # RETURNING does not keep the order of rows
+            rows.sort(key=lambda row: row[3])
+            results = {}
+            for row in rows:
+                results[row[0]] = {
+                    'habr_id': row[1],
+                    'url': row[2],
+                    'header': row[0],
+                    'article_id': row[3],
+                    'content_hash': row[4]
+                }
+            last_id = rows[-1][3]
+
+            yield results
+
+            if len(rows) < chunk_size:
+                return
+
+    def iter_article_urls(self, chunk_size: int) -> Iterator[list[str]]:
+        for rows in self._iter_server_side(GET_ARTICLE_URLS, chunk_size=chunk_size):
+            yield [row[0] for row in rows]
+
+    def claim_habrs(self, habrs: dict, worker_id: str, lease_duration: datetime.timedelta) -> dict:
+        now = datetime.datetime.now()
+
+        def claim() -> dict:
+            claimed = {}
+            for hab_name, data in habrs.items():
+                parsed_before = now - datetime.timedelta(minutes=data['parse_interval_minutes'])
+                params = (worker_id, now + lease_duration, data['hab_id'], now, worker_id, parsed_before)
+                if self._cur.execute(CLAIM_HABR, params).rowcount == 1:
+                    claimed[hab_name] = data
+            self._commit()
+            return claimed
+
+        return self._transaction(claim, {})
+
+    def renew_leases(self, worker_id: str, lease_duration: datetime.timedelta) -> None:
+        lease_expires = datetime.datetime.now() + lease_duration
+        self._write([(RENEW_LEASES_TEMPLATE.format(table), [(lease_expires, worker_id)]) for table in LEASED_TABLES])
+
+    def release_articles(self, article_ids: list[int], worker_id: str) -> None:
+        self._write([(RELEASE_ARTICLE, [(article_id, worker_id) for article_id in article_ids])])
+
+    def release_leases(self, worker_id: str) -> None:
+        self._write([(RELEASE_LEASES_TEMPLATE.format(table), [(worker_id, )]) for table in LEASED_TABLES])
+
+    def bulk_insert(self, data: BulkInsertIgnoreDict) -> bool:
+        copies = self._group_inserts(lambda table, columns: COPY_TEMPLATE.format(table, ', '.join(columns)), data)
+
+        def copy_and_commit() -> bool:
+            for query, rows in copies:
+                with self._cur.copy(query) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+            self._commit()
+            return True
+
+        return self._transaction(copy_and_commit, False)
+
+    def bulk_insert_or_ignore(self, data: BulkInsertIgnoreDict) -> bool:
+        return self._write(self._group_inserts(self._statements.insert_or_ignore, data))
+
+    def bulk_update(self, data: BulkUpdateDict) -> bool:
+        return self._write(self._group_updates(data))
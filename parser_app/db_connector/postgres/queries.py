@@ -0,0 +1,74 @@
+"""File with queries for PostgreSQL"""
+
+
+GET_ARTICLES_TO_CLAIM = 'SELECT id ' \
+                        'FROM db_manager_articles ' \
+                        'WHERE parse_this = true AND id > %s AND (lease_expires IS NULL OR lease_expires < %s) ' \
+                        'ORDER BY id ' \
+                        'LIMIT %s ' \
+                        'FOR UPDATE SKIP LOCKED'
+"""Query to get ids of the next chunk of articles, that have 'parse_this' = true and are not leased by any worker
+(keyset pagination: id of the last article of the previous chunk, current DT and size of a chunk). Articles, that
+another worker is leasing right now, are skipped instead of waiting for it"""
+
+CLAIM_ARTICLES_CHUNK = 'UPDATE db_manager_articles ' \
+                       'SET lease_owner = %s, lease_expires = %s ' \
+                       f'WHERE id IN ({GET_ARTICLES_TO_CLAIM}) ' \
+                       'RETURNING header, habr_id, url, id, content_hash'
+"""Query to lease the next chunk of articles to a worker and get them (worker id, lease expiry DT, and then parameters
+of GET_ARTICLES_TO_CLAIM)"""
+
+CLAIM_HABR = 'UPDATE db_manager_habrs ' \
+             'SET lease_owner = %s, lease_expires = %s ' \
+             'WHERE id = %s AND (lease_expires IS NULL OR lease_expires < %s OR lease_owner = %s) ' \
+             'AND (last_parsed IS NULL OR last_parsed <= %s)'
+"""Query to lease a Habr to a worker (worker id, lease expiry DT, Habr's id, current DT, worker id, DT, before which
+Habr should have been parsed last time). Habr is not leased, if another worker holds it or has already parsed it"""
+
+RENEW_LEASES_TEMPLATE = 'UPDATE {} SET lease_expires = %s WHERE lease_owner = %s'
+"""Template of a query to extend all leases of a worker (lease expiry DT and worker id)"""
+
+RELEASE_ARTICLE = 'UPDATE db_manager_articles ' \
+                  'SET lease_owner = NULL, lease_expires = NULL ' \
+                  'WHERE id = %s AND lease_owner = %s'
+"""Query to release an article, leased by a worker (article's id and worker id)"""
+
+RELEASE_LEASES_TEMPLATE = 'UPDATE {} SET lease_owner = NULL, lease_expires = NULL WHERE lease_owner = %s'
+"""Template of a query to release all rows, leased by a worker (worker id)"""
+
+LEASED_TABLES = ('db_manager_habrs', 'db_manager_articles')
+"""Tables, which rows are leased to workers"""
+
+GET_HUB_TO_DO = 'SELECT name, url, last_parsed, parse_interval_minutes, id ' \
+                'FROM db_manager_habrs ' \
+                'WHERE is_active = true'
+"""Query to get Habrs, that are activated by User"""
+
+GET_KNOWN_ARTICLE_URLS = 'SELECT url FROM db_manager_articles WHERE url = ANY(%s)'
+"""Query to find, which of provided URLs (passed as one array) are already saved"""
+
+GET_LEASED_ARTICLES = 'SELECT url, id FROM db_manager_articles WHERE url = ANY(%s) AND lease_owner = %s'
+"""Query to find, which of provided URLs (passed as one array) are leased by a worker (worker id)"""
+
+GET_ARTICLE_URLS = 'SELECT url FROM db_manager_articles ORDER BY id'
+"""Query to get URLs of all saved articles (is read with a server-side cursor, chunk by chunk)"""
+
+LISTEN_CHANGES = 'LISTEN db_manager_changes'
+"""Query to receive notifications, that Habrs and articles send, when User changes them (db_manager's migrations 0010
+and 0012)"""
+
+SET_TIME_ZONE_TEMPLATE = "SET TIME ZONE INTERVAL {} HOUR TO MINUTE"
+"""Template of a query to set session's time zone to an offset from UTC, e.g. '+03:00' (naive DTs are read and written
+in it). SET can not be parametrized, so offset is put into SQL-text as a literal"""
+
+COPY_TEMPLATE = "COPY {} ({}) FROM STDIN"
+"""Template to be used, to create a 'COPY-query', that loads many rows at once"""
+
+INSERT_TEMPLATE = "INSERT INTO {}({}) VALUES ({})"
+"""Template to be used, to create an 'INSERT-query'"""
+
+INSERT_OR_IGNORE_TEMPLATE = "INSERT INTO {}({}) VALUES ({}) ON CONFLICT DO NOTHING"
+"""Template to be used, to create an 'INSERT-query', that skips rows, that violate unique constraints"""
+
+UPDATE_TEMPLATE = "UPDATE {table} SET {updates} WHERE {conditions};"
+"""Template to be used, to create an 'UPDATE-query'"""
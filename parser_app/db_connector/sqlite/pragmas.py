@@ -0,0 +1,138 @@
+"""Connection profile (pragmas) for SQLite"""
+
+
+import sqlite3
+
+from typing import Any
+
+from parser_app.utils.constants import SQLITE_JOURNAL_MODE, SQLITE_BUSY_TIMEOUT, SQLITE_SYNCHRONOUS, \
+    SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE, SQLITE_TEMP_STORE
+from parser_app.utils.env_reader import EnvReader
+
+
+class SQLitePragmas:
+    """Connection profile for SQLite. DB-file is shared by parser and admin-panel, so both of them should use it: WAL
+    lets readers and a writer work at the same time, and busy_timeout makes a connection wait for a lock instead of
+    failing with 'database is locked'.
+
+    Attributes:
+        journal_mode: Journal mode ('WAL', 'DELETE', ...). Is saved in DB-file, so affects all connections
+        busy_timeout: Milliseconds to wait for a lock, before failing
+        synchronous: How often SQLite waits for data to reach disk ('NORMAL' is safe with WAL)
+        mmap_size: Bytes of DB-file, that can be read through memory-mapping (0 to turn it off)
+        cache_size: Size of page-cache (negative value is in KiB, positive is in pages)
+        temp_store: Where temporary tables and indexes are kept ('DEFAULT', 'FILE' or 'MEMORY')"""
+
+    JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+    SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+    TEMP_STORES = ('DEFAULT', 'FILE', 'MEMORY')
+
+    def __init__(self,
+                 journal_mode: str,
+                 busy_timeout: int,
+                 synchronous: str,
+                 mmap_size: int,
+                 cache_size: int,
+                 temp_store: str):
+        """Init
+
+        Args:
+            journal_mode: Journal mode, one of JOURNAL_MODES
+            busy_timeout: Milliseconds to wait for a lock, before failing
+            synchronous: One of SYNCHRONOUS_MODES
+            mmap_size: Bytes of DB-file, that can be read through memory-mapping
+            cache_size: Size of page-cache (negative value is in KiB, positive is in pages)
+            temp_store: One of TEMP_STORES"""
+
+        # Pragmas can not be parametrized, so values are checked before they get into SQL
+        self.journal_mode: str = self._check_choice('journal_mode', journal_mode, self.JOURNAL_MODES)
+        self.busy_timeout: int = int(busy_timeout)
+        self.synchronous: str = self._check_choice('synchronous', synchronous, self.SYNCHRONOUS_MODES)
+        self.mmap_size: int = int(mmap_size)
+        self.cache_size: int = int(cache_size)
+        self.temp_store: str = self._check_choice('temp_store', temp_store, self.TEMP_STORES)
+
+    @staticmethod
+    def from_env() -> 'SQLitePragmas':
+        """Makes profile from variables, set in .env
+
+        Returns:
+            Connection profile"""
+
+        return SQLitePragmas(
+            journal_mode=EnvReader.get_str('SQLITE_JOURNAL_MODE', SQLITE_JOURNAL_MODE),
+            busy_timeout=EnvReader.get_int('SQLITE_BUSY_TIMEOUT', SQLITE_BUSY_TIMEOUT),
+            synchronous=EnvReader.get_str('SQLITE_SYNCHRONOUS', SQLITE_SYNCHRONOUS),
+            mmap_size=EnvReader.get_int('SQLITE_MMAP_SIZE', SQLITE_MMAP_SIZE),
+            cache_size=EnvReader.get_int('SQLITE_CACHE_SIZE', SQLITE_CACHE_SIZE),
+            temp_store=EnvReader.get_str('SQLITE_TEMP_STORE', SQLITE_TEMP_STORE)
+        )
+
+    def apply(self, conn: sqlite3.Connection) -> None:
+        """Applies profile to a connection
+
+        Args:
+            conn: Connection to SQLite"""
+
+        # busy_timeout goes first, so switching journal mode can wait for other connections
+        conn.execute(f'PRAGMA busy_timeout = {self.busy_timeout}')
+        conn.execute(f'PRAGMA journal_mode = {self.journal_mode}')
+        conn.execute(f'PRAGMA synchronous = {self.synchronous}')
+        conn.execute(f'PRAGMA mmap_size = {self.mmap_size}')
+        conn.execute(f'PRAGMA cache_size = {self.cache_size}')
+        conn.execute(f'PRAGMA temp_store = {self.temp_store}')
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns profile in the same form, as report() does
+
+        Returns:
+            Dict with pragmas and their values"""
+
+        return {
+            'journal_mode': self.journal_mode.lower(),
+            'busy_timeout': self.busy_timeout,
+            'synchronous': self.synchronous,
+            'mmap_size': self.mmap_size,
+            'cache_size': self.cache_size,
+            'temp_store': self.temp_store
+        }
+
+    @staticmethod
+    def report(conn: sqlite3.Connection) -> dict[str, Any]:
+        """Reads pragmas, that are actually in effect for a connection
+
+        Args:
+            conn: Connection to SQLite
+        Returns:
+            Dict with pragmas and their values"""
+
+        def read(pragma: str) -> Any:
+            # Some pragmas return nothing, when they are not supported (e.g. mmap_size for in-memory DB)
+            row = conn.execute(f'PRAGMA {pragma}').fetchone()
+            return row[0] if row else None
+
+        return {
+            'journal_mode': read('journal_mode'),
+            'busy_timeout': read('busy_timeout'),
+            'synchronous': SQLitePragmas.SYNCHRONOUS_MODES[read('synchronous')],
+            'mmap_size': read('mmap_size'),
+            'cache_size': read('cache_size'),
+            'temp_store': SQLitePragmas.TEMP_STORES[read('temp_store')]
+        }
+
+    @staticmethod
+    def _check_choice(pragma: str, value: str, choices: tuple[str, ...]) -> str:
+        """Checks, that value is one of allowed values for a pragma
+
+        Args:
+            pragma: Name of the pragma
+            value: Value to check
+            choices: Allowed values
+        Returns:
+            Value in upper case"""
+
+        value = value.upper()
+        if value not in choices:
+            raise LookupError(f'Value "{value}" is not allowed for SQLite pragma "{pragma}", use one of {choices}')
+
+        return value
@@ -1,16 +1,77 @@
 """File with queries"""
 
 
-GET_ARTICLE_TO_DO = 'SELECT header, habr_id, url ' \
-                    'FROM db_manager_articles ' \
-                    'WHERE parse_this = 1'
-"""Query to get articles, that have 'parse_this' = 1"""
+GET_ARTICLES_TO_CLAIM = 'SELECT id ' \
+                        'FROM db_manager_articles ' \
+                        'WHERE parse_this = 1 AND id > ? AND (lease_expires IS NULL OR lease_expires < ?) ' \
+                        'ORDER BY id ' \
+                        'LIMIT ?'
+"""Query to get ids of the next chunk of articles, that have 'parse_this' = 1 and are not leased by any worker (keyset
+pagination: id of the last article of the previous chunk, current DT and size of a chunk)"""
+
+CLAIM_ARTICLES_CHUNK = 'UPDATE db_manager_articles ' \
+                       'SET lease_owner = ?, lease_expires = ? ' \
+                       f'WHERE id IN ({GET_ARTICLES_TO_CLAIM}) ' \
+                       'RETURNING header, habr_id, url, id, content_hash'
+"""Query to lease the next chunk of articles to a worker and get them (worker id, lease expiry DT, and then parameters
+of GET_ARTICLES_TO_CLAIM). It is a single statement, so two workers can never lease the same article"""
+
+CLAIM_HABR = 'UPDATE db_manager_habrs ' \
+             'SET lease_owner = ?, lease_expires = ? ' \
+             'WHERE id = ? AND (lease_expires IS NULL OR lease_expires < ? OR lease_owner = ?) ' \
+             'AND (last_parsed IS NULL OR last_parsed <= ?)'
+"""Query to lease a Habr to a worker (worker id, lease expiry DT, Habr's id, current DT, worker id, DT, before which
+Habr should have been parsed last time). Habr is not leased, if another worker holds it or has already parsed it"""
+
+RENEW_LEASES_TEMPLATE = 'UPDATE {} SET lease_expires = ? WHERE lease_owner = ?'
+"""Template of a query to extend all leases of a worker (lease expiry DT and worker id). Leased articles are found with
+partial index from db_manager's migration 0009"""
+
+RELEASE_ARTICLE = 'UPDATE db_manager_articles ' \
+                  'SET lease_owner = NULL, lease_expires = NULL ' \
+                  'WHERE id = ? AND lease_owner = ?'
+"""Query to release an article, leased by a worker (article's id and worker id)"""
+
+RELEASE_LEASES_TEMPLATE = 'UPDATE {} SET lease_owner = NULL, lease_expires = NULL WHERE lease_owner = ?'
+"""Template of a query to release all rows, leased by a worker (worker id)"""
+
+LEASED_TABLES = ('db_manager_habrs', 'db_manager_articles')
+"""Tables, which rows are leased to workers"""
 
 GET_HUB_TO_DO = 'SELECT name, url, last_parsed, parse_interval_minutes, id ' \
                 'FROM db_manager_habrs ' \
                 'WHERE is_active = true'
 """Query to get Habrs, that are activated by User"""
 
+SCHEDULER_QUERIES = (GET_ARTICLES_TO_CLAIM, GET_HUB_TO_DO)
+"""Queries, that are run on every DB check. They must be served by partial indexes (db_manager's migrations 0006, 0007
+and 0009), so their WHERE-terms must stay the same as in those indexes"""
+
+GET_KNOWN_ARTICLE_URLS_TEMPLATE = 'SELECT url FROM db_manager_articles WHERE url IN ({})'
+"""Template of a query to find, which of provided URLs are already saved (is served by index from db_manager's
+migration 0008)"""
+
+GET_LEASED_ARTICLES_TEMPLATE = 'SELECT url, id FROM db_manager_articles WHERE url IN ({}) AND lease_owner = ?'
+"""Template of a query to find, which of provided URLs are leased by a worker (worker id is the last parameter)"""
+
+KNOWN_ARTICLE_URLS_CHUNK_SIZE = 500
+"""Max number of URLs in one query (SQLite limits the number of parameters)"""
+
+GET_ARTICLE_URLS_CHUNK = 'SELECT id, url ' \
+                         'FROM db_manager_articles ' \
+                         'WHERE id > ? ' \
+                         'ORDER BY id ' \
+                         'LIMIT ?'
+"""Query to get next chunk of URLs of all saved articles (keyset pagination: id of the last article of the previous
+chunk and size of a chunk)"""
+
+GET_DATA_VERSION = 'SELECT version FROM db_manager_changes'
+"""Query to get a number, that triggers increment, when User changes Habrs or marks an article to be parsed
+(db_manager's migration 0012)"""
+
+EXPLAIN_QUERY_PLAN_TEMPLATE = "EXPLAIN QUERY PLAN {}"
+"""Template to get a plan of a query"""
+
 INSERT_TEMPLATE = "INSERT INTO {}({}) VALUES ({})"
 """Template to be used, to create an 'INSERT-query'"""
 
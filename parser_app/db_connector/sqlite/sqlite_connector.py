@@ -1,12 +1,22 @@
 """Connector for SQLite dialect DB"""
 
 
+import datetime
+import os
 import sqlite3
 
 from pathlib import Path
+from typing import Any, Iterator, Optional
 
 from parser_app.db_connector.connector_interface import IConnector
-from parser_app.db_connector.sqlite.queries import GET_ARTICLE_TO_DO, GET_HUB_TO_DO
+from parser_app.db_connector.sqlite.pragmas import SQLitePragmas
+from parser_app.db_connector.sqlite.queries import CLAIM_ARTICLES_CHUNK, GET_HUB_TO_DO, INSERT_TEMPLATE, \
+    INSERT_OR_IGNORE_TEMPLATE, UPDATE_TEMPLATE, SCHEDULER_QUERIES, EXPLAIN_QUERY_PLAN_TEMPLATE, \
+    GET_DATA_VERSION, GET_KNOWN_ARTICLE_URLS_TEMPLATE, KNOWN_ARTICLE_URLS_CHUNK_SIZE, GET_ARTICLE_URLS_CHUNK, \
+    CLAIM_HABR, RENEW_LEASES_TEMPLATE, RELEASE_ARTICLE, RELEASE_LEASES_TEMPLATE, LEASED_TABLES, \
+    GET_LEASED_ARTICLES_TEMPLATE
+from parser_app.db_connector.statement_cache import StatementCache
+from parser_app.utils.annotation_support import BulkInsertIgnoreDict, BulkUpdateDict
 
 
 class SQLiteFromFileConnector(IConnector):
@@ -15,25 +25,42 @@ class SQLiteFromFileConnector(IConnector):
     Attributes:
         db_file_path: Path to DB (file)
         _conn: Connection-object
-        _cur: Cursor"""
+        _cur: Cursor
+        _statements: Cache of parametrized SQL-texts
+        pragmas: Connection profile, applied to each new connection
+        _diagnosed_files: DB-files, which pragmas and query plans were already printed by this process"""
 
-    def __init__(self, db_file_path: Path):
+    _connection_errors = (sqlite3.ProgrammingError, )
+    _diagnosed_files: set[str] = set()
+
+    def __init__(self, db_file_path: Path, pragmas: Optional[SQLitePragmas] = None):
         """Init
 
         Args:
-            db_file_path: Path to file with DB"""
+            db_file_path: Path to file with DB
+            pragmas: Connection profile, None to use profile, set in .env"""
 
         self.db_file_path = db_file_path
+        self.pragmas: SQLitePragmas = pragmas or SQLitePragmas.from_env()
         self._conn = None
         self._cur = None
+        self._statements = StatementCache(INSERT_TEMPLATE, INSERT_OR_IGNORE_TEMPLATE, UPDATE_TEMPLATE)
+
+    @staticmethod
+    def from_env() -> 'SQLiteFromFileConnector':
+        """Makes connector to DB-file, set in .env
+
+        Returns:
+            Connector"""
+
+        return SQLiteFromFileConnector(Path(os.getenv('DB_FILE_PATH')))
 
     def _check_cur(self) -> None:
-        """Checks connection and returns cursor"""
+        """Makes cursor, if there is none yet"""
 
         try:
             if not self._cur:
                 self._make_cur()
-            self._check_conn()
         except Exception as e:
             print(e)
 
@@ -41,15 +68,63 @@ class SQLiteFromFileConnector(IConnector):
         """Makes new cursor and saves it to self._cur"""
 
         if self._conn is None:
-            self._conn = sqlite3.connect(self.db_file_path)
+            self._conn = sqlite3.connect(self.db_file_path, timeout=self.pragmas.busy_timeout / 1000)
+            self.pragmas.apply(self._conn)
+            # Pragmas and plans are the same for every connection to the file, so reconnects do not print them again
+            if str(self.db_file_path) not in SQLiteFromFileConnector._diagnosed_files:
+                SQLiteFromFileConnector._diagnosed_files.add(str(self.db_file_path))
+                self._check_pragmas()
+                self._check_query_plans()
         self._cur = self._conn.cursor()
 
+    def _check_pragmas(self) -> None:
+        """Prints pragmas, that are in effect for current connection, and warns about those, that differ from profile"""
+
+        in_effect = self.get_pragmas()
+        print(f'SQLite pragmas in effect: {in_effect}')
+
+        for pragma, expected in self.pragmas.as_dict().items():
+            if in_effect[pragma] != expected:
+                print(f'WARNING: SQLite pragma "{pragma}" is {in_effect[pragma]}, but {expected} was requested')
+
+    def _check_query_plans(self) -> None:
+        """Prints plans of queries, that are run on every DB check, and warns about those, that scan a whole table"""
+
+        for query in SCHEDULER_QUERIES:
+            params = (0, ) * query.count('?')
+            plan = self.explain_query_plan(query, params)
+            print(f'Query plan for "{query}": {plan}')
+
+            if any(step.startswith('SCAN') and 'INDEX' not in step for step in plan):
+                print('WARNING: query scans a whole table, apply db_manager migrations to create indexes')
+
+    def _is_broken(self, error: Exception) -> bool:
+        """Tells, if connection is closed. Other ProgrammingErrors (wrong number of parameters, etc.) are mistakes in
+        code and are raised as they are
+
+        Args:
+            error: Error, raised by a query
+        Returns:
+            True, if connection should be recreated"""
+
+        return 'closed database' in str(error) or 'closed cursor' in str(error)
+
+    def _reconnect(self) -> None:
+        """Closes broken connection (if it is still possible) and makes new connection and cursor"""
+
+        try:
+            self._conn.close()
+        except:
+            pass
+
+        self._conn = None
+        self._cur = None
+        self._make_cur()
+
     # PUBLIC
 
     def get_hubs_to_do(self) -> dict:
-        self._check_cur()
-        self._cur.execute(GET_HUB_TO_DO)
-        rows = self._cur.fetchall()
+        rows = self._with_reconnect(lambda: self._cur.execute(GET_HUB_TO_DO).fetchall())
         results = {}
         for row in rows:
             results[row[0]] = {
@@ -61,16 +136,142 @@ class SQLiteFromFileConnector(IConnector):
 
         return results
 
-    def get_articles_to_do(self) -> dict:
+    def get_data_version(self) -> Optional[int]:
+        def read() -> Optional[int]:
+            try:
+                return self._cur.execute(GET_DATA_VERSION).fetchone()[0]
+            except sqlite3.OperationalError as e:
+                if 'no such table' not in str(e):
+                    raise
+                # DB is not migrated to db_manager's 0012 yet (e.g. parser is deployed before migrations are applied)
+                return None
+
+        return self._with_reconnect(read)
+
+    def get_known_article_urls(self, urls: list[str]) -> set[str]:
+        known_urls = set()
+        for i in range(0, len(urls), KNOWN_ARTICLE_URLS_CHUNK_SIZE):
+            chunk = urls[i:i + KNOWN_ARTICLE_URLS_CHUNK_SIZE]
+            query = GET_KNOWN_ARTICLE_URLS_TEMPLATE.format(', '.join('?' * len(chunk)))
+            rows = self._with_reconnect(lambda: self._cur.execute(query, chunk).fetchall())
+            known_urls.update(row[0] for row in rows)
+
+        return known_urls
+
+    def get_leased_articles(self, urls: list[str], worker_id: str) -> dict[str, int]:
+        leased = {}
+        for i in range(0, len(urls), KNOWN_ARTICLE_URLS_CHUNK_SIZE):
+            chunk = urls[i:i + KNOWN_ARTICLE_URLS_CHUNK_SIZE]
+            query = GET_LEASED_ARTICLES_TEMPLATE.format(', '.join('?' * len(chunk)))
+            rows = self._with_reconnect(lambda: self._cur.execute(query, [*chunk, worker_id]).fetchall())
+            leased.update(rows)
+
+        return leased
+
+    def iter_articles_to_do(self,
+                            chunk_size: int,
+                            worker_id: str,
+                            lease_duration: datetime.timedelta) -> Iterator[dict]:
+        last_id = 0
+        while True:
+            now = datetime.datetime.now()
+            params = (worker_id, now + lease_duration, last_id, now, chunk_size)
+
+            def claim() -> list[tuple]:
+                claimed = self._cur.execute(CLAIM_ARTICLES_CHUNK, params).fetchall()
+                self._commit()
+                return claimed
+
+            rows = self._transaction(claim, [])
+            if not rows:
+                return
+
+            # RETURNING does not keep the order of rows
+            rows.sort(key=lambda row: row[3])
+            results = {}
+            for row in rows:
+                results[row[0]] = {
+                    'habr_id': row[1],
+                    'url': row[2],
+                    'header': row[0],
+                    'article_id': row[3],
+                    'content_hash': row[4]
+                }
+            last_id = rows[-1][3]
+
+            yield results
+
+            if len(rows) < chunk_size:
+                return
+
+    def iter_article_urls(self, chunk_size: int) -> Iterator[list[str]]:
+        last_id = 0
+        while True:
+            params = (last_id, chunk_size)
+            rows = self._with_reconnect(lambda: self._cur.execute(GET_ARTICLE_URLS_CHUNK, params).fetchall())
+            if not rows:
+                return
+
+            last_id = rows[-1][0]
+
+            yield [row[1] for row in rows]
+
+            if len(rows) < chunk_size:
+                return
+
+    def claim_habrs(self, habrs: dict, worker_id: str, lease_duration: datetime.timedelta) -> dict:
+        now = datetime.datetime.now()
+
+        def claim() -> dict:
+            claimed = {}
+            for hab_name, data in habrs.items():
+                parsed_before = now - datetime.timedelta(minutes=data['parse_interval_minutes'])
+                params = (worker_id, now + lease_duration, data['hab_id'], now, worker_id, parsed_before)
+                if self._cur.execute(CLAIM_HABR, params).rowcount == 1:
+                    claimed[hab_name] = data
+            self._commit()
+            return claimed
+
+        return self._transaction(claim, {})
+
+    def renew_leases(self, worker_id: str, lease_duration: datetime.timedelta) -> None:
+        lease_expires = datetime.datetime.now() + lease_duration
+        self._write([(RENEW_LEASES_TEMPLATE.format(table), [(lease_expires, worker_id)]) for table in LEASED_TABLES])
+
+    def release_articles(self, article_ids: list[int], worker_id: str) -> None:
+        self._write([(RELEASE_ARTICLE, [(article_id, worker_id) for article_id in article_ids])])
+
+    def release_leases(self, worker_id: str) -> None:
+        self._write([(RELEASE_LEASES_TEMPLATE.format(table), [(worker_id, )]) for table in LEASED_TABLES])
+
+    def get_pragmas(self) -> dict[str, Any]:
+        """Reads pragmas, that are actually in effect for current connection
+
+        Returns:
+            Dict with pragmas and their values"""
+
         self._check_cur()
-        self._cur.execute(GET_ARTICLE_TO_DO)
-        rows = self._cur.fetchall()
-        results = {}
-        for row in rows:
-            results[row[0]] = {
-                'habr_id': row[1],
-                'url': row[2],
-                'header': row[0]
-            }
+        return SQLitePragmas.report(self._conn)
 
-        return results
+    def explain_query_plan(self, query: str, params: tuple = ()) -> list[str]:
+        """Asks SQLite, how it is going to execute a query (e.g. to check, that indexes are used)
+
+        Args:
+            query: Query to explain
+            params: Parameters of the query, if it is parametrized
+        Returns:
+            Steps of the plan, e.g. ['SCAN db_manager_habrs USING COVERING INDEX db_manager_habrs_active_idx']"""
+
+        self._check_cur()
+        rows = self._conn.execute(EXPLAIN_QUERY_PLAN_TEMPLATE.format(query), params).fetchall()
+
+        return [row[3] for row in rows]
+
+    def bulk_insert(self, data: BulkInsertIgnoreDict) -> bool:
+        return self._write(self._group_inserts(self._statements.insert, data))
+
+    def bulk_insert_or_ignore(self, data: BulkInsertIgnoreDict) -> bool:
+        return self._write(self._group_inserts(self._statements.insert_or_ignore, data))
+
+    def bulk_update(self, data: BulkUpdateDict) -> bool:
+        return self._write(self._group_updates(data))
@@ -0,0 +1,99 @@
+"""Cache of parametrized SQL-statements"""
+
+
+class StatementCache:
+    """Builds parametrized SQL-texts for INSERT and UPDATE queries and keeps them, one text per shape of a query
+    (operation, table, columns).
+
+    Values are never put into SQL-text, they are passed as parameters. So the same text is used for every row of the
+    same shape, and DB can reuse already prepared statement instead of parsing a new one for each row.
+
+    Attributes:
+        insert_template: Template for INSERT-query, with places for table, columns and placeholders
+        insert_or_ignore_template: Template for INSERT-query, that skips already present rows
+        update_template: Template for UPDATE-query, with places for table, updates and conditions
+        placeholder: Placeholder for a parameter in used SQL-dialect
+        _statements: Already built SQL-texts"""
+
+    def __init__(self,
+                 insert_template: str,
+                 insert_or_ignore_template: str,
+                 update_template: str,
+                 placeholder: str = '?'):
+        """Init
+
+        Args:
+            insert_template: Template for INSERT-query, with places for table, columns and placeholders
+            insert_or_ignore_template: Template for INSERT-query, that skips already present rows
+            update_template: Template for UPDATE-query, with places for table, updates and conditions
+            placeholder: Placeholder for a parameter in used SQL-dialect"""
+
+        self.insert_template: str = insert_template
+        self.insert_or_ignore_template: str = insert_or_ignore_template
+        self.update_template: str = update_template
+        self.placeholder: str = placeholder
+        self._statements: dict[tuple, str] = {}
+
+    def insert(self, table: str, columns: tuple[str, ...]) -> str:
+        """Returns SQL-text to insert a row
+
+        Args:
+            table: Name of a table
+            columns: Names of columns, in the same order as values will be passed
+        Returns:
+            Parametrized SQL-text"""
+
+        return self._get_insert('insert', self.insert_template, table, columns)
+
+    def insert_or_ignore(self, table: str, columns: tuple[str, ...]) -> str:
+        """Returns SQL-text to insert a row, in case it is not yet present in table
+
+        Args:
+            table: Name of a table
+            columns: Names of columns, in the same order as values will be passed
+        Returns:
+            Parametrized SQL-text"""
+
+        return self._get_insert('insert_or_ignore', self.insert_or_ignore_template, table, columns)
+
+    def update(self, table: str, update_columns: tuple[str, ...], where_columns: tuple[str, ...]) -> str:
+        """Returns SQL-text to update rows. Parameters are: values to set, then values for conditions
+
+        Args:
+            table: Name of a table
+            update_columns: Names of columns to update
+            where_columns: Names of columns in conditions (joined with AND)
+        Returns:
+            Parametrized SQL-text"""
+
+        key = ('update', table, update_columns, where_columns)
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = self.update_template.format(
+                table=table,
+                updates=", ".join([f"{col}={self.placeholder}" for col in update_columns]),
+                conditions=" AND ".join([f"{col}={self.placeholder}" for col in where_columns]))
+            self._statements[key] = statement
+
+        return statement
+
+    def _get_insert(self, operation: str, template: str, table: str, columns: tuple[str, ...]) -> str:
+        """Returns SQL-text for one of INSERT-queries
+
+        Args:
+            operation: Name of operation, to tell one INSERT-query from another
+            template: Template of this INSERT-query
+            table: Name of a table
+            columns: Names of columns, in the same order as values will be passed
+        Returns:
+            Parametrized SQL-text"""
+
+        key = (operation, table, columns)
+        statement = self._statements.get(key)
+        if statement is None:
+            cols = ", ".join(columns)
+            placeholders = ", ".join([self.placeholder] * len(columns))
+            statement = template.format(table, cols, placeholders)
+            self._statements[key] = statement
+
+        return statement
@@ -0,0 +1,193 @@
+"""Buffered sink, that saves logs into DB in batches"""
+
+
+import concurrent.futures
+import datetime
+import time
+
+from collections import deque
+from typing import Optional
+
+from parser_app.db_connector.async_connector import AsyncConnector
+from parser_app.db_connector.connector_interface import IConnector
+
+
+class BufferedLogSink:
+    """Collects log-records in a bounded buffer and saves them into DB in batches, with a single query per batch.
+
+    Buffer is saved when it has flush_size records or when flush_interval seconds passed since the last save (checked
+    on each new record and by flush_due(), that owner calls periodically, so records are not stuck in the buffer, when
+    nothing is logged), and also when flush() is called explicitly (end of parsing, shutdown). If DB fails to save a
+    batch, records are returned into the buffer and will be saved with the next batch.
+
+    When buffer is full (DB is unavailable for a while), overflow_policy decides what happens with a new record:
+        'drop_oldest': oldest record in buffer is dropped to make room for a new one
+        'drop_newest': new record is dropped
+        'flush': buffer is saved right away, so nothing is lost, but logging waits for DB
+
+    Number of dropped records is saved into DB with the next batch: a record about them is made, when a batch is saved,
+    so it is never kept in the buffer (if the batch fails, their number is added back to the counter).
+
+    With db, batches, saved on new records, are only passed to DB's thread, so logging never waits for DB. Result of
+    such a batch is checked on the next save: failed batch is returned into the buffer then.
+
+    Attributes:
+        db_connector: Connector, that sink uses to save records into DB
+        db: Runs connector's queries in DB's thread. None to save batches right away, in the caller's thread
+        table_name: Table to save records into
+        max_buffer: Max number of records in buffer
+        flush_size: Number of records, that triggers saving
+        flush_interval: Seconds, after which buffer is saved, even if it has less than flush_size records
+        overflow_policy: What to do with a new record, when buffer is full
+        dropped: Number of records, dropped since the last save
+        _buffer: Records, waiting to be saved
+        _last_flush: Time (monotonic) of the last save
+        _failed: True, if the last save failed. Then next save is not tried before flush_interval passes
+        _pending: Tuples (future, records, number of dropped records) for batches, passed to DB's thread and not
+            checked yet"""
+
+    OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'flush')
+
+    def __init__(self,
+                 db_connector: IConnector,
+                 table_name: str,
+                 max_buffer: int,
+                 flush_size: int,
+                 flush_interval: float,
+                 overflow_policy: str,
+                 db: Optional[AsyncConnector] = None):
+        """Init
+
+        Args:
+            db_connector: Connector, that sink uses to save records into DB
+            table_name: Table to save records into
+            max_buffer: Max number of records in buffer
+            flush_size: Number of records, that triggers saving
+            flush_interval: Seconds, after which buffer is saved, even if it has less than flush_size records
+            overflow_policy: What to do with a new record, when buffer is full (see OVERFLOW_POLICIES)
+            db: Runs connector's queries in DB's thread, None to save batches in the caller's thread"""
+
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise LookupError(f'Log overflow policy "{overflow_policy}" does not exist!')
+
+        self.db_connector: IConnector = db_connector
+        self.db: Optional[AsyncConnector] = db
+        self.table_name: str = table_name
+        self.max_buffer: int = max(max_buffer, 1)
+        self.flush_size: int = max(flush_size, 1)
+        self.flush_interval: float = flush_interval
+        self.overflow_policy: str = overflow_policy
+        self.dropped: int = 0
+        self._buffer: deque[dict] = deque()
+        self._last_flush: float = time.monotonic()
+        self._failed: bool = False
+        self._pending: list[tuple[concurrent.futures.Future, list[dict], int]] = []
+
+    def put(self, record: dict) -> None:
+        """Adds a record to the buffer and saves the buffer, if it is time to
+
+        Args:
+            record: Values of log's columns, in format {'col_name': value}"""
+
+        if len(self._buffer) >= self.max_buffer:
+            if self.overflow_policy == 'drop_newest':
+                self.dropped += 1
+                return
+            elif self.overflow_policy == 'drop_oldest':
+                self._buffer.popleft()
+                self.dropped += 1
+            else:
+                self.flush()
+                # DB is unavailable, so buffer is still full
+                if len(self._buffer) >= self.max_buffer:
+                    self._buffer.popleft()
+                    self.dropped += 1
+
+        self._buffer.append(record)
+
+        since_last_flush = time.monotonic() - self._last_flush
+        if since_last_flush >= self.flush_interval or (len(self._buffer) >= self.flush_size and not self._failed):
+            self.flush(wait=False)
+
+    def flush(self, wait: bool = True) -> None:
+        """Saves all buffered records into DB
+
+        Args:
+            wait: False to only pass records to DB's thread (if there is db) and return right away"""
+
+        self._last_flush = time.monotonic()
+        self._check_pending()
+
+        records = list(self._buffer)
+        self._buffer.clear()
+        dropped = self.dropped
+        self.dropped = 0
+
+        if records or dropped:
+            data = {
+                'table_name': self.table_name,
+                'data': records + [self._make_dropped_record(dropped)] if dropped else records
+            }
+            if self.db is not None:
+                self._pending.append((self.db.write(self.db_connector.bulk_insert, data), records, dropped))
+            else:
+                self._failed = not self.db_connector.bulk_insert(data)
+                if self._failed:
+                    self._return_to_buffer(records, dropped)
+
+        if wait and self._pending:
+            concurrent.futures.wait([future for future, _, _ in self._pending])
+            self._check_pending()
+
+    def flush_due(self) -> None:
+        """Saves the buffer, if flush_interval seconds passed since the last save. Is called periodically by owner of
+        the sink, so records are saved in time, even if nothing new is logged"""
+
+        if time.monotonic() - self._last_flush >= self.flush_interval and (self._buffer or self.dropped):
+            self.flush(wait=False)
+
+    def _check_pending(self) -> None:
+        """Checks batches, that were passed to DB's thread, and returns records of failed ones into the buffer"""
+
+        pending = []
+        for future, records, dropped in self._pending:
+            if not future.done():
+                pending.append((future, records, dropped))
+                continue
+
+            self._failed = future.exception() is not None or not future.result()
+            if self._failed:
+                self._return_to_buffer(records, dropped)
+
+        self._pending = pending
+
+    def _return_to_buffer(self, records: list[dict], dropped: int) -> None:
+        """Returns records, that were not saved, to the beginning of the buffer. Oldest records are dropped, if buffer
+        can not hold them all
+
+        Args:
+            records: Records, that were not saved
+            dropped: Number of dropped records, that was not saved"""
+
+        self.dropped += dropped
+        self._buffer.extendleft(reversed(records))
+        while len(self._buffer) > self.max_buffer:
+            self._buffer.popleft()
+            self.dropped += 1
+
+    @staticmethod
+    def _make_dropped_record(dropped: int) -> dict:
+        """Makes a record, that tells how many records were dropped, because of buffer overflow
+
+        Args:
+            dropped: Number of dropped records
+        Returns:
+            Log-record"""
+
+        record = {
+            'parser_name': 'Logger',
+            'log_dt': datetime.datetime.now(),
+            'log_text': f'{dropped} log-records were dropped, because log-buffer was full'
+        }
+
+        return record
@@ -4,22 +4,43 @@
 import datetime
 import os
 
+from typing import Optional
+
+from parser_app.db_connector.async_connector import AsyncConnector
 from parser_app.db_connector.connector_interface import IConnector
+from parser_app.logger.buffered_sink import BufferedLogSink
+from parser_app.utils.constants import LOG_BUFFER_SIZE, LOG_FLUSH_SIZE, LOG_FLUSH_INTERVAL, LOG_OVERFLOW_POLICY
+from parser_app.utils.env_reader import EnvReader
 
 
 class STDLogger:
     """Standard Logger, designed to log data into DB and print it
 
+    Messages are printed right away, but saved into DB in batches (see BufferedLogSink), so logging does not wait for
+    DB on every message. Call flush() to save everything, that is still buffered.
+
     Attributes:
-        db_connector: Connector, that logger will use to save massages into DB"""
+        db_connector: Connector, that logger will use to save massages into DB
+        sink: Buffer, that saves messages into DB in batches"""
 
-    def __init__(self, db_connector: IConnector):
+    def __init__(self, db_connector: IConnector, db: Optional[AsyncConnector] = None):
         """Init
 
         Args:
-            db_connector: Connector, that logger will use to save massages into DB"""
+            db_connector: Connector, that logger will use to save massages into DB
+            db: Runs connector's queries in DB's thread, so logging does not wait for DB. None to save messages in the
+                caller's thread"""
 
         self.db_connector: IConnector = db_connector
+        self.sink: BufferedLogSink = BufferedLogSink(
+            db_connector=db_connector,
+            table_name=os.getenv('LOGS_TABLE'),
+            max_buffer=EnvReader.get_int('LOG_BUFFER_SIZE', LOG_BUFFER_SIZE),
+            flush_size=EnvReader.get_int('LOG_FLUSH_SIZE', LOG_FLUSH_SIZE),
+            flush_interval=EnvReader.get_float('LOG_FLUSH_INTERVAL', LOG_FLUSH_INTERVAL),
+            overflow_policy=EnvReader.get_str('LOG_OVERFLOW_POLICY', LOG_OVERFLOW_POLICY),
+            db=db
+        )
 
     def parser_log(self, message: str, parser_name: str = 'Undefined') -> None:
         """Logs data from Parsers into DN and prints it
@@ -28,15 +49,21 @@ class STDLogger:
             message: Message to be logged
             parser_name: Name of the parser, which logged this message"""
 
-        table_name: str = os.getenv('LOGS_TABLE')
-        data = {
-            'table_name': table_name,
-            'data': {
-                'parser_name': parser_name,
-                'log_dt': datetime.datetime.now(),
-                'log_text': message
-            }
+        record = {
+            'parser_name': parser_name,
+            'log_dt': datetime.datetime.now(),
+            'log_text': message
         }
 
-        self.db_connector.insert(data)
+        self.sink.put(record)
         print(f'{parser_name}: {message}')
+
+    def flush(self) -> None:
+        """Saves all buffered messages into DB"""
+
+        self.sink.flush()
+
+    def flush_due(self) -> None:
+        """Saves buffered messages into DB, if it is time to (see BufferedLogSink.flush_due)"""
+
+        self.sink.flush_due()
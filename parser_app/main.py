@@ -6,6 +6,7 @@ import time
 from parser_app.controllers.main_controller import MainController
 from parser_app.logger.standard_logger import STDLogger
 from parser_app.utils.constants import PARSER_DB_CHECK_INTERVAL, ENV_FILE_PATH
+from parser_app.utils.env_reader import EnvReader
 from parser_app.utils.env_setter import EnvSetter
 
 
@@ -14,7 +15,8 @@ if __name__ == '__main__':
         try:
             EnvSetter.set_envs(ENV_FILE_PATH)
             logger = STDLogger
-            main_controller = MainController(PARSER_DB_CHECK_INTERVAL, logger)
+            interval = EnvReader.get_float('PARSER_DB_CHECK_INTERVAL', PARSER_DB_CHECK_INTERVAL)
+            main_controller = MainController(interval, logger)
             main_controller.start()
         except Exception as e:
             print(f'An error occurred, during running parser-application:'
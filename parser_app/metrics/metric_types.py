@@ -0,0 +1,179 @@
+"""Counters and histograms, that are exposed in Prometheus' text format"""
+
+
+import bisect
+import threading
+
+from typing import Iterator
+
+
+class Metric:
+    """Base of metrics: values are kept by values of labels, e.g. by parser and Habr. Metrics are updated from event
+    loop and from DB's thread, so each update takes a lock (updates are tiny, so lock is held for a moment)
+
+    Attributes:
+        name: Name of the metric
+        documentation: What the metric measures
+        label_names: Names of labels
+        _lock: Lock, that guards values"""
+
+    metric_type = ''
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        """Init
+
+        Args:
+            name: Name of the metric
+            documentation: What the metric measures
+            label_names: Names of labels"""
+
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label_names: tuple[str, ...] = label_names
+        self._lock: threading.Lock = threading.Lock()
+
+    def expose(self) -> Iterator[str]:
+        """Makes lines of Prometheus' text format
+
+        Yields:
+            Lines"""
+
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.metric_type}'
+        yield from self._expose_samples()
+
+    def _expose_samples(self) -> Iterator[str]:
+        """Makes lines with values
+
+        Yields:
+            Lines"""
+
+        return iter(())
+
+    def _format_labels(self, label_values: tuple[str, ...], extra: str = '') -> str:
+        """Formats labels of a sample, e.g. '{parser="Habs parser",habr="1"}'
+
+        Args:
+            label_values: Values of labels
+            extra: Additional label, that is already formatted (e.g. 'le="0.5"')
+        Returns:
+            Formatted labels, empty string, if there are none"""
+
+        labels = [f'{name}="{self._escape(value)}"' for name, value in zip(self.label_names, label_values)]
+        if extra:
+            labels.append(extra)
+
+        return '{' + ','.join(labels) + '}' if labels else ''
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        """Escapes label's value
+
+        Args:
+            value: Value of a label
+        Returns:
+            Escaped value"""
+
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        """Formats a number
+
+        Args:
+            value: Number
+        Returns:
+            Integer without fraction, float as it is"""
+
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter(Metric):
+    """Counter, that only goes up
+
+    Attributes:
+        _values: Values by values of labels"""
+
+    metric_type = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        """Init
+
+        Args:
+            name: Name of the metric (should end with '_total')
+            documentation: What the metric counts
+            label_names: Names of labels"""
+
+        super().__init__(name, documentation, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increases counter
+
+        Args:
+            label_values: Values of labels, in order of label_names
+            amount: Number to add"""
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def _expose_samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+
+        for label_values, value in values:
+            yield f'{self.name}{self._format_labels(label_values)} {self._format_value(value)}'
+
+
+class Histogram(Metric):
+    """Histogram: counts observed values (e.g. durations) in buckets, and keeps their sum and number
+
+    Attributes:
+        buckets: Upper bounds of buckets, sorted
+        _values: Values by values of labels: [counts in buckets (the last one is for values above all bounds), sum]"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...], buckets: tuple[float, ...]):
+        """Init
+
+        Args:
+            name: Name of the metric
+            documentation: What the metric measures
+            label_names: Names of labels
+            buckets: Upper bounds of buckets"""
+
+        super().__init__(name, documentation, label_names)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Adds observed value
+
+        Args:
+            value: Observed value (e.g. seconds)
+            label_values: Values of labels, in order of label_names"""
+
+        # Bucket's bound is inclusive, so value, equal to a bound, goes to this bound's bucket
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(label_values)
+            if values is None:
+                values = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            values[0][bucket] += 1
+            values[1] += value
+
+    def _expose_samples(self) -> Iterator[str]:
+        with self._lock:
+            values = [(label_values, list(counts), total) for label_values, (counts, total) in self._values.items()]
+
+        for label_values, counts, total in values:
+            # Buckets are cumulative in Prometheus' format
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else self._format_value(bound)
+                bucket_labels = self._format_labels(label_values, f'le="{le}"')
+                yield f'{self.name}_bucket{bucket_labels} {cumulative}'
+            yield f'{self.name}_sum{self._format_labels(label_values)} {self._format_value(total)}'
+            yield f'{self.name}_count{self._format_labels(label_values)} {cumulative}'
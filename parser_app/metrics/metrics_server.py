@@ -0,0 +1,134 @@
+"""HTTP-server, that serves metrics of the parser's process to Prometheus"""
+
+
+import asyncio
+import threading
+import traceback
+
+from typing import Optional
+
+from aiohttp import web
+
+from parser_app.metrics.parser_metrics import ParserMetrics
+from parser_app.utils.constants import METRICS_HOST, METRICS_PORT
+from parser_app.utils.env_reader import EnvReader
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+"""Content-Type of Prometheus' text format"""
+
+
+class MetricsServer:
+    """Serves metrics on GET /metrics from its own thread and event loop, so scrapes are answered, while controller's
+    loop is busy with parsers or waits for DB (and while controller sleeps between cycles).
+
+    If the port can not be bound, server is not started and parser keeps working without it
+
+    Attributes:
+        metrics: Metrics to serve
+        host: Host to listen on
+        port: Port to listen on
+        _thread: Server's thread, None until server is started
+        _loop: Server's event loop, None until server is started
+        _stopped: Tells server's loop to stop
+        _ready: Set, when server listens or failed to start
+        _started: True, if server listens"""
+
+    def __init__(self, metrics: ParserMetrics, host: str, port: int):
+        """Init
+
+        Args:
+            metrics: Metrics to serve
+            host: Host to listen on
+            port: Port to listen on"""
+
+        self.metrics: ParserMetrics = metrics
+        self.host: str = host
+        self.port: int = port
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._ready: threading.Event = threading.Event()
+        self._started: bool = False
+
+    @staticmethod
+    def from_env(metrics: ParserMetrics) -> 'MetricsServer':
+        """Makes server with host and port, set in .env
+
+        Args:
+            metrics: Metrics to serve
+        Returns:
+            Metrics' server"""
+
+        return MetricsServer(metrics,
+                             host=EnvReader.get_str('METRICS_HOST', METRICS_HOST),
+                             port=EnvReader.get_int('METRICS_PORT', METRICS_PORT))
+
+    def start(self) -> bool:
+        """Starts server's thread and waits, until server listens
+
+        Returns:
+            True, if server listens"""
+
+        if self._thread is not None:
+            return self._started
+
+        self._thread = threading.Thread(target=self._serve, name='metrics-server', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._started:
+            print(f'Metrics are served on http://{self.host}:{self.port}/metrics')
+        else:
+            self._thread.join()
+            self._thread = None
+
+        return self._started
+
+    def stop(self) -> None:
+        """Stops server and its thread"""
+
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+            self._thread.join()
+            self._thread = None
+            self._started = False
+
+    def _serve(self) -> None:
+        """Server's thread: runs server's event loop, until server is stopped"""
+
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._run_server())
+        except:
+            error = traceback.format_exc()
+            print(error)
+            print(f'Metrics are not served: failed to listen on {self.host}:{self.port}')
+        finally:
+            self._ready.set()
+            self._loop.close()
+
+    async def _run_server(self) -> None:
+        """Listens, until server is stopped"""
+
+        self._stopped = asyncio.Event()
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+            self._started = True
+            self._ready.set()
+            await self._stopped.wait()
+        finally:
+            await runner.cleanup()
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        """Answers a scrape
+
+        Args:
+            request: Request to /metrics
+        Returns:
+            Metrics in Prometheus' text format"""
+
+        return web.Response(body=self.metrics.expose().encode('utf-8'), headers={'Content-Type': CONTENT_TYPE})
@@ -0,0 +1,133 @@
+"""Metrics of parsers, DB's thread and controller's cycles"""
+
+
+from typing import Optional
+
+from parser_app.metrics.metric_types import Counter, Histogram, Metric
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+"""Upper bounds (in seconds) of buckets of requests', extraction's and queries' durations"""
+
+CYCLE_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+"""Upper bounds (in seconds) of buckets of controller's cycles and their stages"""
+
+
+class ParserMetrics:
+    """Metrics of a parser's process: every stage of a page (fetching, extraction, saving), every call in DB's thread and
+    every cycle of controller. Updates take a lock and a few arithmetic operations, so metrics stay on in production.
+
+    Fetches and extraction are labelled by parser and Habr. Habr is the id of Habr, page or Article belongs to, so
+    number of series grows with number of Habrs, not with number of pages
+
+    Attributes:
+        fetches: Attempts to load a page by parser, Habr and result (HTTP-status, 'timeout', 'connection_error',
+            'oversized' or 'paused')
+        fetch_seconds: Durations of attempts to load a page by parser and Habr
+        extract_seconds: Durations of extraction of a page by parser and Habr (with wait for a process of the pool)
+        save_seconds: Durations of saving a batch of pages by parser (with wait for DB's thread)
+        db_seconds: Durations of calls in DB's thread by connector's method
+        db_wait_seconds: Time, calls wait in DB's queue, by kind ('read' or 'write')
+        db_commit_seconds: Durations of commits of grouped writes
+        db_errors: Calls in DB's thread, that raised, by connector's method
+        cycle_seconds: Durations of controller's cycles (without sleep between them)
+        cycle_stage_seconds: Durations of stages of controller's cycle by stage ('check_db', 'crawl_habrs',
+            'parse_articles')"""
+
+    def __init__(self):
+        """Init"""
+
+        self.fetches: Counter = Counter('habr_parser_fetches_total',
+                                        'Attempts to load a page',
+                                        ('parser', 'habr', 'result'))
+        self.fetch_seconds: Histogram = Histogram('habr_parser_fetch_seconds',
+                                                  'Duration of an attempt to load a page',
+                                                  ('parser', 'habr'),
+                                                  LATENCY_BUCKETS)
+        self.extract_seconds: Histogram = Histogram('habr_parser_extract_seconds',
+                                                    'Duration of extraction of data from a page',
+                                                    ('parser', 'habr'),
+                                                    LATENCY_BUCKETS)
+        self.save_seconds: Histogram = Histogram('habr_parser_save_seconds',
+                                                 'Duration of saving a batch of pages',
+                                                 ('parser',),
+                                                 LATENCY_BUCKETS)
+        self.db_seconds: Histogram = Histogram('habr_parser_db_seconds',
+                                               'Duration of a call in DB\'s thread',
+                                               ('action',),
+                                               LATENCY_BUCKETS)
+        self.db_wait_seconds: Histogram = Histogram('habr_parser_db_wait_seconds',
+                                                    'Time, a call waits in DB\'s queue',
+                                                    ('kind',),
+                                                    LATENCY_BUCKETS)
+        self.db_commit_seconds: Histogram = Histogram('habr_parser_db_commit_seconds',
+                                                      'Duration of a commit of grouped writes',
+                                                      (),
+                                                      LATENCY_BUCKETS)
+        self.db_errors: Counter = Counter('habr_parser_db_errors_total',
+                                          'Calls in DB\'s thread, that raised',
+                                          ('action',))
+        self.cycle_seconds: Histogram = Histogram('habr_parser_cycle_seconds',
+                                                  'Duration of controller\'s cycle without sleep',
+                                                  (),
+                                                  CYCLE_BUCKETS)
+        self.cycle_stage_seconds: Histogram = Histogram('habr_parser_cycle_stage_seconds',
+                                                        'Duration of a stage of controller\'s cycle',
+                                                        ('stage',),
+                                                        CYCLE_BUCKETS)
+
+    def observe_fetch(self, parser_name: str, job: dict, result: str, seconds: Optional[float]) -> None:
+        """Counts an attempt to load a page
+
+        Args:
+            parser_name: Name of parser
+            job: Data, related to the page
+            result: HTTP-status or reason, why page was not loaded
+            seconds: Duration of the attempt, None, if request was not made (host is paused)"""
+
+        habr = self.habr_label(job)
+        self.fetches.inc(parser_name, habr, result)
+        if seconds is not None:
+            self.fetch_seconds.observe(seconds, parser_name, habr)
+
+    def observe_extraction(self, parser_name: str, job: dict, seconds: float) -> None:
+        """Adds duration of extraction of a page
+
+        Args:
+            parser_name: Name of parser
+            job: Data, related to the page
+            seconds: Duration of extraction"""
+
+        self.extract_seconds.observe(seconds, parser_name, self.habr_label(job))
+
+    @staticmethod
+    def habr_label(job: dict) -> str:
+        """Tells, which Habr a page belongs to
+
+        Args:
+            job: Data, related to a page of Habr ('hab_id') or of Article ('habr_id')
+        Returns:
+            Id of Habr, empty string, if it is unknown"""
+
+        habr_id = job.get('hab_id', job.get('habr_id'))
+
+        return '' if habr_id is None else str(habr_id)
+
+    def expose(self) -> str:
+        """Makes text of all metrics in Prometheus' text format
+
+        Returns:
+            Text of metrics"""
+
+        metrics: list[Metric] = [self.fetches,
+                                 self.fetch_seconds,
+                                 self.extract_seconds,
+                                 self.save_seconds,
+                                 self.db_seconds,
+                                 self.db_wait_seconds,
+                                 self.db_commit_seconds,
+                                 self.db_errors,
+                                 self.cycle_seconds,
+                                 self.cycle_stage_seconds]
+
+        return ''.join(f'{line}\n' for metric in metrics for line in metric.expose())
@@ -0,0 +1,160 @@
+"""Extractor of Article's data from HTML"""
+
+
+import datetime
+import hashlib
+import re
+
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
+
+from parser_app.parsers.soup_backends import SoupBackendFactory
+from parser_app.utils.annotation_support import ArticleRecord
+
+
+ARTICLE_CLASS = 'tm-article-presenter__content'
+"""Class of <article>, that holds Article's text"""
+
+ARTICLE_STRAINER = SoupStrainer(
+    class_=re.compile(rf'(^|\s)({ARTICLE_CLASS}|tm-article-datetime-published|tm-user-info__username)(\s|$)'))
+"""Parts of Article's page, that hold text, publication date and author (restricted backends parse only these parts).
+Date and author are matched on their own, as they are not always inside <article>. Classes are matched with a regex,
+because while parsing some versions of bs4 compare a strainer with the whole value of 'class' (e.g. 'a b')"""
+
+FINGERPRINT_VERSION = 1
+"""Is mixed into fingerprints. Bump it, when extraction is changed, so all Articles are extracted again, even if their
+pages are the same"""
+
+
+class ArticleExtractor:
+    """Extracts Article's data from HTML-page.
+
+    Has no state and needs nothing but HTML, so it can be executed in another process (see ExtractionExecutor)"""
+
+    @staticmethod
+    def extract(html: str, backend_name: str = 'html.parser') -> ArticleRecord:
+        """Extracts all required data from Article's HTML-page
+
+        Args:
+            html: Loaded HTML-page
+            backend_name: Name of a backend to build soup with (see SoupBackendFactory)
+        Returns:
+            Dict with extracted data"""
+
+        backend = SoupBackendFactory.get_backend(backend_name)
+        if isinstance(backend, Exception):
+            raise backend
+
+        soup = backend.make_soup(html, ARTICLE_STRAINER)
+
+        # Page has unexpected layout, so <article> was not parsed – parsing the whole page instead. Empty fields (e.g. no
+        # author's link) are not a reason for it, they are empty in the whole page too
+        if backend.restricted and soup.find('article') is None:
+            soup = backend.make_soup(html)
+
+        return ArticleExtractor._extract_from_soup(soup)
+
+    @staticmethod
+    def fingerprint(html: str) -> str:
+        """Makes a fingerprint of Article's content – a hash of <article>-part of the page with normalized whitespaces.
+        Everything around <article> (menus, ads, counters, etc.) does not affect it. Page is not parsed, so it is much
+        cheaper, than extraction
+
+        Args:
+            html: Loaded HTML-page
+        Returns:
+            Hex-digest of a hash"""
+
+        start = html.find('<article')
+        end = html.rfind('</article>')
+        content = html[start:end] if 0 <= start < end else html
+        normalized = ' '.join(content.split())
+
+        return hashlib.sha256(f'{FINGERPRINT_VERSION}:{normalized}'.encode()).hexdigest()
+
+    @staticmethod
+    def _extract_from_soup(soup: BeautifulSoup) -> ArticleRecord:
+        """Extracts all required data from soup
+
+        Args:
+            soup: Soup object (BS) with loaded HTML-page
+        Returns:
+            Dict with extracted data"""
+
+        author_link, author_name = ArticleExtractor._get_author_data(soup)
+
+        record: ArticleRecord = {
+            'publication_dt': ArticleExtractor._get_publication_dt(soup),
+            'author_link': author_link,
+            'author_name': author_name,
+            'article_text': ArticleExtractor._get_article_text(soup)
+        }
+
+        return record
+
+    @staticmethod
+    def _get_publication_dt(soup: BeautifulSoup) -> datetime.datetime | None:
+        """Tries to get DT of an article from HTML-page (from soup, technically)
+
+        Args:
+            soup: Soup object (BS) with loaded HTML-page
+        Returns:
+            DT-object or None, in case DT was not retrieved"""
+
+        try:
+            time_tag = soup.find('span', class_='tm-article-datetime-published').find('time')
+            date_string = time_tag.get('datetime')
+            parsed_datetime = datetime.datetime.strptime(date_string, '%Y-%m-%dT%H:%M:%S.%fZ')
+        except:
+            parsed_datetime = None
+
+        return parsed_datetime
+
+    @staticmethod
+    def _get_author_data(soup: BeautifulSoup) -> tuple[str, str] | tuple[None, None]:
+        """Tries to get Author's name and link and from HTML-page (from soup, technically)
+
+        Args:
+            soup: Soup object (BS) with loaded HTML-page
+        Returns:
+            tuple(author_link, author_name) or tuple with Nones, in case of a failure"""
+
+        try:
+            a_tag = soup.find('a', class_='tm-user-info__username')
+            author_link = a_tag.get('href')
+            author_link = f'https://habr.com{author_link}'
+            author_name = a_tag.text.strip()
+            return author_link, author_name
+        except:
+            return None, None
+
+    @staticmethod
+    def _get_article_text(soup: BeautifulSoup) -> str:
+        """Tries to get articles text from HTML-page (from soup, technically)
+
+        Args:
+            soup: Soup object (BS) with loaded HTML-page
+        Returns:
+            Article's text, including headers"""
+
+        try:
+            article_text_list = []
+
+            # <div> with articles text and some other stuff
+            content_div = soup.find('div', xmlns='http://www.w3.org/1999/xhtml')
+
+            # Simple way - trying to get text, that was arranged properly
+            for tag in content_div.find_all(['p', 'h2']):
+                article_text_list.append(tag.get_text(separator=' ', strip=True))
+
+            # Sometimes text is scattered with no tags – collecting what there is
+            for child in content_div.children:
+                if isinstance(child,
+                              NavigableString) and child.strip():
+                    article_text_list.append(child.strip())
+
+            # Joining collected text with linebreaks, representing <h2> or <p>
+            all_text = '\n'.join(article_text_list)
+        except:
+            all_text = ''
+
+        return all_text
@@ -5,142 +5,148 @@ import asyncio
 import datetime
 import os
 
-from bs4 import BeautifulSoup, NavigableString
+from typing import Any, Optional
+
 from colorama import Fore, Style
 
+from parser_app.db_connector.async_connector import AsyncConnector
 from parser_app.db_connector.connector_interface import IConnector
 from parser_app.logger.standard_logger import STDLogger
+from parser_app.metrics.parser_metrics import ParserMetrics
+from parser_app.parsers.articles_parser.a_extractor import ArticleExtractor
+from parser_app.parsers.extraction_executor import ExtractionExecutor
+from parser_app.parsers.fetch_throttle import FetchThrottle
+from parser_app.parsers.http_client import HttpClient
+from parser_app.parsers.job_feed import JobFeed
 from parser_app.parsers.pasrser_interface import ParserInterface
+from parser_app.parsers.retry_policy import RetryPolicy, PERMANENT_STATUSES
+from parser_app.parsers.single_flight import SingleFlight
+from parser_app.utils.annotation_support import ArticleRecord
+from parser_app.utils.constants import PARSER_STREAMING, PARSER_QUEUE_SIZE, WRITE_BATCH_SIZE, MAX_PAGE_SIZE
+from parser_app.utils.env_reader import EnvReader
 
 
 class ArticleParser(ParserInterface):
     """Parser for Articles
 
-    Attributes:
-        connector: Connector to get data from/in DB
-        parser_name: Name of this concrete parser
+    Attributes (only the ones, that are specific to Articles, others are described in ParserInterface):
         articles: Dict with articles, loaded from DB, to parse them
-        logger: Logger-object, to log this parser's progress
-        parallel_jobs: Number of jobs to be executed in parallel"""
+        extractor: Function, that extracts Article's data from HTML
+        fingerprint: Function, that makes a fingerprint of Article's content, to skip Articles, that were not changed
+            since the last parsing
+        validators: Not used, each Article is loaded once, so requests are never conditional
+        job_feed: Articles, found by Habrs' parser, that runs at the same time. None to parse only provided articles"""
 
     def __init__(self,
                  articles: dict,
                  logger: STDLogger,
-                 connector: IConnector):
+                 connector: IConnector,
+                 executor: Optional[ExtractionExecutor] = None,
+                 http_client: Optional[HttpClient] = None,
+                 throttle: Optional[FetchThrottle] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 job_feed: Optional[JobFeed] = None,
+                 db: Optional[AsyncConnector] = None,
+                 metrics: Optional[ParserMetrics] = None):
         """Init
 
         Args:
             articles: Dict with articles, loaded from DB, to parse them
             logger: Logger-object, to log this parser's progress
-            connector: Connector to get data from/in DB"""
+            connector: Connector to get data from/in DB
+            executor: Pool of processes to run extraction in, None to run it in this thread
+            http_client: Client with a pool of connections, None to open new session for every batch
+            throttle: Regulates number and rate of requests to each host, None to make a new one for every batch
+            single_flight: Collapses concurrent loads of the same URL, None to make a new one for every batch
+            job_feed: Articles, found by Habrs' parser, that runs at the same time, None to parse only provided
+                articles
+            db: Runs connector's queries in DB's thread, None to run them right in event loop
+            metrics: Metrics, shared by parsers, None to not collect them"""
 
         self.connector: IConnector = connector
-        self.parser_name: str = 'Habs parser'
+        self.parser_name: str = 'Articles parser'
         self.articles: dict = articles
         self.logger: STDLogger = logger
-        self.parallel_jobs = 5
+        self.streaming: bool = EnvReader.get_bool('PARSER_STREAMING', PARSER_STREAMING)
+        self.queue_size: int = EnvReader.get_int('PARSER_QUEUE_SIZE', PARSER_QUEUE_SIZE)
+        self.extractor = self._get_extractor(ArticleExtractor)
+        self.executor: Optional[ExtractionExecutor] = executor
+        self.http_client: Optional[HttpClient] = http_client
+        self.throttle: Optional[FetchThrottle] = throttle
+        self.retry_policy: RetryPolicy = RetryPolicy.from_env()
+        self.single_flight: Optional[SingleFlight] = single_flight
+        self.job_feed: Optional[JobFeed] = job_feed
+        self.write_batch_size: int = EnvReader.get_int('WRITE_BATCH_SIZE', WRITE_BATCH_SIZE)
+        self.max_page_size: int = EnvReader.get_int('MAX_PAGE_SIZE', MAX_PAGE_SIZE)
+        self.fingerprint = ArticleExtractor.fingerprint
+        self.validators = None
+        self.db: Optional[AsyncConnector] = db
+        self.metrics: Optional[ParserMetrics] = metrics
+        self._to_save: list[tuple[dict, Any]] = []
+        self._failed: list[dict] = []
 
     def parse(self) -> None:
-        """Hit to start parsing"""
+        """Hit to start parsing (in a new event loop, so it can not be used with http_client)"""
 
-        asyncio.run(self.parse_pages(self.articles))
+        asyncio.run(self.aparse())
 
-    def parse_data_from_html(self, completed_jobs: list) -> None:
-        """Parses data from loaded HTML
+    async def aparse(self) -> None:
+        """Parses Articles in already running event loop (the one, http_client is used in)"""
 
-        Args:
-            completed_jobs: List with dicts, where each dict stores data, related to some web-page"""
-
-        for job in completed_jobs:
-            html = job.get('html')
-            if html:
-                # Getting data from HTML
-                soup = BeautifulSoup(html, 'html.parser')
-                publication_dt = self._get_publication_dt(soup)
-                author_link, author_name = self._get_author_data(soup)
-                article_text = self._get_article_text(soup)
-
-                # Printing collected data in a nice way
-                print('––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––')
-                self._print_collected_data('Article url:', job.get("url"))
-                self._print_collected_data('Article header:', job.get("header"))
-                self._print_collected_data('Article date:', publication_dt)
-                self._print_collected_data('Author name:', author_name)
-                self._print_collected_data('Author link:', author_link)
-                self._print_collected_data('Author text:', article_text)
-                print('')
-
-                # Updating collection, related tio this web-page and sending it into DB
-                job['publication_dt'] = publication_dt
-                job['author_link'] = author_link
-                job['author_name'] = author_name
-                job['article_text'] = article_text
-                self._update_article(job)
-
-    def _get_publication_dt(self, soup: BeautifulSoup) -> datetime.datetime | None:
-        """Tries to get DT of an article from HTML-page (from soup, technically)
+        await self.parse_pages(self.articles)
 
-        Args:
-            soup: Soup object (BS) with loaded HTML-page
-        Returns:
-            DT-object or None, in case DT was not retrieved"""
-
-        try:
-            time_tag = soup.find('span', class_='tm-article-datetime-published').find('time')
-            date_string = time_tag.get('datetime')
-            parsed_datetime = datetime.datetime.strptime(date_string, '%Y-%m-%dT%H:%M:%S.%fZ')
-        except:
-            parsed_datetime = None
-
-        return parsed_datetime
-
-    def _get_author_data(self, soup: BeautifulSoup) -> tuple[str, str] | tuple[None, None]:
-        """Tries to get Author's name and link and from HTML-page (from soup, technically)
+    async def save_data(self, extracted_pages: list[tuple[dict, ArticleRecord]]) -> bool:
+        """Prints data, extracted from Articles' pages, and saves it into DB
 
         Args:
-            soup: Soup object (BS) with loaded HTML-page
+            extracted_pages: Tuples (job, record), where job is a dict with data, related to some web-page, and
+                record is data, extracted from this web-page (None, if Article was not changed since the last parsing)
         Returns:
-            tuple(author_link, author_name) or tuple with Nones, in case of a failure"""
-
-        try:
-            a_tag = soup.find('a', class_='tm-user-info__username')
-            author_link = a_tag.get('href')
-            author_link = f'https://habr.com{author_link}'
-            author_name = a_tag.text.strip()
-            return author_link, author_name
-        except:
-            return None, None
-
-    def _get_article_text(self, soup: BeautifulSoup) -> str:
-        """Tries to get articles text from HTML-page (from soup, technically)
+            True, if Articles were saved"""
+
+        parsed = []
+        unchanged = []
+        for job, record in extracted_pages:
+            if record is None:
+                print(f'Article "{job.get("header")}" was not changed since the last parsing')
+                unchanged.append(job)
+                continue
+
+            # Printing collected data in a nice way
+            print('––––––––––––––––––––––––––––––––––––––––––––––––––––––––––––')
+            self._print_collected_data('Article url:', job.get("url"))
+            self._print_collected_data('Article header:', job.get("header"))
+            self._print_collected_data('Article date:', record['publication_dt'])
+            self._print_collected_data('Author name:', record['author_name'])
+            self._print_collected_data('Author link:', record['author_link'])
+            self._print_collected_data('Author text:', record['article_text'])
+            print('')
+
+            # Updating collection, related tio this web-page
+            job.update(record)
+            parsed.append(job)
+
+        return await self._update_articles(parsed, unchanged)
+
+    async def save_failures(self, failed_jobs: list[dict]) -> None:
+        """Saves reasons, why Articles were not loaded. Articles, that do not exist anymore (or are too big), are not
+        parsed again, others stay in the queue
 
         Args:
-            soup: Soup object (BS) with loaded HTML-page
-        Returns:
-            Article's text, including headers"""
-
-        try:
-            article_text_list = []
-
-            # <div> with articles text and some other stuff
-            content_div = soup.find('div', xmlns='http://www.w3.org/1999/xhtml')
+            failed_jobs: Dicts with data, related to Articles, that were not loaded"""
 
-            # Simple way - trying to get text, that was arranged properly
-            for tag in content_div.find_all(['p', 'h2']):
-                article_text_list.append(tag.get_text(separator=' ', strip=True))
-
-            # Sometimes text is scattered with no tags – collecting what there is
-            for child in content_div.children:
-                if isinstance(child,
-                              NavigableString) and child.strip():
-                    article_text_list.append(child.strip())
-
-            # Joining collected text with linebreaks, representing <h2> or <p>
-            all_text = '\n'.join(article_text_list)
-        except:
-            all_text = ''
+        table_name: str = os.getenv('ARTICLES_TABLE')
+        rows = []
+        for job in failed_jobs:
+            data = {
+                'date_parsed': datetime.datetime.now(),
+                'last_status': job['error'][:100]
+            }
+            if job.get('status') in PERMANENT_STATUSES or job.get('oversized'):
+                data['parse_this'] = False
+            rows.append({'where': {'header': job['header']}, 'data': data})
 
-        return all_text
+        await self._db_write(self.connector.bulk_update, {'table_name': table_name, 'rows': rows})
 
     def _print_collected_data(self,
                               title: str,
@@ -169,27 +175,49 @@ class ArticleParser(ParserInterface):
         print(Fore.GREEN + title + Style.RESET_ALL)
         print(Fore.LIGHTCYAN_EX + f'\t{msg}' + Style.RESET_ALL)
 
-    def _update_article(self, data: dict) -> None:
+    async def _update_articles(self, articles: list[dict], unchanged_articles: list[dict]) -> bool:
         """Collects data for an SQL-query and triggers it
 
         Args:
-            data: Data, related to some article"""
+            articles: Data, related to some articles
+            unchanged_articles: Data, related to articles, that were not changed since the last parsing (only their
+                statuses are updated)
+        Returns:
+            True, if Articles were updated"""
 
         table_name: str = os.getenv('ARTICLES_TABLE')
         data = {
             'table_name': table_name,
-            'where': {
-                'header': data['header']
-            },
-            'data': {
-                'date_parsed': datetime.datetime.now(),
-                'last_status': 'Success!',
-                'parse_this': 0,
-                'article_text': data['article_text'],
-                'article_date': data['publication_dt'],
-                'author_name': data['author_name'],
-                'author_url': data['author_link']
-            }
+            'rows': [
+                {
+                    'where': {
+                        'header': article['header']
+                    },
+                    'data': {
+                        'date_parsed': datetime.datetime.now(),
+                        'last_status': 'Success!',
+                        'parse_this': False,
+                        'article_text': article['article_text'],
+                        'article_date': article['publication_dt'],
+                        'author_name': article['author_name'],
+                        'author_url': article['author_link'],
+                        'content_hash': article.get('fingerprint')
+                    }
+                }
+                for article in articles
+            ] + [
+                {
+                    'where': {
+                        'header': article['header']
+                    },
+                    'data': {
+                        'date_parsed': datetime.datetime.now(),
+                        'last_status': 'Not modified',
+                        'parse_this': False
+                    }
+                }
+                for article in unchanged_articles
+            ]
         }
 
-        self.connector.update(data)
+        return await self._db_write(self.connector.bulk_update, data)
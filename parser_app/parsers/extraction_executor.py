@@ -0,0 +1,60 @@
+"""Executor, that runs extraction of data from HTML in separate processes"""
+
+
+import asyncio
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class ExtractionExecutor:
+    """Runs extraction of data from HTML in a pool of processes, so parsing HTML does not block the event loop and can
+    use all cores.
+
+    Workers receive raw HTML and return only extracted records (small dicts), so only HTML and records are sent
+    between processes. Pool is created on first use and lives until shutdown() is called.
+
+    Attributes:
+        workers: Number of processes in the pool
+        _pool: Pool of processes (None, until it is used)"""
+
+    def __init__(self, workers: int = 0):
+        """Init
+
+        Args:
+            workers: Number of processes in the pool, 0 to use all cores"""
+
+        self.workers: int = workers if workers > 0 else (os.cpu_count() or 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Returns pool of processes, creates it if needed
+
+        Returns:
+            Pool of processes"""
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        return self._pool
+
+    async def extract(self, extractor: Callable[[str], Any], html: str) -> Any:
+        """Runs extractor in one of the pool's processes and waits for its result without blocking the event loop
+
+        Args:
+            extractor: Function (or static method), that extracts data from HTML. Must be importable by its name
+            html: Loaded HTML-page
+        Returns:
+            Whatever extractor returns"""
+
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(self._get_pool(), extractor, html)
+
+    def shutdown(self) -> None:
+        """Stops all processes in the pool"""
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,390 @@
+"""Regulation of the number and rate of requests, sent to each host"""
+
+
+import asyncio
+import collections
+import contextlib
+import time
+
+from typing import AsyncIterator, Optional
+from urllib.parse import urlsplit
+
+from parser_app.utils.constants import FETCH_CONCURRENCY_FLOOR, FETCH_CONCURRENCY_CEILING, \
+    FETCH_CONCURRENCY_INITIAL, FETCH_RATE, FETCH_BURST, FETCH_LATENCY_TARGET, FETCH_DECREASE_FACTOR, \
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN
+from parser_app.utils.env_reader import EnvReader
+
+
+CONGESTION_STATUSES = (429, 500, 502, 503, 504)
+"""Statuses, that mean, server can not keep up with requests"""
+
+
+class TokenBucket:
+    """Limits the rate of requests: each request takes a token, tokens are refilled with a constant rate, up to burst.
+    Can be paused, e.g. when server asks to retry after some time.
+
+    Attributes:
+        rate: Tokens per second, 0 for no limit
+        burst: Max number of tokens, that can be taken at once
+        _tokens: Tokens, that are available right now
+        _updated: Time (monotonic) of the last refill
+        _paused_until: Time (monotonic), until which no tokens are given"""
+
+    def __init__(self, rate: float, burst: int):
+        """Init
+
+        Args:
+            rate: Tokens per second, 0 for no limit
+            burst: Max number of tokens, that can be taken at once"""
+
+        self.rate: float = rate
+        self.burst: int = max(burst, 1)
+        self._tokens: float = float(self.burst)
+        self._updated: float = time.monotonic()
+        self._paused_until: float = 0.0
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it"""
+
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            if self.rate <= 0:
+                return
+
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Stops giving tokens for some time
+
+        Args:
+            seconds: Duration of the pause"""
+
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveLimiter:
+    """Limits the number of requests in flight and adapts this limit to the server (AIMD): each fast and successful
+    request increases limit a little (by 1/limit, so by 1 per limit's worth of requests), while a slow or failed one
+    cuts it by decrease_factor.
+
+    Limit is cut at most once per latency_target, so a bunch of requests, that failed together, cuts it only once.
+    Waiters are plain futures, so limiter is not bound to any event loop.
+
+    Attributes:
+        floor: Min limit
+        ceiling: Max limit
+        limit: Current limit (fractional, only its integer part is used)
+        latency_target: Seconds. Slower responses are treated as a sign of server's overload
+        decrease_factor: Limit is multiplied by it, when server is overloaded
+        in_flight: Number of requests, that are executed right now
+        _waiters: Futures of requests, waiting for a free slot
+        _last_decrease: Time (monotonic) of the last cut of the limit"""
+
+    def __init__(self,
+                 floor: int,
+                 ceiling: int,
+                 initial: int,
+                 latency_target: float,
+                 decrease_factor: float):
+        """Init
+
+        Args:
+            floor: Min limit
+            ceiling: Max limit
+            initial: Limit to start with
+            latency_target: Seconds. Slower responses are treated as a sign of server's overload
+            decrease_factor: Limit is multiplied by it, when server is overloaded"""
+
+        self.floor: int = max(floor, 1)
+        self.ceiling: int = max(ceiling, self.floor)
+        self.limit: float = float(min(max(initial, self.floor), self.ceiling))
+        self.latency_target: float = latency_target
+        self.decrease_factor: float = decrease_factor
+        self.in_flight: int = 0
+        self._waiters: collections.deque[asyncio.Future] = collections.deque()
+        self._last_decrease: float = 0.0
+
+    async def acquire(self) -> None:
+        """Waits for a free slot and takes it"""
+
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Slot was given to this waiter, passing it to the next one
+                    self._wake_up()
+                else:
+                    self._waiters.remove(waiter)
+                raise
+
+        self.in_flight += 1
+
+    def release(self, latency: float, congested: bool) -> None:
+        """Frees a slot and adapts the limit
+
+        Args:
+            latency: Seconds, request took
+            congested: True, if server reported, that it is overloaded (or request failed)"""
+
+        self.in_flight -= 1
+
+        if congested or latency > self.latency_target:
+            now = time.monotonic()
+            if now - self._last_decrease > self.latency_target:
+                self.limit = max(float(self.floor), self.limit * self.decrease_factor)
+                self._last_decrease = now
+        else:
+            self.limit = min(float(self.ceiling), self.limit + 1 / self.limit)
+
+        self._wake_up()
+
+    def _wake_up(self) -> None:
+        """Lets waiting requests go, while there are free slots"""
+
+        free_slots = int(self.limit) - self.in_flight
+        while free_slots > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free_slots -= 1
+
+
+class CircuitBreaker:
+    """Pauses requests to a host, that keeps failing, instead of hammering it.
+
+    After failure_threshold failures in a row circuit 'opens': no requests are allowed during cooldown. Then one trial
+    request is allowed: if it succeeds, circuit 'closes' and all requests are allowed again, if it fails – circuit opens
+    for another cooldown.
+
+    Attributes:
+        failure_threshold: Number of failures in a row, that opens circuit
+        cooldown: Seconds, circuit stays open
+        failures: Number of failures in a row
+        _opened_until: Time (monotonic), until which circuit is open (0, if it is closed)
+        _trial_in_flight: True, if trial request was allowed and has not finished yet"""
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        """Init
+
+        Args:
+            failure_threshold: Number of failures in a row, that opens circuit
+            cooldown: Seconds, circuit stays open"""
+
+        self.failure_threshold: int = max(failure_threshold, 1)
+        self.cooldown: float = cooldown
+        self.failures: int = 0
+        self._opened_until: float = 0.0
+        self._trial_in_flight: bool = False
+
+    def allows(self) -> bool:
+        """Tells, if a request can be sent now (and takes trial request, if circuit has cooled down)
+
+        Returns:
+            True, if request is allowed"""
+
+        if self.failures < self.failure_threshold:
+            return True
+        if self._trial_in_flight or time.monotonic() < self._opened_until:
+            return False
+
+        self._trial_in_flight = True
+        return True
+
+    def record(self, failed: bool) -> None:
+        """Takes into account result of a request
+
+        Args:
+            failed: True, if request failed because of the host (error, 5xx, 429)"""
+
+        self._trial_in_flight = False
+        if not failed:
+            self.failures = 0
+            self._opened_until = 0.0
+            return
+
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self._opened_until = time.monotonic() + self.cooldown
+
+    def cancel_trial(self) -> None:
+        """Lets another trial request go, if the current one was cancelled before it got any result"""
+
+        self._trial_in_flight = False
+
+
+class FetchSlot:
+    """Permission to send a request. Fetcher fills it with the result of the request, so throttle can adapt
+
+    Attributes:
+        status: HTTP-status of the response (None, if request failed)
+        retry_after: Seconds, server asked to wait before the next request (None, if it did not ask)
+        failed: True, if request failed without a response (timeout, connection error)"""
+
+    def __init__(self):
+        """Init"""
+
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+        self.failed: bool = False
+
+
+class FetchThrottle:
+    """Regulates requests to each host with a token bucket (rate) and an adaptive limiter (concurrency), so throughput
+    follows what the host actually accepts, and with a circuit breaker, that pauses a failing host. Is meant to live as
+    long as application does, so the limit, learned in one batch, is used in the next ones.
+
+    Attributes:
+        floor: Min number of requests in flight to a host
+        ceiling: Max number of requests in flight to a host
+        initial: Number of requests in flight to a new host
+        rate: Max requests per second to a host, 0 for no limit
+        burst: Max number of requests, that can be sent to a host at once
+        latency_target: Seconds. Slower responses are treated as a sign of host's overload
+        decrease_factor: Limit is multiplied by it, when host is overloaded
+        failure_threshold: Number of failures in a row, that pauses a host
+        cooldown: Seconds, failing host is paused for
+        _hosts: Host -> (token bucket, adaptive limiter, circuit breaker)"""
+
+    def __init__(self,
+                 floor: int,
+                 ceiling: int,
+                 initial: int,
+                 rate: float,
+                 burst: int,
+                 latency_target: float,
+                 decrease_factor: float,
+                 failure_threshold: int,
+                 cooldown: float):
+        """Init
+
+        Args:
+            floor: Min number of requests in flight to a host
+            ceiling: Max number of requests in flight to a host
+            initial: Number of requests in flight to a new host
+            rate: Max requests per second to a host, 0 for no limit
+            burst: Max number of requests, that can be sent to a host at once
+            latency_target: Seconds. Slower responses are treated as a sign of host's overload
+            decrease_factor: Limit is multiplied by it, when host is overloaded
+            failure_threshold: Number of failures in a row, that pauses a host
+            cooldown: Seconds, failing host is paused for"""
+
+        self.floor: int = floor
+        self.ceiling: int = ceiling
+        self.initial: int = initial
+        self.rate: float = rate
+        self.burst: int = burst
+        self.latency_target: float = latency_target
+        self.decrease_factor: float = decrease_factor
+        self.failure_threshold: int = failure_threshold
+        self.cooldown: float = cooldown
+        self._hosts: dict[str, tuple[TokenBucket, AdaptiveLimiter, CircuitBreaker]] = {}
+
+    @staticmethod
+    def from_env() -> 'FetchThrottle':
+        """Makes throttle with settings, set in .env
+
+        Returns:
+            Throttle"""
+
+        return FetchThrottle(
+            floor=EnvReader.get_int('FETCH_CONCURRENCY_FLOOR', FETCH_CONCURRENCY_FLOOR),
+            ceiling=EnvReader.get_int('FETCH_CONCURRENCY_CEILING', FETCH_CONCURRENCY_CEILING),
+            initial=EnvReader.get_int('FETCH_CONCURRENCY_INITIAL', FETCH_CONCURRENCY_INITIAL),
+            rate=EnvReader.get_float('FETCH_RATE', FETCH_RATE),
+            burst=EnvReader.get_int('FETCH_BURST', FETCH_BURST),
+            latency_target=EnvReader.get_float('FETCH_LATENCY_TARGET', FETCH_LATENCY_TARGET),
+            decrease_factor=EnvReader.get_float('FETCH_DECREASE_FACTOR', FETCH_DECREASE_FACTOR),
+            failure_threshold=EnvReader.get_int('CIRCUIT_FAILURE_THRESHOLD', CIRCUIT_FAILURE_THRESHOLD),
+            cooldown=EnvReader.get_float('CIRCUIT_COOLDOWN', CIRCUIT_COOLDOWN)
+        )
+
+    def allows(self, url: str) -> bool:
+        """Tells, if URL's host can be requested now (see CircuitBreaker). If True is returned, slot() must be taken
+
+        Args:
+            url: URL to request
+        Returns:
+            False, if host is paused after repeated failures"""
+
+        _, _, breaker = self._get_host(urlsplit(url).hostname or '')
+
+        return breaker.allows()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[FetchSlot]:
+        """Waits, until a request to URL's host is allowed. Fetcher must fill the slot with the result of the request
+
+        Args:
+            url: URL to request
+        Yields:
+            Slot to fill"""
+
+        bucket, limiter, breaker = self._get_host(urlsplit(url).hostname or '')
+        try:
+            await limiter.acquire()
+        except asyncio.CancelledError:
+            # Trial request, that allows() may have given, was not sent, so another one can go
+            breaker.cancel_trial()
+            raise
+
+        slot = FetchSlot()
+        started = time.monotonic()
+        congested = True
+        cancelled = False
+        try:
+            await bucket.acquire()
+            started = time.monotonic()
+            yield slot
+            congested = slot.failed or slot.status in CONGESTION_STATUSES
+            if slot.retry_after:
+                bucket.pause(slot.retry_after)
+        except asyncio.CancelledError:
+            congested = False
+            cancelled = True
+            raise
+        finally:
+            limiter.release(time.monotonic() - started, congested)
+            if cancelled:
+                breaker.cancel_trial()
+            else:
+                breaker.record(failed=congested)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Reports current limits
+
+        Returns:
+            Host -> current limit, number of requests in flight and failures in a row"""
+
+        return {
+            host: {'limit': round(limiter.limit, 2), 'in_flight': limiter.in_flight, 'failures': breaker.failures}
+            for host, (_, limiter, breaker) in self._hosts.items()
+        }
+
+    def _get_host(self, host: str) -> tuple[TokenBucket, AdaptiveLimiter, CircuitBreaker]:
+        """Returns bucket, limiter and circuit breaker of a host, creates them if needed
+
+        Args:
+            host: Host's name
+        Returns:
+            Token bucket, adaptive limiter and circuit breaker"""
+
+        if host not in self._hosts:
+            self._hosts[host] = (
+                TokenBucket(self.rate, self.burst),
+                AdaptiveLimiter(self.floor, self.ceiling, self.initial, self.latency_target, self.decrease_factor),
+                CircuitBreaker(self.failure_threshold, self.cooldown)
+            )
+
+        return self._hosts[host]
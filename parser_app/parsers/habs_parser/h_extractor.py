@@ -0,0 +1,49 @@
+"""Extractor of Articles' links from Habr's HTML"""
+
+
+from bs4 import SoupStrainer
+
+from parser_app.parsers.soup_backends import SoupBackendFactory
+from parser_app.utils.annotation_support import ArticleLinkRecord
+
+
+HAB_STRAINER = SoupStrainer('h2')
+"""Part of Habr's page, that holds articles' headers and links (restricted backends parse only this part)"""
+
+
+class HabExtractor:
+    """Extracts Articles' headers and links from Habr's HTML-page.
+
+    Has no state and needs nothing but HTML, so it can be executed in another process (see ExtractionExecutor)"""
+
+    @staticmethod
+    def extract(html: str, backend_name: str = 'html.parser') -> list[ArticleLinkRecord]:
+        """Extracts headers and URLs of all articles from Habr's HTML-page
+
+        Args:
+            html: Loaded HTML-page
+            backend_name: Name of a backend to build soup with (see SoupBackendFactory)
+        Returns:
+            List with dicts, each dict represents one article"""
+
+        records = []
+
+        backend = SoupBackendFactory.get_backend(backend_name)
+        if isinstance(backend, Exception):
+            raise backend
+
+        soup = backend.make_soup(html, HAB_STRAINER)
+        article_headers = soup.find_all('h2', class_='tm-title tm-title_h2')
+
+        for header in article_headers:
+            link = header.find('a')
+            if link:
+                article_header = link.find('span').text
+                article_url = link.get('href')
+                if article_header and article_url:
+                    records.append({
+                        'article_header': article_header,
+                        'article_url': f'https://habr.com{article_url}'
+                    })
+
+        return records
@@ -5,109 +5,311 @@ import asyncio
 import datetime
 import os
 
-from bs4 import BeautifulSoup
+from typing import Any, Optional
 
+from parser_app.db_connector.async_connector import AsyncConnector
 from parser_app.db_connector.connector_interface import IConnector
 from parser_app.logger.standard_logger import STDLogger
+from parser_app.metrics.parser_metrics import ParserMetrics
+from parser_app.parsers.extraction_executor import ExtractionExecutor
+from parser_app.parsers.fetch_throttle import FetchThrottle
+from parser_app.parsers.habs_parser.h_extractor import HabExtractor
+from parser_app.parsers.http_client import HttpClient
+from parser_app.parsers.http_validators import ValidatorStore
+from parser_app.parsers.job_feed import JobFeed
+from parser_app.parsers.known_articles import KnownArticlesSet
 from parser_app.parsers.pasrser_interface import ParserInterface
+from parser_app.parsers.retry_policy import RetryPolicy
+from parser_app.parsers.single_flight import SingleFlight
+from parser_app.utils.annotation_support import ArticleLinkRecord
+from parser_app.utils.constants import PARSER_STREAMING, PARSER_QUEUE_SIZE, WRITE_BATCH_SIZE, MAX_PAGE_SIZE, \
+    HUB_BACKFILL_MAX_PAGES, HUB_MAX_PAGES
+from parser_app.utils.env_reader import EnvReader
 
 
 class HabsParser(ParserInterface):
-    """Parser for Habrs
+    """Parser for Habrs.
 
-    Attributes:
-        connector: Connector to get data from/in DB
-        parser_name: Name of this concrete parser
+    Habr's pages are crawled one by one (page2/, page3/, ...), until a page has no new articles: so articles, that
+    were moved off the first page since the last parsing, are not lost. Pages of all Habrs are loaded together, page by
+    page. Habr, that is parsed for the first time, is crawled no deeper than backfill_max_pages
+
+    Attributes (only the ones, that are specific to Habrs, others are described in ParserInterface):
         habs: Dict with habs, loaded from DB, to parse them
-        logger: Logger-object, to log this parser's progress
-        parallel_jobs: Number of jobs to be executed in parallel"""
+        extractor: Function, that extracts Articles' headers and links from HTML
+        fingerprint: Not used, Habrs' pages are checked with HTTP-validators instead
+        validators: HTTP-validators of Habrs' pages, to skip pages, that were not modified since the last parsing
+        backfill_max_pages: Max number of pages, loaded from a Habr, that is parsed for the first time
+        known_articles: In-memory index of saved articles, to find new articles without queries to DB. None to check
+            all articles in DB
+        article_feed: Feed of Articles' parser, that runs at the same time: new articles are leased to this worker and
+            are put into it, as soon as they are saved. None to leave new articles for the next DB check
+        job_feed: Not used, Habrs' pages are found by this parser itself
+        _next_pages: Jobs for the next pages of Habrs, that had new articles on their current pages"""
 
     def __init__(self,
                  habs: dict,
                  logger: STDLogger,
-                 connector: IConnector):
+                 connector: IConnector,
+                 executor: Optional[ExtractionExecutor] = None,
+                 http_client: Optional[HttpClient] = None,
+                 throttle: Optional[FetchThrottle] = None,
+                 validators: Optional[ValidatorStore] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 known_articles: Optional[KnownArticlesSet] = None,
+                 article_feed: Optional[JobFeed] = None,
+                 db: Optional[AsyncConnector] = None,
+                 metrics: Optional[ParserMetrics] = None):
         """Init
 
         Args:
             habs: Dict with habs, loaded from DB, to parse them
             logger: Logger-object, to log this parser's progress
-            connector: Connector to get data from/in DB"""
+            connector: Connector to get data from/in DB
+            executor: Pool of processes to run extraction in, None to run it in this thread
+            http_client: Client with a pool of connections, None to open new session for every batch
+            throttle: Regulates number and rate of requests to each host, None to make a new one for every batch
+            validators: HTTP-validators, kept between parsings. None to always load full pages
+            single_flight: Collapses concurrent loads of the same URL, None to make a new one for every batch
+            known_articles: In-memory index of saved articles, None to check all articles in DB
+            article_feed: Feed of Articles' parser, that runs at the same time, None to only save new articles
+            db: Runs connector's queries in DB's thread, None to run them right in event loop
+            metrics: Metrics, shared by parsers, None to not collect them"""
 
         self.connector: IConnector = connector
         self.parser_name: str = 'Habs parser'
         self.habs: dict = habs
         self.logger: STDLogger = logger
-        self.parallel_jobs = 5
+        self.streaming: bool = EnvReader.get_bool('PARSER_STREAMING', PARSER_STREAMING)
+        self.queue_size: int = EnvReader.get_int('PARSER_QUEUE_SIZE', PARSER_QUEUE_SIZE)
+        self.extractor = self._get_extractor(HabExtractor)
+        self.executor: Optional[ExtractionExecutor] = executor
+        self.http_client: Optional[HttpClient] = http_client
+        self.throttle: Optional[FetchThrottle] = throttle
+        self.retry_policy: RetryPolicy = RetryPolicy.from_env()
+        self.single_flight: Optional[SingleFlight] = single_flight
+        self.write_batch_size: int = EnvReader.get_int('WRITE_BATCH_SIZE', WRITE_BATCH_SIZE)
+        self.max_page_size: int = EnvReader.get_int('MAX_PAGE_SIZE', MAX_PAGE_SIZE)
+        self.fingerprint = None
+        self.validators: Optional[ValidatorStore] = validators
+        self.backfill_max_pages: int = EnvReader.get_int('HUB_BACKFILL_MAX_PAGES', HUB_BACKFILL_MAX_PAGES)
+        self.known_articles: Optional[KnownArticlesSet] = known_articles
+        self.article_feed: Optional[JobFeed] = article_feed
+        self.job_feed = None
+        self.db: Optional[AsyncConnector] = db
+        self.metrics: Optional[ParserMetrics] = metrics
+        self._next_pages: dict[str, dict] = {}
+        self._to_save: list[tuple[dict, Any]] = []
+        self._failed: list[dict] = []
 
     def parse(self) -> None:
-        """Hit to start parsing"""
+        """Hit to start parsing (in a new event loop, so it can not be used with http_client)"""
+
+        asyncio.run(self.aparse())
+
+    async def aparse(self) -> None:
+        """Parses Habrs in already running event loop (the one, http_client is used in)"""
+
+        jobs = self.habs
+        while jobs:
+            self._next_pages = {}
+            await self.parse_pages(jobs)
+            jobs = self._next_pages
+
+    async def save_data(self, extracted_pages: list[tuple[dict, list[ArticleLinkRecord]]]) -> bool:
+        """Saves articles, found on Habrs' pages, and updates Habrs themselves
+
+        Args:
+            extracted_pages: Tuples (job, record), where job is a dict with data, related to some Habr's page, and
+                record is a list of articles, extracted from this page (None, if page was not modified)
+        Returns:
+            True, if articles were saved and Habrs were updated"""
+
+        urls = [article['article_url'] for _, record in extracted_pages if record for article in record]
+        if not urls:
+            known_urls = set()
+        elif self.known_articles is not None:
+            known_urls = await self._db_read(self.known_articles.find_known, urls)
+        else:
+            known_urls = await self._db_read(self.connector.get_known_article_urls, urls)
+
+        articles = []
+        habs = []
+        for job, record in extracted_pages:
+            # Habr itself is updated only once, after its first page
+            is_first_page = job.get('page', 1) == 1
+
+            if record is None:
+                if is_first_page:
+                    habs.append((job, 'Not modified'))
+                continue
+
+            new_articles = 0
+            for article in record:
+                if article['article_url'] in known_urls:
+                    continue
+                # The same article can be found on several Habrs
+                known_urls.add(article['article_url'])
+                print('')
+                print(article['article_header'])
+                print(article['article_url'])
+                articles.append({**article, 'hab_id': job['hab_id']})
+                new_articles += 1
+
+            if new_articles:
+                self._add_next_page(job)
+            if is_first_page:
+                habs.append((job, 'Success!'))
+
+        articles_saved = await self._save_articles(articles)
+        habs_updated = await self._update_habs(habs)
+
+        return articles_saved and habs_updated
+
+    async def save_failures(self, failed_jobs: list[dict]) -> None:
+        """Saves reasons, why Habrs' pages were not loaded
+
+        Args:
+            failed_jobs: Dicts with data, related to Habrs, that were not loaded"""
+
+        # Failure of a deeper page only stops crawling of a Habr (e.g. there are no more pages)
+        failed_habs = []
+        for job in failed_jobs:
+            if job.get('page', 1) == 1:
+                failed_habs.append(job)
+            else:
+                print(f'Page {job["page"]} of Habr "{job["hub_url"]}" was not loaded ({job["error"]}), crawling stops')
 
-        asyncio.run(self.parse_pages(self.habs))
+        if not failed_habs:
+            return
 
-    def parse_data_from_html(self, completed_jobs: list) -> None:
-        """Parses data from loaded HTML
+        table_name: str = os.getenv('HABS_TABLE')
+        data = {
+            'table_name': table_name,
+            'rows': [
+                {
+                    'where': {
+                        'id': job['hab_id']
+                    },
+                    'data': {
+                        'last_status': job['error'][:100]
+                    }
+                }
+                for job in failed_habs
+            ]
+        }
+
+        await self._db_write(self.connector.bulk_update, data)
+
+    def _add_next_page(self, job: dict) -> None:
+        """Adds a job for the next page of the same Habr, unless Habr is crawled deep enough
 
         Args:
-            completed_jobs: List with dicts, where each dict stores data, related to some web-page"""
-
-        for job in completed_jobs:
-            html = job.get('html')
-            if html:
-                soup = BeautifulSoup(html, 'html.parser')
-                article_headers = soup.find_all('h2', class_='tm-title tm-title_h2')
-
-                for header in article_headers:
-                    link = header.find('a')
-                    if link:
-                        article_header = link.find('span').text
-                        article_url = link.get('href')
-                        if article_header and article_url:
-                            article_url = f'https://habr.com{article_url}'
-                            print('')
-                            print(article_header)
-                            print(article_url)
-                            job['article_header'] = article_header
-                            job['article_url'] = article_url
-                            self._save_articles(job)
-
-                self._update_hab(job)
-
-    def _save_articles(self, data: dict) -> None:
+            job: Data, related to the current page of a Habr"""
+
+        page = job.get('page', 1) + 1
+        if 'max_pages' in job:
+            max_pages = job['max_pages']
+        elif job.get('last_parsed'):
+            max_pages = HUB_MAX_PAGES
+        else:
+            max_pages = min(self.backfill_max_pages, HUB_MAX_PAGES)
+
+        if page > max_pages:
+            return
+
+        hub_url = job.get('hub_url', job['url'])
+        self._next_pages[f'{job["hab_id"]}:{page}'] = {
+            'hab_id': job['hab_id'],
+            'hub_url': hub_url,
+            'url': f'{hub_url.rstrip("/")}/page{page}/',
+            'page': page,
+            'max_pages': max_pages
+        }
+
+    async def _save_articles(self, articles: list[dict]) -> bool:
         """Saves data, collected for articles (and articles themselves)
 
         Args:
-            data: Data, related to a specific article"""
+            articles: Data, related to specific articles
+        Returns:
+            True, if articles were saved (or there were none)"""
+
+        if not articles:
+            return True
 
+        # Articles, that go straight to the feed, are leased to this worker, so other workers do not take them
+        lease = self.article_feed.lease() if self.article_feed is not None else {}
         article_table: str = os.getenv('ARTICLES_TABLE')
         data = {
             'table_name': article_table,
-            'data': {
-                'url': data['article_url'],
-                'date_collected': datetime.datetime.now(),
-                'parse_this': 1,
-                'header': data['article_header'],
-                'habr_id': data['hab_id']
-            }
+            'data': [
+                {
+                    'url': article['article_url'],
+                    'date_collected': datetime.datetime.now(),
+                    'parse_this': True,
+                    'header': article['article_header'],
+                    'habr_id': article['hab_id'],
+                    **lease
+                }
+                for article in articles
+            ]
         }
 
-        self.connector.insert_or_ignore(data)
+        # Index is updated only after articles are actually saved, otherwise they would never be saved
+        saved = await self._db_write(self.connector.bulk_insert_or_ignore, data)
+        if saved and self.known_articles is not None:
+            self.known_articles.update(article['article_url'] for article in articles)
+        if saved and self.article_feed is not None:
+            await self._feed_articles(articles)
+
+        return saved
+
+    async def _feed_articles(self, articles: list[dict]) -> None:
+        """Puts just saved articles into Articles' parser's feed. Articles, that were saved by another worker at the
+        same time (so they were ignored), are skipped
+
+        Args:
+            articles: Data, related to specific articles"""
+
+        leased = await self._db_read(self.connector.get_leased_articles,
+                                     [article['article_url'] for article in articles],
+                                     self.article_feed.lease_owner)
+        for article in articles:
+            if article['article_url'] not in leased:
+                continue
+
+            self.article_feed.put({
+                'habr_id': article['hab_id'],
+                'url': article['article_url'],
+                'header': article['article_header'],
+                'article_id': leased[article['article_url']],
+                'content_hash': None
+            })
 
-    def _update_hab(self, data: dict) -> None:
-        """Updates Habr's data in DB, after habr is parsed
+    async def _update_habs(self, habs: list[tuple[dict, str]]) -> bool:
+        """Updates Habrs' data in DB, after habrs are parsed
 
         Args:
-            data: Data, related tio this Habr"""
+            habs: Tuples (data, related to Habr, status of its parsing)
+        Returns:
+            True, if Habrs were updated"""
 
         table_name: str = os.getenv('HABS_TABLE')
         data = {
             'table_name': table_name,
-            'where': {
-                'id': data['hab_id']
-            },
-            'data': {
-                'last_parsed': datetime.datetime.now(),
-                'last_status': 'Success!'
-            }
+            'rows': [
+                {
+                    'where': {
+                        'id': hab['hab_id']
+                    },
+                    'data': {
+                        'last_parsed': datetime.datetime.now(),
+                        'last_status': status
+                    }
+                }
+                for hab, status in habs
+            ]
         }
 
-        self.connector.update(data)
+        return await self._db_write(self.connector.bulk_update, data)
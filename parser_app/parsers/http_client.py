@@ -0,0 +1,157 @@
+"""HTTP-client, shared by all parsers during the whole application's run"""
+
+
+import types
+
+from typing import Any, Optional
+
+import aiohttp
+
+from parser_app.utils.constants import HTTP_LIMIT, HTTP_LIMIT_PER_HOST, HTTP_KEEPALIVE_TIMEOUT, HTTP_DNS_CACHE_TTL, \
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_TOTAL_TIMEOUT
+from parser_app.utils.env_reader import EnvReader
+
+
+class HttpClient:
+    """Keeps one AIOHttp-session with a pool of connections, so connections (with their TCP and TLS handshakes) and
+    resolved addresses are reused by all parsers, instead of being made anew for every batch of pages.
+
+    Session is bound to the event loop, it was created in, so client must be used in one loop, which lives as long as
+    the client does. Session is created on first use, close() must be called on shutdown.
+
+    Attributes:
+        limit: Max number of open connections to all hosts
+        limit_per_host: Max number of open connections to a single host
+        keepalive_timeout: Seconds, idle connection is kept open to be reused
+        dns_cache_ttl: Seconds, resolved addresses are cached
+        connect_timeout: Seconds to wait for a new connection to be made
+        read_timeout: Seconds to wait for the next part of a response
+        total_timeout: Max seconds for the whole request
+        _session: AIOHttp's session (None, until it is used)
+        _stats: Counters of requests, connections and DNS-lookups"""
+
+    def __init__(self,
+                 limit: int,
+                 limit_per_host: int,
+                 keepalive_timeout: float,
+                 dns_cache_ttl: int,
+                 connect_timeout: float,
+                 read_timeout: float,
+                 total_timeout: float):
+        """Init
+
+        Args:
+            limit: Max number of open connections to all hosts
+            limit_per_host: Max number of open connections to a single host
+            keepalive_timeout: Seconds, idle connection is kept open to be reused
+            dns_cache_ttl: Seconds, resolved addresses are cached
+            connect_timeout: Seconds to wait for a new connection to be made
+            read_timeout: Seconds to wait for the next part of a response
+            total_timeout: Max seconds for the whole request"""
+
+        self.limit: int = limit
+        self.limit_per_host: int = limit_per_host
+        self.keepalive_timeout: float = keepalive_timeout
+        self.dns_cache_ttl: int = dns_cache_ttl
+        self.connect_timeout: float = connect_timeout
+        self.read_timeout: float = read_timeout
+        self.total_timeout: float = total_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._stats: dict[str, int] = {
+            'requests': 0,
+            'new_connections': 0,
+            'reused_connections': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0
+        }
+
+    @staticmethod
+    def from_env() -> 'HttpClient':
+        """Makes client with settings, set in .env
+
+        Returns:
+            HTTP-client"""
+
+        return HttpClient(
+            limit=EnvReader.get_int('HTTP_LIMIT', HTTP_LIMIT),
+            limit_per_host=EnvReader.get_int('HTTP_LIMIT_PER_HOST', HTTP_LIMIT_PER_HOST),
+            keepalive_timeout=EnvReader.get_float('HTTP_KEEPALIVE_TIMEOUT', HTTP_KEEPALIVE_TIMEOUT),
+            dns_cache_ttl=EnvReader.get_int('HTTP_DNS_CACHE_TTL', HTTP_DNS_CACHE_TTL),
+            connect_timeout=EnvReader.get_float('HTTP_CONNECT_TIMEOUT', HTTP_CONNECT_TIMEOUT),
+            read_timeout=EnvReader.get_float('HTTP_READ_TIMEOUT', HTTP_READ_TIMEOUT),
+            total_timeout=EnvReader.get_float('HTTP_TOTAL_TIMEOUT', HTTP_TOTAL_TIMEOUT)
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Returns session, creates it if needed. Must be called from the running event loop
+
+        Returns:
+            AIOHttp's session"""
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=self.total_timeout,
+                sock_connect=self.connect_timeout,
+                sock_read=self.read_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=timeout,
+                                                  trace_configs=[self._make_trace_config()])
+
+        return self._session
+
+    async def close(self) -> None:
+        """Closes session with all its connections"""
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def stats(self) -> dict[str, Any]:
+        """Reports, how connections are used
+
+        Returns:
+            Counters of requests, new and reused connections, DNS-cache hits and misses, and limits of the pool"""
+
+        return {
+            **self._stats,
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host
+        }
+
+    def _make_trace_config(self) -> aiohttp.TraceConfig:
+        """Makes tracing-config, that counts requests, connections and DNS-lookups
+
+        Returns:
+            Tracing-config for AIOHttp's session"""
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_end.append(self._count('requests'))
+        trace_config.on_connection_create_end.append(self._count('new_connections'))
+        trace_config.on_connection_reuseconn.append(self._count('reused_connections'))
+        trace_config.on_dns_cache_hit.append(self._count('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(self._count('dns_cache_misses'))
+
+        return trace_config
+
+    def _count(self, counter: str):
+        """Makes tracing-callback, that increments a counter
+
+        Args:
+            counter: Name of the counter in _stats
+        Returns:
+            Async callback for AIOHttp's tracing"""
+
+        async def callback(session: aiohttp.ClientSession,
+                           trace_config_ctx: types.SimpleNamespace,
+                           params: Any) -> None:
+            self._stats[counter] += 1
+
+        return callback
@@ -0,0 +1,65 @@
+"""Storage for HTTP-validators (ETag, Last-Modified), used to make conditional requests"""
+
+
+from typing import Mapping
+
+
+class ValidatorStore:
+    """Keeps HTTP-validators, that server returned for each URL, so the next request to the same URL can be made
+    conditional. If page was not changed since the last request, server answers with 304 and empty body.
+
+    Store lives as long as application does, validators are not saved into DB (so after restart first request to each
+    URL is a full one).
+
+    Attributes:
+        _validators: URL -> {'etag': '...', 'last_modified': '...'}"""
+
+    def __init__(self):
+        """Init"""
+
+        self._validators: dict[str, dict[str, str]] = {}
+
+    def get_headers(self, url: str) -> dict[str, str]:
+        """Makes headers for a conditional request
+
+        Args:
+            url: URL, that is going to be requested
+        Returns:
+            Headers with validators, saved for this URL (empty dict, if there are none)"""
+
+        validators = self._validators.get(url, {})
+        headers = {}
+        if 'etag' in validators:
+            headers['If-None-Match'] = validators['etag']
+        if 'last_modified' in validators:
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        return headers
+
+    @staticmethod
+    def pick(response_headers: Mapping[str, str]) -> dict[str, str]:
+        """Takes validators out of server's response, so they can be kept with the page, until it is saved
+
+        Args:
+            response_headers: Headers of server's response (200 or 304)
+        Returns:
+            Headers with validators, that server sent"""
+
+        return {name: response_headers[name] for name in ('ETag', 'Last-Modified') if response_headers.get(name)}
+
+    def update(self, url: str, response_headers: Mapping[str, str]) -> None:
+        """Saves validators from server's response. Validators, that were not sent this time, are kept as they are
+
+        Args:
+            url: Requested URL
+            response_headers: Headers of server's response (200 or 304)"""
+
+        validators = self._validators.setdefault(url, {})
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if etag:
+            validators['etag'] = etag
+        if last_modified:
+            validators['last_modified'] = last_modified
+        if not validators:
+            del self._validators[url]
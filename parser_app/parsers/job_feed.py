@@ -0,0 +1,84 @@
+"""Queue of jobs, passed from one parser to another, while both of them run"""
+
+
+import asyncio
+import datetime
+
+from typing import Optional
+
+
+class JobFeed:
+    """Passes jobs, found by one parser (e.g. articles, found on Habrs' pages), straight to another parser, that runs
+    at the same time, so they are fetched in the same pass instead of waiting for the next DB check.
+
+    Jobs are leased to the worker, that found them, when they are saved into DB, so other workers do not fetch them too.
+    Producer must close the feed, when it is done: consumer stops after it takes all jobs from closed feed.
+
+    Attributes:
+        lease_owner: Id of the worker, jobs are leased to
+        lease_duration: Time, jobs are leased for (lease is renewed, while worker runs)
+        _queue: Jobs, waiting to be taken, None after the last job
+        _closed: True, if there will be no more jobs"""
+
+    def __init__(self, lease_owner: str, lease_duration: datetime.timedelta):
+        """Init
+
+        Args:
+            lease_owner: Id of the worker, jobs are leased to
+            lease_duration: Time, jobs are leased for"""
+
+        self.lease_owner: str = lease_owner
+        self.lease_duration: datetime.timedelta = lease_duration
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._closed: bool = False
+
+    def lease(self) -> dict:
+        """Makes values of lease columns for rows, that are saved to be put into the feed
+
+        Returns:
+            Dict with lease_owner and lease_expires"""
+
+        return {
+            'lease_owner': self.lease_owner,
+            'lease_expires': datetime.datetime.now() + self.lease_duration
+        }
+
+    def put(self, job: dict) -> None:
+        """Adds a job (feed is not bounded, so it never waits: jobs are small, pages are not kept in them)
+
+        Args:
+            job: Data, related to a web-page"""
+
+        self._queue.put_nowait(job)
+
+    def close(self) -> None:
+        """Tells consumers, that there will be no more jobs"""
+
+        if not self._closed:
+            self._closed = True
+            self._queue.put_nowait(None)
+
+    async def get(self) -> Optional[dict]:
+        """Takes the next job, waits for it, if needed
+
+        Returns:
+            Job or None, if feed is closed and all jobs are taken"""
+
+        job = await self._queue.get()
+        if job is None:
+            # Every consumer has to get None, so it is put back
+            self._queue.put_nowait(None)
+
+        return job
+
+    async def get_all(self) -> dict:
+        """Waits, until feed is closed, and takes all its jobs
+
+        Returns:
+            Jobs by their URLs"""
+
+        jobs = {}
+        while (job := await self.get()) is not None:
+            jobs[job['url']] = job
+
+        return jobs
@@ -0,0 +1,169 @@
+"""In-memory indexes of articles, that are already saved into DB"""
+
+
+import hashlib
+import math
+
+from typing import Iterable
+
+from parser_app.db_connector.connector_interface import IConnector
+from parser_app.utils.constants import KNOWN_ARTICLES_CAPACITY, KNOWN_ARTICLES_FP_RATE
+from parser_app.utils.env_reader import EnvReader
+
+
+class KnownArticlesSet:
+    """Keeps URLs of all saved articles in a set, so checking, whether an article is new, needs no query to DB.
+
+    Index is filled from DB once (see MainController) and is updated by parser after each insert. Articles, that were
+    added into DB by someone else, are not known to the index: they are treated as new and are skipped by INSERT OR
+    IGNORE.
+
+    Attributes:
+        _urls: URLs of saved articles"""
+
+    def __init__(self):
+        """Init"""
+
+        self._urls: set[str] = set()
+
+    def update(self, urls: Iterable[str]) -> None:
+        """Adds URLs of saved articles
+
+        Args:
+            urls: URLs of articles"""
+
+        self._urls.update(urls)
+
+    def find_known(self, urls: list[str]) -> set[str]:
+        """Finds out, which articles are already saved
+
+        Args:
+            urls: URLs of articles
+        Returns:
+            URLs, that are already saved"""
+
+        return {url for url in urls if url in self._urls}
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+
+class KnownArticlesBloomFilter(KnownArticlesSet):
+    """Keeps URLs of saved articles in a Bloom filter: it takes about 10 bits per URL (with 1% of false positives)
+    instead of a whole string, so it fits archives of any size.
+
+    Filter can tell for sure only, that an article is new. Articles, that are 'probably known', are checked in DB, so
+    false positives cost a query, but never lose an article. If there are more articles, than capacity, false positives
+    get more frequent.
+
+    Attributes:
+        connector: Connector to check 'probably known' articles in DB
+        size: Number of bits in the filter
+        hashes: Number of bits, set for each URL
+        _bits: The filter
+        _count: Number of added URLs"""
+
+    def __init__(self, connector: IConnector, capacity: int, false_positive_rate: float):
+        """Init
+
+        Args:
+            connector: Connector to check 'probably known' articles in DB
+            capacity: Expected number of articles
+            false_positive_rate: Expected share of new articles, that are reported as 'probably known'"""
+
+        self.connector: IConnector = connector
+        capacity = max(capacity, 1)
+        self.size: int = max(int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2), 8)
+        self.hashes: int = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits: bytearray = bytearray((self.size + 7) // 8)
+        self._count: int = 0
+
+    def update(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            for position in self._get_positions(url):
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self._count += 1
+
+    def find_known(self, urls: list[str]) -> set[str]:
+        probably_known = [url for url in urls if self._might_contain(url)]
+        if not probably_known:
+            return set()
+
+        return self.connector.get_known_article_urls(probably_known)
+
+    def _might_contain(self, url: str) -> bool:
+        """Checks URL in the filter
+
+        Args:
+            url: URL of an article
+        Returns:
+            False, if article is new for sure, True, if it was probably saved"""
+
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._get_positions(url))
+
+    def _get_positions(self, url: str) -> list[int]:
+        """Calculates bits of the URL (double hashing: two halves of one digest make all positions)
+
+        Args:
+            url: URL of an article
+        Returns:
+            Positions of bits in the filter"""
+
+        digest = hashlib.blake2b(url.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class KnownArticlesFactory:
+    """Factory that can select a type of index of known articles
+
+    Attributes:
+        __indexes: Collection with registered indexes"""
+
+    __indexes = {
+            'set': KnownArticlesSet,
+            'bloom': KnownArticlesBloomFilter
+        }
+
+    @staticmethod
+    def get_index(index_name: str) -> type[KnownArticlesSet] | LookupError:
+        """Selects a type of index
+
+        Args:
+            index_name: Name of an index ('set' or 'bloom')
+        Returns:
+            Selected index or LookupError, in case there is no requested index"""
+
+        selected_index = KnownArticlesFactory.__indexes.get(index_name, None)
+        if not selected_index:
+            selected_index = LookupError(f'Index of known articles "{index_name}" does not exist!')
+
+        return selected_index
+
+    @staticmethod
+    def make_index(index_name: str, connector: IConnector) -> KnownArticlesSet | LookupError:
+        """Makes an empty index of selected type (Bloom filter's capacity and rate of false positives are set in .env)
+
+        Args:
+            index_name: Name of an index ('set' or 'bloom')
+            connector: Connector to check articles in DB (used by Bloom filter only)
+        Returns:
+            Index or LookupError, in case there is no requested index"""
+
+        index = KnownArticlesFactory.get_index(index_name)
+        if isinstance(index, Exception):
+            return index
+
+        if index is KnownArticlesBloomFilter:
+            return KnownArticlesBloomFilter(
+                connector,
+                capacity=EnvReader.get_int('KNOWN_ARTICLES_CAPACITY', KNOWN_ARTICLES_CAPACITY),
+                false_positive_rate=EnvReader.get_float('KNOWN_ARTICLES_FP_RATE', KNOWN_ARTICLES_FP_RATE)
+            )
+
+        return index()
@@ -2,75 +2,392 @@
 
 
 import asyncio
+import contextlib
+import functools
+import time
+import traceback
 import aiohttp
 
 from abc import ABC, abstractmethod
-from typing import Awaitable
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from parser_app.db_connector.async_connector import AsyncConnector
+from parser_app.metrics.parser_metrics import ParserMetrics
+from parser_app.parsers.extraction_executor import ExtractionExecutor
+from parser_app.parsers.fetch_throttle import FetchThrottle
+from parser_app.parsers.http_client import HttpClient
+from parser_app.parsers.job_feed import JobFeed
+from parser_app.parsers.retry_policy import RetryPolicy
+from parser_app.parsers.single_flight import SingleFlight
+from parser_app.parsers.soup_backends import SoupBackendFactory
+from parser_app.utils.constants import READ_CHUNK_SIZE, ACCEPT_ENCODING, EXTRACTION_BACKEND
+from parser_app.utils.env_reader import EnvReader
+from parser_app.parsers.http_validators import ValidatorStore
+
+
+FETCH_RESULT_KEYS = ('html', 'status', 'retry_after', 'error', 'not_modified', 'oversized', 'validators')
+"""Keys of a job, that fetch_page sets, so they can be copied into other jobs with the same URL"""
+
+T = TypeVar('T')
 
 
 class ParserInterface(ABC):
     """Interface to create different parsers
 
     Attributes:
+        connector: Connector to get data from/in DB
         logger: Logger-object to log messages into DB (or/and printing)
         parser_name: Name of the concrete implementation
-        parallel_jobs: Number of web-pages, that will be parsed in parallel"""
+        streaming: True to extract and save each page as soon as it is fetched, False to wait for the whole batch
+        queue_size: Max number of fetched pages, waiting for extraction (streaming mode only)
+        extractor: Function, that extracts a record from HTML (must be importable, to be executed in another process)
+        executor: Pool of processes to run extractor in (streaming mode only). None to run extractor in this thread
+        write_batch_size: Max number of extracted pages, that are saved into DB together (streaming mode only)
+        max_page_size: Max number of bytes of a (decompressed) page. Bigger pages are not loaded
+        fingerprint: Function, that makes a fingerprint of page's content. If it matches job's 'content_hash' (made,
+            when the page was parsed last time), page is not extracted again. None to always extract pages
+        validators: HTTP-validators of already fetched pages, to make conditional requests. None to always make full
+            requests
+        http_client: Client with a pool of connections, shared by parsers. None to open new session for every batch
+        throttle: Regulates number and rate of requests to each host. None to make a new one for every batch
+        retry_policy: Tells, whether failed requests should be retried and when
+        single_flight: Collapses concurrent loads of the same URL into one. None to make a new one for every batch
+        job_feed: Jobs, that are added by another parser, while this one runs. They are parsed after jobs, passed to
+            parse_pages, until the feed is closed. None to parse only jobs, passed to parse_pages
+        db: Runs connector's queries in DB's thread, so event loop keeps fetching pages, while DB is busy. None to run
+            queries right in event loop
+        metrics: Metrics of fetching, extraction and saving, shared by parsers. None to not collect them
+        _to_save: Extracted pages, waiting to be saved (streaming mode only)
+        _failed: Pages, that were not loaded, waiting for their failures to be saved (streaming mode only)"""
 
     @abstractmethod
     def __init__(self):
         """Init"""
 
+        self.connector = None
         self.logger = None
         self.parser_name = ''
-        self.parallel_jobs = 5
+        self.streaming = True
+        self.queue_size = 20
+        self.extractor: Optional[Callable[[str], Any]] = None
+        self.executor: Optional[ExtractionExecutor] = None
+        self.write_batch_size = 20
+        self.max_page_size = 10485760
+        self.fingerprint: Optional[Callable[[str], str]] = None
+        self.validators: Optional[ValidatorStore] = None
+        self.http_client: Optional[HttpClient] = None
+        self.throttle: Optional[FetchThrottle] = None
+        self.retry_policy: RetryPolicy = RetryPolicy(retries=0, deadline=60, backoff_base=1, backoff_max=1)
+        self.single_flight: Optional[SingleFlight] = None
+        self.job_feed: Optional[JobFeed] = None
+        self.db: Optional[AsyncConnector] = None
+        self.metrics: Optional[ParserMetrics] = None
+        self._to_save: list[tuple[dict, Any]] = []
+        self._failed: list[dict] = []
 
     @abstractmethod
-    def parse_data_from_html(self, completed_jobs: list) -> None:
-        """Concrete logic to parse data from loaded HTML
+    async def save_data(self, extracted_pages: list[tuple[dict, Any]]) -> bool:
+        """Concrete logic to save data, extracted from pages. All pages should be saved with bulk-queries
 
         Args:
-            completed_jobs: Each job is a collection, related to a single loaded page"""
+            extracted_pages: Tuples (job, record), where job is a collection, related to a single loaded page, and
+                record is data, that extractor returned for this page. Record is None, if page was not modified since
+                the last request (see fetch_page) or since the last parsing (see _is_unchanged)
+        Returns:
+            True, if all pages were saved (only then their HTTP-validators are kept, see _keep_validators)"""
+
+        pass
+
+    @abstractmethod
+    async def save_failures(self, failed_jobs: list[dict]) -> None:
+        """Concrete logic to save reasons, why pages were not loaded. All pages should be saved with bulk-queries
+
+        Args:
+            failed_jobs: Collections, related to pages, that were not loaded. Reason is kept in job['error']"""
 
         pass
 
+    @staticmethod
+    def _get_extractor(extractor_class: type) -> functools.partial:
+        """Makes extractor, that uses backend, set in .env
+
+        Args:
+            extractor_class: Class with static extract(html, backend_name), e.g. ArticleExtractor
+        Returns:
+            Extractor, that only needs HTML"""
+
+        backend_name = EnvReader.get_str('EXTRACTION_BACKEND', EXTRACTION_BACKEND)
+        backend = SoupBackendFactory.get_backend(backend_name)
+        if isinstance(backend, Exception):
+            raise backend
+
+        return functools.partial(extractor_class.extract, backend_name=backend_name)
+
+    async def parse_data_from_html(self, completed_jobs: list) -> None:
+        """Extracts data from loaded HTML and saves it
+
+        Args:
+            completed_jobs: Each job is a collection, related to a single loaded page"""
+
+        extracted_pages = []
+        failed_jobs = []
+        for job in completed_jobs:
+            html = job.get('html')
+            if html and not self._is_unchanged(job, html):
+                started = time.perf_counter()
+                record = self.extractor(html)
+                if self.metrics is not None:
+                    self.metrics.observe_extraction(self.parser_name, job, time.perf_counter() - started)
+                extracted_pages.append((job, record))
+            elif job.get('not_modified'):
+                extracted_pages.append((job, None))
+            elif job.get('error'):
+                failed_jobs.append(job)
+
+        await self._save_pages(extracted_pages, failed_jobs)
+
+    async def _db_read(self, action: Callable[..., T], *args: Any) -> T:
+        """Runs a query in DB's thread, if there is db, so event loop does not wait for it
+
+        Args:
+            action: Method of connector (or any function, that uses it)
+            args: Arguments of the action
+        Returns:
+            Whatever action returns"""
+
+        if self.db is None:
+            return action(*args)
+
+        return await self.db.acall(action, *args)
+
+    async def _db_write(self, action: Callable[..., T], *args: Any) -> T:
+        """Runs a write in DB's thread, if there is db. Writes of all parsers, made at the same time, are committed
+        together there
+
+        Args:
+            action: Method of connector, that writes into DB
+            args: Arguments of the action
+        Returns:
+            Whatever action returns, after it is committed"""
+
+        if self.db is None:
+            return action(*args)
+
+        return await self.db.awrite(action, *args)
+
     async def fetch_page(self,
                          session: aiohttp.client.ClientSession,
                          job_data: dict) -> dict:
-        """Fetches a web-page
+        """Fetches a web-page.
+
+        If there are validators for this page, request is made conditional. In case page was not modified, server
+        answers with 304 and no body: then job_data['html'] is None and job_data['not_modified'] is True.
+        New validators are only kept in job_data['validators'], they are saved into store after the page is saved.
+        Page is read chunk by chunk, so loading of a page, that is bigger than max_page_size, is aborted, before it
+        takes much memory: then job_data['html'] is None and job_data['oversized'] is True.
+        If page was not loaded, reason is kept in job_data['error']
 
         Args:
             session: AIOHttp's session object
             job_data: Data, related to concrete web-page"""
 
         url = job_data['url']
-        async with session.get(url) as response:
+        # Same job can be fetched again later, so result of the previous fetch is dropped
+        job_data.pop('not_modified', None)
+        job_data.pop('oversized', None)
+        job_data.pop('error', None)
+        job_data.pop('validators', None)
+        job_data['html'] = None
+        job_data['status'] = None
+        job_data['retry_after'] = None
+        headers = self.validators.get_headers(url) if self.validators is not None else {}
+        headers['Accept-Encoding'] = ACCEPT_ENCODING
+        async with session.get(url, headers=headers) as response:
+            job_data['status'] = response.status
+            job_data['retry_after'] = self._get_retry_after(response)
             if response.status == 200:
-                html = await response.text()
+                html = await self._read_page(response)
+                if html is None:
+                    msg = f'URL {url} is bigger than {self.max_page_size} bytes, loading was aborted'
+                    self.logger.parser_log(msg, parser_name=self.parser_name)
+                    job_data['oversized'] = True
+                    job_data['error'] = f'Page is bigger than {self.max_page_size} bytes'
+
+                    return job_data
+
                 msg = f'URL {url} was successfully fetched!'
                 self.logger.parser_log(msg, parser_name=self.parser_name)
                 job_data['html'] = html
+                if self.validators is not None:
+                    job_data['validators'] = ValidatorStore.pick(response.headers)
+
+                return job_data
+            elif response.status == 304:
+                msg = f'URL {url} was not modified since the last fetch'
+                self.logger.parser_log(msg, parser_name=self.parser_name)
+                job_data['not_modified'] = True
+                if self.validators is not None:
+                    job_data['validators'] = ValidatorStore.pick(response.headers)
 
                 return job_data
             else:
-                msg = f'Failed to fetch url {url}'
+                msg = f'Failed to fetch url {url} (HTTP {response.status})'
                 self.logger.parser_log(msg, parser_name=self.parser_name)
-                job_data['html'] = None
+                job_data['error'] = f'HTTP {response.status}'
 
                 return job_data
 
+    async def _read_page(self, response: aiohttp.ClientResponse) -> Optional[str]:
+        """Reads page's body chunk by chunk (already decompressed) and decodes it once, with charset, declared by server
+
+        Args:
+            response: Response with status 200
+        Returns:
+            Page's text or None, if page is bigger than max_page_size (connection is closed then)"""
+
+        # For compressed page Content-Length is a compressed size, so it tells nothing about the size of the page
+        if response.content_length is not None and response.content_length > self.max_page_size and \
+                not response.headers.get('Content-Encoding'):
+            response.close()
+            return None
+
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+            size += len(chunk)
+            if size > self.max_page_size:
+                response.close()
+                return None
+            chunks.append(chunk)
+
+        body = b''.join(chunks)
+        # Chunks are not needed anymore, so at most body and its text are kept in memory at once
+        del chunks
+        try:
+            return body.decode(response.charset or 'utf-8', errors='replace')
+        except LookupError:
+            # Server declared unknown charset
+            return body.decode('utf-8', errors='replace')
+
+    @staticmethod
+    def _get_retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+        """Reads, how long server asked to wait before the next request (only delay in seconds is supported)
+
+        Args:
+            response: Server's response
+        Returns:
+            Seconds to wait or None, if server did not ask to wait"""
+
+        retry_after = response.headers.get('Retry-After', '')
+        if response.status in (429, 503) and retry_after.isdigit():
+            return float(retry_after)
+
+        return None
+
     async def process_url(self,
-                          semaphore: asyncio.locks.Semaphore,
                           session: aiohttp.client.ClientSession,
                           job_data: dict) -> dict:
-        """Processes pages with semaphore
+        """Loads a page. If the same URL is already being loaded (e.g. the same article was found on several Habrs),
+        waits for that load and copies its result into job_data, instead of making another request
 
         Args:
-            semaphore: Regulates the number of parallel requests
             session: AIOHttp's session object
             job_data: Data, related to concrete web-page"""
 
-        async with semaphore:
-            return await self.fetch_page(session, job_data)
+        async def load() -> dict:
+            await self._load_url(session, job_data)
+            return {key: job_data[key] for key in FETCH_RESULT_KEYS if key in job_data}
+
+        result = await self.single_flight.do(job_data['url'], load)
+        # Job of the leader already has the result, other jobs get its copy
+        for key in FETCH_RESULT_KEYS:
+            job_data.pop(key, None)
+        job_data.update(result)
+
+        return job_data
+
+    async def _load_url(self,
+                        session: aiohttp.client.ClientSession,
+                        job_data: dict) -> dict:
+        """Fetches a page, when throttle allows it, and reports the result back to throttle.
+
+        Transient failures (timeouts, connection errors, 5xx, 429) are retried with backoff, while retry_policy allows
+        it. All attempts together can not take longer, than policy's deadline. If page was not loaded, reason is kept
+        in job_data['error']
+
+        Args:
+            session: AIOHttp's session object
+            job_data: Data, related to concrete web-page"""
+
+        url = job_data['url']
+        deadline = time.monotonic() + self.retry_policy.deadline
+        attempt = 0
+
+        while True:
+            if not self.throttle.allows(url):
+                # Reason of the previous attempt's failure is kept, if there was one
+                if attempt == 0:
+                    job_data['html'] = None
+                    job_data['error'] = 'Host is paused after repeated failures'
+                if self.metrics is not None:
+                    self.metrics.observe_fetch(self.parser_name, job_data, 'paused', None)
+                msg = f'URL {url} was not fetched: its host is paused after repeated failures'
+                self.logger.parser_log(msg, parser_name=self.parser_name)
+                return job_data
+
+            async with self.throttle.slot(url) as slot:
+                started = time.perf_counter()
+                result = None
+                try:
+                    await asyncio.wait_for(self.fetch_page(session, job_data), max(deadline - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    job_data['error'] = f'Timeout, page was not loaded in {self.retry_policy.deadline} seconds'
+                    slot.failed = True
+                    result = 'timeout'
+                except aiohttp.ClientError as e:
+                    job_data['error'] = f'Connection error ({type(e).__name__})'
+                    slot.failed = True
+                    result = 'connection_error'
+                slot.status = job_data.get('status')
+                slot.retry_after = job_data.get('retry_after')
+
+            if self.metrics is not None:
+                if result is None:
+                    result = 'oversized' if job_data.get('oversized') else str(job_data.get('status'))
+                self.metrics.observe_fetch(self.parser_name, job_data, result, time.perf_counter() - started)
+
+            if slot.failed:
+                msg = f'Failed to fetch url {url} ({job_data["error"]})'
+                self.logger.parser_log(msg, parser_name=self.parser_name)
+            if not self._should_retry(job_data, attempt):
+                break
+
+            delay = max(self.retry_policy.backoff(attempt), job_data.get('retry_after') or 0)
+            if time.monotonic() + delay >= deadline:
+                break
+
+            msg = f'Retrying url {url} in {delay:.1f} seconds'
+            self.logger.parser_log(msg, parser_name=self.parser_name)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        return job_data
+
+    def _should_retry(self, job_data: dict, attempt: int) -> bool:
+        """Tells, if failed page should be requested once again
+
+        Args:
+            job_data: Data, related to a page, after an attempt to load it
+            attempt: Number of the attempt (0 for the first one)
+        Returns:
+            True, if failure is transient and there are attempts left"""
+
+        if not job_data.get('error') or attempt >= self.retry_policy.retries:
+            return False
+
+        status = job_data.get('status')
+
+        return status is None or self.retry_policy.is_transient(status)
 
     async def parse_pages(self, jobs: dict) -> None:
         """Asynchronously fetches and processes multiple pages based on the job data provided.
@@ -78,13 +395,201 @@ class ParserInterface(ABC):
         Args:
             jobs: Dict with data, related to different web-pages to parse"""
 
-        semaphore = asyncio.Semaphore(self.parallel_jobs)
+        if self.throttle is None:
+            self.throttle = FetchThrottle.from_env()
+        if self.single_flight is None:
+            self.single_flight = SingleFlight()
+
+        if self.streaming:
+            await self.stream_pages(jobs)
+        else:
+            await self.gather_pages(jobs)
+            if self.job_feed is not None:
+                await self.gather_pages(await self.job_feed.get_all())
+
+    async def gather_pages(self, jobs: dict) -> None:
+        """Fetches all pages first and only then processes them all at once
+
+        Args:
+            jobs: Dict with data, related to different web-pages to parse"""
+
         tasks = []
 
-        async with aiohttp.ClientSession() as session:
+        async with self._open_session() as session:
             for job_data in jobs.values():
-                task = asyncio.create_task(self.process_url(semaphore, session, job_data))
+                task = asyncio.create_task(self.process_url(session, job_data))
                 tasks.append(task)
 
             completed_jobs = await asyncio.gather(*tasks)
-            self.parse_data_from_html(completed_jobs)
+            await self.parse_data_from_html(completed_jobs)
+
+    async def stream_pages(self, jobs: dict) -> None:
+        """Fetches pages and processes each of them as soon as it is fetched.
+
+        Fetched pages are passed to extraction through a bounded queue: when extraction can not keep up, the queue gets
+        full and fetching pauses. So no more than (throttle's ceiling + queue_size) pages are kept in memory at once, no
+        matter how many jobs were provided. Number of pages, that are actually fetched in parallel, is regulated by
+        throttle. If there is job_feed, its jobs are fetched as soon as they are added, until it is closed.
+
+        Args:
+            jobs: Dict with data, related to different web-pages to parse"""
+
+        fetched_pages = asyncio.Queue(maxsize=self.queue_size)
+        jobs_iterator = iter(jobs.values())
+        self._to_save = []
+        self._failed = []
+
+        async with self._open_session() as session:
+            fetchers = [asyncio.create_task(self._fetch_worker(session, jobs_iterator, fetched_pages))
+                        for _ in range(self.throttle.ceiling)]
+            # With a pool of processes, each extract-worker keeps one of processes busy
+            extractors_number = self.executor.workers if self.executor else 1
+            extractors = [asyncio.create_task(self._extract_worker(fetched_pages))
+                          for _ in range(extractors_number)]
+
+            try:
+                await asyncio.gather(*fetchers)
+                # None tells extract-worker, that there will be no more pages
+                for _ in extractors:
+                    await fetched_pages.put(None)
+                await asyncio.gather(*extractors)
+                await self._save_extracted()
+            finally:
+                for task in [*fetchers, *extractors]:
+                    task.cancel()
+
+    @contextlib.asynccontextmanager
+    async def _open_session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Provides session to fetch pages with: shared one, if there is http_client, or a new one, that is closed after
+        use
+
+        Yields:
+            AIOHttp's session"""
+
+        if self.http_client is not None:
+            yield await self.http_client.get_session()
+        else:
+            async with aiohttp.ClientSession() as session:
+                yield session
+
+    async def _fetch_worker(self,
+                            session: aiohttp.client.ClientSession,
+                            jobs_iterator: Iterator[dict],
+                            fetched_pages: asyncio.Queue) -> None:
+        """Takes jobs one by one and fetches them, until there are no jobs left (and job_feed, if any, is closed)
+
+        Args:
+            session: AIOHttp's session object
+            jobs_iterator: Iterator over jobs, shared by all fetch-workers
+            fetched_pages: Queue to put fetched pages into"""
+
+        for job_data in jobs_iterator:
+            completed_job = await self.process_url(session, job_data)
+            await fetched_pages.put(completed_job)
+
+        if self.job_feed is None:
+            return
+
+        while (job_data := await self.job_feed.get()) is not None:
+            completed_job = await self.process_url(session, job_data)
+            await fetched_pages.put(completed_job)
+
+    async def _extract_worker(self, fetched_pages: asyncio.Queue) -> None:
+        """Extracts data from fetched pages one by one and saves it, until None is received
+
+        Args:
+            fetched_pages: Queue with fetched pages"""
+
+        while True:
+            completed_job = await fetched_pages.get()
+            if completed_job is None:
+                break
+
+            try:
+                html = completed_job.get('html')
+                if html and not self._is_unchanged(completed_job, html):
+                    started = time.perf_counter()
+                    if self.executor:
+                        record = await self.executor.extract(self.extractor, html)
+                    else:
+                        record = self.extractor(html)
+                    if self.metrics is not None:
+                        self.metrics.observe_extraction(self.parser_name, completed_job, time.perf_counter() - started)
+                    self._to_save.append((completed_job, record))
+                elif completed_job.get('not_modified'):
+                    self._to_save.append((completed_job, None))
+                elif completed_job.get('error'):
+                    self._failed.append(completed_job)
+
+                # Saving is delayed, while there are more pages, that are ready to be extracted
+                if len(self._to_save) + len(self._failed) >= self.write_batch_size or fetched_pages.empty():
+                    await self._save_extracted()
+            except Exception as e:
+                # CancelledError is not an Exception, so cancellation of the worker is not swallowed here
+                error = traceback.format_exc()
+                print(error)
+                # Failure is saved with the next batch, so page is not left without status
+                completed_job['error'] = f'Extraction error ({type(e).__name__})'
+                self._failed.append(completed_job)
+            finally:
+                # Page is not needed anymore, while job itself stays referenced by the batch
+                completed_job.pop('html', None)
+
+    def _is_unchanged(self, job: dict, html: str) -> bool:
+        """Makes a fingerprint of the page and compares it with the one, made when this page was parsed last time.
+        Unchanged page is marked as not_modified, new fingerprint is kept in job['fingerprint'] to be saved
+
+        Args:
+            job: Collection, related to a single loaded page
+            html: Loaded page
+        Returns:
+            True, if page's content is the same, so there is no need to extract data from it again"""
+
+        if self.fingerprint is None:
+            return False
+
+        job['fingerprint'] = self.fingerprint(html)
+        if job['fingerprint'] == job.get('content_hash'):
+            job['not_modified'] = True
+            return True
+
+        return False
+
+    async def _save_extracted(self) -> None:
+        """Saves all extracted pages and failures, that are waiting to be saved"""
+
+        extracted_pages, self._to_save = self._to_save, []
+        failed_jobs, self._failed = self._failed, []
+        await self._save_pages(extracted_pages, failed_jobs)
+
+    async def _save_pages(self, extracted_pages: list[tuple[dict, Any]], failed_jobs: list[dict]) -> None:
+        """Saves extracted pages and failures, measuring, how long it takes
+
+        Args:
+            extracted_pages: Tuples (job, record), see save_data
+            failed_jobs: Pages, that were not loaded, see save_failures"""
+
+        if not extracted_pages and not failed_jobs:
+            return
+
+        started = time.perf_counter()
+        if extracted_pages and await self.save_data(extracted_pages):
+            self._keep_validators(extracted_pages)
+        if failed_jobs:
+            await self.save_failures(failed_jobs)
+        if self.metrics is not None:
+            self.metrics.save_seconds.observe(time.perf_counter() - started, self.parser_name)
+
+    def _keep_validators(self, saved_pages: list[tuple[dict, Any]]) -> None:
+        """Saves HTTP-validators of pages into store, after pages themselves are saved. If they were saved on fetch, a
+        page, that failed to be extracted or saved, would be answered with 304 next time and would never be saved
+
+        Args:
+            saved_pages: Tuples (job, record), that were saved"""
+
+        if self.validators is None:
+            return
+
+        for job, _ in saved_pages:
+            if job.get('validators'):
+                self.validators.update(job['url'], job['validators'])
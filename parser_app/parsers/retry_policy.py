@@ -0,0 +1,81 @@
+"""Policy of retrying failed requests"""
+
+
+import random
+
+from parser_app.utils.constants import FETCH_RETRIES, FETCH_DEADLINE, FETCH_BACKOFF_BASE, FETCH_BACKOFF_MAX
+from parser_app.utils.env_reader import EnvReader
+
+
+TRANSIENT_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+"""Statuses of failures, that may not happen, if request is repeated later"""
+
+PERMANENT_STATUSES = (404, 410)
+"""Statuses, that mean, page does not exist and there is no sense to request it again"""
+
+
+class RetryPolicy:
+    """Tells, whether a failed request should be retried and when. Each page has a deadline for all its attempts, so
+    a batch of pages can not take much longer, than a deadline, no matter how slow the server is.
+
+    Delays between attempts grow exponentially and are randomized (full jitter), so requests, that failed together,
+    are not repeated together.
+
+    Attributes:
+        retries: Max number of repeated attempts (0 to never repeat)
+        deadline: Seconds for all attempts to load a page, including delays between them
+        backoff_base: Seconds. Max delay before the first repeated attempt, is doubled for every next one
+        backoff_max: Seconds. Max delay between attempts"""
+
+    def __init__(self,
+                 retries: int,
+                 deadline: float,
+                 backoff_base: float,
+                 backoff_max: float):
+        """Init
+
+        Args:
+            retries: Max number of repeated attempts (0 to never repeat)
+            deadline: Seconds for all attempts to load a page, including delays between them
+            backoff_base: Seconds. Max delay before the first repeated attempt, is doubled for every next one
+            backoff_max: Seconds. Max delay between attempts"""
+
+        self.retries: int = max(retries, 0)
+        self.deadline: float = deadline
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+
+    @staticmethod
+    def from_env() -> 'RetryPolicy':
+        """Makes policy with settings, set in .env
+
+        Returns:
+            Retry policy"""
+
+        return RetryPolicy(
+            retries=EnvReader.get_int('FETCH_RETRIES', FETCH_RETRIES),
+            deadline=EnvReader.get_float('FETCH_DEADLINE', FETCH_DEADLINE),
+            backoff_base=EnvReader.get_float('FETCH_BACKOFF_BASE', FETCH_BACKOFF_BASE),
+            backoff_max=EnvReader.get_float('FETCH_BACKOFF_MAX', FETCH_BACKOFF_MAX)
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Makes a random delay before the next attempt
+
+        Args:
+            attempt: Number of the attempt, that failed (0 for the first one)
+        Returns:
+            Seconds to wait"""
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def is_transient(status: int) -> bool:
+        """Tells, if request, that got this status, should be retried
+
+        Args:
+            status: HTTP-status
+        Returns:
+            True, if failure may not happen next time"""
+
+        return status in TRANSIENT_STATUSES
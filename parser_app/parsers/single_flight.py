@@ -0,0 +1,72 @@
+"""Collapsing of concurrent loads of the same page"""
+
+
+import asyncio
+
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Collapses concurrent loads of the same key into one: the first caller (leader) loads it, while others, that ask
+    for the same key before the load is finished, wait for the leader and get its result. Keys are forgotten as soon
+    as the load is finished, so nothing is cached.
+
+    Must be used in one event loop. If leader is cancelled, one of waiting callers loads the key itself.
+
+    Attributes:
+        _in_flight: Results of loads, that are not finished yet, by their keys
+        _stats: Counters of loads and callers, that got leader's result"""
+
+    def __init__(self):
+        """Init"""
+
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._stats: dict[str, int] = {
+            'loads': 0,
+            'collapsed': 0
+        }
+
+    async def do(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Loads a key, unless it is already being loaded
+
+        Args:
+            key: Key of the load (e.g. URL)
+            load: Function, that makes a coroutine to load the key
+        Returns:
+            Result of the load (the same object for all callers, so it must not be changed)"""
+
+        while key in self._in_flight:
+            future = self._in_flight[key]
+            self._stats['collapsed'] += 1
+            try:
+                # Shield keeps leader's load running, if this caller is cancelled
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self._stats['loads'] += 1
+        try:
+            result = await load()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Marks exception as retrieved, in case nobody was waiting for it
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> dict[str, int]:
+        """Reports, how many loads were collapsed
+
+        Returns:
+            Counters of loads and of callers, that got leader's result"""
+
+        return dict(self._stats)
@@ -0,0 +1,67 @@
+"""Backends, that build BeautifulSoup-objects from HTML in different ways"""
+
+
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+class SoupBackend:
+    """Builds BeautifulSoup-objects with a specific tree-builder, from a whole document or only from its parts
+
+    Attributes:
+        features: Name of a tree-builder for BeautifulSoup ('html.parser' or 'lxml')
+        restricted: True to build soup only from tags, that match a strainer, provided by an extractor"""
+
+    def __init__(self, features: str, restricted: bool):
+        """Init
+
+        Args:
+            features: Name of a tree-builder for BeautifulSoup ('html.parser' or 'lxml')
+            restricted: True to build soup only from tags, that match a strainer, provided by an extractor"""
+
+        self.features: str = features
+        self.restricted: bool = restricted
+
+    def make_soup(self, html: str, strainer: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Builds soup from HTML
+
+        Args:
+            html: Loaded HTML-page
+            strainer: Tags, that are needed by an extractor. Ignored, if this backend is not restricted
+        Returns:
+            Soup object (BS)"""
+
+        if self.restricted and strainer is not None:
+            return BeautifulSoup(html, self.features, parse_only=strainer)
+
+        return BeautifulSoup(html, self.features)
+
+
+class SoupBackendFactory:
+    """Factory that can select a backend to build soup
+
+    Attributes:
+        __backends: Collection with registered backends"""
+
+    __backends = {
+            'html.parser': SoupBackend('html.parser', restricted=False),
+            'lxml': SoupBackend('lxml', restricted=False),
+            'strainer': SoupBackend('html.parser', restricted=True),
+            'lxml-strainer': SoupBackend('lxml', restricted=True)
+        }
+
+    @staticmethod
+    def get_backend(backend_name: str) -> SoupBackend | LookupError:
+        """Selects a backend
+
+        Args:
+            backend_name: String, representing required backend
+        Returns:
+            Selected backend or LookupError, in case there is no requested backend"""
+
+        selected_backend = SoupBackendFactory.__backends.get(backend_name, None)
+        if not selected_backend:
+            selected_backend = LookupError(f'Extraction backend "{backend_name}" does not exist!')
+
+        return selected_backend
@@ -0,0 +1,118 @@
+"""Shared fixtures: settings from .env, a migrated SQLite-DB, that tests work on copies of, and a PostgreSQL-DB, given by
+PARSER_TEST_PG_DSN (tests, that need it, are skipped without it)"""
+
+
+import os
+import subprocess
+import sys
+
+from pathlib import Path
+
+import pytest
+
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+from parser_app.utils.env_setter import EnvSetter
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+"""Root of the repository"""
+
+MIGRATE_SCRIPT = '''
+import sys
+import django
+from django.conf import settings
+from django.core.management import call_command
+settings.DATABASES['default']['NAME'] = sys.argv[1]
+django.setup()
+call_command('migrate', verbosity=0)
+'''
+"""Applies db_manager's migrations to a DB, which file (or name, for PostgreSQL) is given as an argument (settings are
+not changed on disk)"""
+
+PG_DSN_ENV = 'PARSER_TEST_PG_DSN'
+"""Env. variable with connection string of a PostgreSQL-DB for tests, e.g. 'host=localhost dbname=habr_parser_test
+user=postgres'. Its tables are emptied by tests"""
+
+EnvSetter.set_envs(str(REPO_DIR / '.env'))
+
+
+@pytest.fixture(scope='session')
+def migrated_db(tmp_path_factory) -> Path:
+    """SQLite-DB with the same schema, as admin-panel makes (migrations are applied once per test run)"""
+
+    path = tmp_path_factory.mktemp('migrated') / 'db.sqlite3'
+    migrate(str(path), {'DB_TYPE': 'sqlite'})
+
+    return path
+
+
+@pytest.fixture
+def scratch_db(migrated_db: Path) -> ScratchDB:
+    """Empty copy of the migrated DB, removed after the test"""
+
+    db = ScratchDB(migrated_db)
+    db.create()
+    yield db
+    db.remove()
+
+
+@pytest.fixture
+def connector(scratch_db: ScratchDB) -> SQLiteFromFileConnector:
+    """SQLite-connector to the scratch DB, closed after the test"""
+
+    connector = SQLiteFromFileConnector(scratch_db.path)
+    yield connector
+    connector.close()
+
+
+@pytest.fixture(scope='session')
+def pg_dsn() -> str:
+    """Connection string of PostgreSQL-DB with the same schema, as admin-panel makes (migrations are applied once per
+    test run). Tests are skipped, if PARSER_TEST_PG_DSN is not set"""
+
+    dsn = os.getenv(PG_DSN_ENV)
+    if not dsn:
+        pytest.skip(f'{PG_DSN_ENV} is not set')
+    # psycopg is needed only for PostgreSQL
+    from psycopg.conninfo import conninfo_to_dict
+
+    params = conninfo_to_dict(dsn)
+    migrate(params.get('dbname', 'habr_parser'), {
+        'DB_TYPE': 'postgres',
+        'PG_HOST': params.get('host', 'localhost'),
+        'PG_PORT': params.get('port', '5432'),
+        'PG_USER': params.get('user', 'postgres'),
+        'PG_PASSWORD': params.get('password', '')
+    })
+
+    return dsn
+
+
+@pytest.fixture
+def pg_db(pg_dsn: str) -> str:
+    """PostgreSQL-DB without Articles, Habrs and logs
+
+    Returns:
+        Connection string"""
+
+    import psycopg
+
+    with psycopg.connect(pg_dsn) as conn:
+        conn.execute(f'TRUNCATE {os.getenv("LOGS_TABLE")}, {os.getenv("ARTICLES_TABLE")}, {os.getenv("HABS_TABLE")} '
+                     f'RESTART IDENTITY CASCADE')
+
+    return pg_dsn
+
+
+def migrate(name: str, envs: dict[str, str]) -> None:
+    """Applies db_manager's migrations in a separate process, so Django's settings do not leak into tests
+
+    Args:
+        name: Path to SQLite-file or name of PostgreSQL-DB
+        envs: Env. variables, that choose DB (DB_TYPE and connection settings)"""
+
+    subprocess.run([sys.executable, '-c', MIGRATE_SCRIPT, name],
+                   cwd=REPO_DIR / 'parser_console',
+                   env={**os.environ, **envs, 'DJANGO_SETTINGS_MODULE': 'parser_console.settings'},
+                   check=True)
@@ -0,0 +1,120 @@
+"""AsyncConnector commits queued writes together, replays a failed group one by one, runs reads after the writes,
+queued before them, and runs everything queued before it is closed"""
+
+
+import concurrent.futures
+import datetime
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.db_connector.async_connector import AsyncConnector
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+
+
+@pytest.fixture
+def db(connector: SQLiteFromFileConnector) -> AsyncConnector:
+    db = AsyncConnector(connector, group_size=10)
+    db.start()
+    yield db
+    db.close()
+
+
+def hold(db: AsyncConnector) -> threading.Event:
+    """Queues a read, that keeps DB's thread busy, until the returned event is set, so the following calls are queued
+    together"""
+
+    gate = threading.Event()
+    db._submit(gate.wait, (10, ), False)
+
+    return gate
+
+
+def log(text: str) -> dict:
+    return {'table_name': os.getenv('LOGS_TABLE'),
+            'data': [{'parser_name': 'Test', 'log_dt': datetime.datetime.now(), 'log_text': text}]}
+
+
+def fail(connector: SQLiteFromFileConnector) -> None:
+    """Write, that raises"""
+
+    connector._check_cur()
+    connector._cur.execute('INSERT INTO missing_table (id) VALUES (1)')
+
+
+def test_failed_write_does_not_lose_others(db: AsyncConnector, connector: SQLiteFromFileConnector,
+                                          scratch_db: ScratchDB):
+    gate = hold(db)
+    good = [db.write(connector.bulk_insert, log(f'good {number}')) for number in range(4)]
+    bad = db.write(fail, connector)
+    ignored = db.write(connector.bulk_insert, {'table_name': 'missing_table', 'data': [{'id': 1}]})
+    good.append(db.write(connector.bulk_insert, log('good 4')))
+    gate.set()
+    concurrent.futures.wait([*good, bad, ignored], timeout=10)
+
+    assert [future.result() for future in good] == [True] * 5
+    with pytest.raises(sqlite3.OperationalError):
+        bad.result()
+    assert ignored.result() is False
+    # The group is rolled back before it is replayed, so good writes are not doubled
+    assert scratch_db.count(scratch_db.logs_table, "log_text LIKE 'good %'") == 5
+    assert db.stats() == {'reads': 1, 'writes': 7, 'commits': 7}
+
+
+def test_queued_writes_are_committed_together(db: AsyncConnector, connector: SQLiteFromFileConnector,
+                                              scratch_db: ScratchDB):
+    gate = hold(db)
+    futures = [db.write(connector.bulk_insert, log(f'log {number}')) for number in range(25)]
+    gate.set()
+    concurrent.futures.wait(futures, timeout=10)
+
+    assert all(future.result() for future in futures)
+    assert scratch_db.count(scratch_db.logs_table) == 25
+    # 25 writes in groups of up to 10 (the held read may be taken together with the first 9 of them)
+    assert db.stats() == {'reads': 1, 'writes': 25, 'commits': 3}
+
+
+def test_read_sees_writes_queued_before_it(db: AsyncConnector, connector: SQLiteFromFileConnector,
+                                           scratch_db: ScratchDB):
+    habr_id = scratch_db.add_habrs(['https://habr.com/ru/hubs/python/articles/'])[0]
+    urls = [f'https://habr.com/ru/articles/{number}/' for number in range(30)]
+    for number, url in enumerate(urls):
+        db.write(connector.bulk_insert_or_ignore,
+                 {'table_name': scratch_db.articles_table,
+                  'data': [{'url': url, 'parse_this': True, 'header': f'Article {number}', 'habr_id': habr_id}]})
+
+    assert db.call(connector.get_known_article_urls, urls) == set(urls)
+
+
+def test_iterate_loads_items_in_db_thread(db: AsyncConnector, connector: SQLiteFromFileConnector,
+                                          scratch_db: ScratchDB):
+    habr_id = scratch_db.add_habrs(['https://habr.com/ru/hubs/python/articles/'])[0]
+    urls = [f'https://habr.com/ru/articles/{number}/' for number in range(20)]
+    scratch_db.add_articles(urls, habr_id)
+
+    def threads():
+        while True:
+            yield threading.current_thread().name
+
+    chunks = list(db.iterate(db.call(connector.iter_article_urls, 7)))
+    assert [len(chunk) for chunk in chunks] == [7, 7, 6]
+    assert sorted(url for chunk in chunks for url in chunk) == sorted(urls)
+
+    names = db.iterate(threads())
+    assert [next(names) for _ in range(3)] == ['db-connector'] * 3
+
+
+def test_close_runs_queued_calls(connector: SQLiteFromFileConnector, scratch_db: ScratchDB):
+    db = AsyncConnector(connector, group_size=10)
+    db.start()
+    futures = [db.write(connector.bulk_insert, log(f'log {number}')) for number in range(30)]
+    db.close()
+
+    assert all(future.done() and future.result() for future in futures)
+    assert scratch_db.count(scratch_db.logs_table) == 30
+    assert connector._conn is None
+    with pytest.raises(RuntimeError):
+        db.write(connector.bulk_insert, log('late'))
@@ -0,0 +1,69 @@
+"""Buffered sink keeps records, that failed to be saved, but never keeps a record about dropped ones"""
+
+
+import time
+
+from parser_app.logger.buffered_sink import BufferedLogSink
+
+
+class FlakyConnector:
+    """Connector, that fails to save batches, while it is broken, and remembers saved ones"""
+
+    def __init__(self):
+        self.broken = False
+        self.batches = []
+
+    def bulk_insert(self, data: dict) -> bool:
+        if self.broken:
+            return False
+        self.batches.append(data['data'])
+        return True
+
+
+def make_record(i: int) -> dict:
+    return {'parser_name': 'Test', 'log_dt': None, 'log_text': f'message {i}'}
+
+
+def make_sink(connector: FlakyConnector, **kwargs) -> BufferedLogSink:
+    settings = dict(table_name='logs', max_buffer=3, flush_size=100, flush_interval=60, overflow_policy='drop_oldest')
+    settings.update(kwargs)
+    return BufferedLogSink(connector, **settings)
+
+
+def test_dropped_record_is_made_once_after_failed_flushes():
+    connector = FlakyConnector()
+    sink = make_sink(connector)
+    for i in range(5):
+        sink.put(make_record(i))
+
+    connector.broken = True
+    sink.flush()
+    sink.flush()
+
+    assert [record['log_text'] for record in sink._buffer] == ['message 2', 'message 3', 'message 4']
+    assert sink.dropped == 2
+
+    connector.broken = False
+    sink.flush()
+
+    texts = [record['log_text'] for record in connector.batches[-1]]
+    assert texts == ['message 2', 'message 3', 'message 4', '2 log-records were dropped, because log-buffer was full']
+    assert sink.dropped == 0
+    assert not sink._buffer
+
+
+def test_buffer_is_saved_by_flush_due_without_new_records():
+    connector = FlakyConnector()
+    sink = make_sink(connector, flush_interval=0.05)
+    sink.put(make_record(0))
+
+    sink.flush_due()
+    assert not connector.batches
+
+    time.sleep(0.06)
+    sink.flush_due()
+    assert [record['log_text'] for record in connector.batches[0]] == ['message 0']
+
+    time.sleep(0.06)
+    sink.flush_due()
+    assert len(connector.batches) == 1
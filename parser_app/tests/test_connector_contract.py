@@ -0,0 +1,199 @@
+"""Both connectors behave the same way: the same data is read and written, rows are leased to a single worker and data
+version changes only with User's changes. PostgreSQL's cases are skipped without PARSER_TEST_PG_DSN"""
+
+
+import datetime
+import os
+import sqlite3
+import time
+
+from typing import Callable, NamedTuple
+
+import pytest
+
+from parser_app.db_connector.connector_interface import IConnector
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+
+
+LEASE = datetime.timedelta(minutes=5)
+"""Lease duration for workers of the tests"""
+
+
+class Backend(NamedTuple):
+    """Connector and a way to change its DB from the outside, as User does in admin-panel
+
+    Attributes:
+        connector: Connector under test
+        execute: Runs SQL on a separate connection and commits it"""
+
+    connector: IConnector
+    execute: Callable[[str], None]
+
+
+def execute_sqlite(path: str, query: str) -> None:
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            conn.execute(query)
+    finally:
+        conn.close()
+
+
+def execute_postgres(dsn: str, query: str) -> None:
+    import psycopg
+
+    with psycopg.connect(dsn) as conn:
+        conn.execute(query)
+
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def backend(request) -> Backend:
+    if request.param == 'sqlite':
+        path = request.getfixturevalue('scratch_db').path
+        backend = Backend(SQLiteFromFileConnector(path), lambda query: execute_sqlite(path, query))
+    else:
+        dsn = request.getfixturevalue('pg_db')
+        from parser_app.db_connector.postgres.postgres_connector import PostgresConnector
+        backend = Backend(PostgresConnector(dsn), lambda query: execute_postgres(dsn, query))
+
+    yield backend
+    backend.connector.close()
+
+
+def add_habrs(connector: IConnector, count: int, is_active: bool = True) -> dict:
+    assert connector.bulk_insert({'table_name': os.getenv('HABS_TABLE'),
+                                  'data': [{'name': f'Habr {number}',
+                                            'url': f'https://habr.com/ru/hubs/{number}/articles/',
+                                            'last_parsed': None,
+                                            'parse_interval_minutes': 60,
+                                            'is_active': is_active} for number in range(count)]})
+
+    return connector.get_hubs_to_do()
+
+
+def add_articles(connector: IConnector, habr_id: int, numbers: range) -> list[str]:
+    urls = [f'https://habr.com/ru/articles/{number}/' for number in numbers]
+    assert connector.bulk_insert_or_ignore({'table_name': os.getenv('ARTICLES_TABLE'),
+                                            'data': [{'url': url,
+                                                      'date_collected': datetime.datetime.now(),
+                                                      'parse_this': True,
+                                                      'header': f'Article {number}',
+                                                      'habr_id': habr_id} for number, url in zip(numbers, urls)]})
+
+    return urls
+
+
+def claim_all(connector: IConnector, worker_id: str, chunk_size: int = 50) -> list[int]:
+    return [article['article_id']
+            for chunk in connector.iter_articles_to_do(chunk_size, worker_id, LEASE)
+            for article in chunk.values()]
+
+
+def test_active_habrs_are_to_do(backend: Backend):
+    connector = backend.connector
+    add_habrs(connector, 2)
+    backend.execute(f"INSERT INTO {os.getenv('HABS_TABLE')} (name, url, parse_interval_minutes, is_active) "
+                    f"VALUES ('Off', 'https://habr.com/ru/hubs/off/articles/', 60, false)")
+
+    habrs = connector.get_hubs_to_do()
+    assert sorted(habrs) == ['Habr 0', 'Habr 1']
+    assert habrs['Habr 1']['url'] == 'https://habr.com/ru/hubs/1/articles/'
+    assert habrs['Habr 1']['last_parsed'] is None
+    assert habrs['Habr 1']['parse_interval_minutes'] == 60
+
+
+def test_duplicates_are_ignored(backend: Backend):
+    connector = backend.connector
+    habr_id = add_habrs(connector, 1)['Habr 0']['hab_id']
+    urls = add_articles(connector, habr_id, range(3)) + add_articles(connector, habr_id, range(2, 5))
+
+    assert connector.get_known_article_urls(urls + ['https://habr.com/ru/articles/unknown/']) == set(urls)
+    assert len([url for chunk in connector.iter_article_urls(100) for url in chunk]) == 5
+    # Plain insert does not skip them
+    assert connector.bulk_insert({'table_name': os.getenv('HABS_TABLE'),
+                                  'data': [{'name': 'Habr 0', 'url': 'https://habr.com/', 'parse_interval_minutes': 1,
+                                            'is_active': True}]}) is False
+    assert len(connector.get_hubs_to_do()) == 1
+
+
+def test_article_urls_are_read_in_chunks(backend: Backend):
+    connector = backend.connector
+    habr_id = add_habrs(connector, 1)['Habr 0']['hab_id']
+    urls = add_articles(connector, habr_id, range(25))
+
+    chunks = list(connector.iter_article_urls(10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert [url for chunk in chunks for url in chunk] == urls
+
+
+def test_updates_are_read_back(backend: Backend):
+    connector = backend.connector
+    habr_id = add_habrs(connector, 1)['Habr 0']['hab_id']
+    parsed = datetime.datetime.now().replace(microsecond=0)
+
+    assert connector.bulk_update({'table_name': os.getenv('HABS_TABLE'),
+                                  'rows': [{'where': {'id': habr_id},
+                                            'data': {'last_parsed': parsed, 'last_status': 'Success!'}}]})
+    # SQLite gives DTs as text, scheduler reads both (see HabrScheduler)
+    assert datetime.datetime.fromisoformat(str(connector.get_hubs_to_do()['Habr 0']['last_parsed'])) == parsed
+    assert connector.bulk_update({'table_name': os.getenv('HABS_TABLE'),
+                                  'rows': [{'where': {'id': habr_id}, 'data': {'missing_column': 1}}]}) is False
+
+
+def test_articles_are_leased_to_one_worker(backend: Backend):
+    connector = backend.connector
+    habr_id = add_habrs(connector, 1)['Habr 0']['hab_id']
+    urls = add_articles(connector, habr_id, range(12))
+
+    first_ids = claim_all(connector, 'first', chunk_size=5)
+    assert len(first_ids) == 12
+    assert claim_all(connector, 'second') == []
+    assert connector.get_leased_articles(urls, 'first') == dict(zip(urls, first_ids))
+    assert connector.get_leased_articles(urls, 'second') == {}
+
+    connector.release_articles(first_ids[:3], 'first')
+    assert sorted(claim_all(connector, 'second')) == sorted(first_ids[:3])
+
+    connector.release_leases('first')
+    assert sorted(claim_all(connector, 'second')) == sorted(first_ids[3:])
+
+
+def test_habrs_are_leased_to_one_worker(backend: Backend):
+    connector = backend.connector
+    habrs = add_habrs(connector, 3)
+
+    assert connector.claim_habrs(habrs, 'first', LEASE) == habrs
+    assert connector.claim_habrs(habrs, 'second', LEASE) == {}
+    # Worker keeps its own leases
+    assert connector.claim_habrs(habrs, 'first', LEASE) == habrs
+
+    connector.release_leases('first')
+    assert connector.bulk_update({'table_name': os.getenv('HABS_TABLE'),
+                                  'rows': [{'where': {'id': habrs['Habr 0']['hab_id']},
+                                            'data': {'last_parsed': datetime.datetime.now()}}]})
+    # Habr, that was just parsed, is not parsed again before its interval passes
+    assert sorted(connector.claim_habrs(habrs, 'second', LEASE)) == ['Habr 1', 'Habr 2']
+
+
+def test_data_version_changes_with_users_changes(backend: Backend):
+    connector = backend.connector
+    habrs = add_habrs(connector, 1)
+    urls = add_articles(connector, habrs['Habr 0']['hab_id'], range(3))
+    version = connector.get_data_version()
+
+    # Parsing
+    connector.claim_habrs(habrs, 'worker', LEASE)
+    claim_all(connector, 'worker')
+    add_articles(connector, habrs['Habr 0']['hab_id'], range(3, 5))
+    connector.bulk_update({'table_name': os.getenv('ARTICLES_TABLE'),
+                           'rows': [{'where': {'url': url}, 'data': {'parse_this': False}} for url in urls]})
+    connector.release_leases('worker')
+    time.sleep(0.2)
+    assert connector.get_data_version() == version
+
+    # User marks an article to be parsed again
+    backend.execute(f"UPDATE {os.getenv('ARTICLES_TABLE')} SET parse_this = true WHERE url = '{urls[0]}'")
+    deadline = time.monotonic() + 5
+    while connector.get_data_version() == version and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert connector.get_data_version() != version
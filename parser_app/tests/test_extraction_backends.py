@@ -0,0 +1,61 @@
+"""Restricted and lxml backends must extract the same data, as the whole page parsed with html.parser does"""
+
+
+import pytest
+
+from parser_app.benchmarks.corpus import Corpus
+from parser_app.parsers.articles_parser.a_extractor import ArticleExtractor
+from parser_app.parsers.habs_parser.h_extractor import HabExtractor
+from parser_app.parsers.soup_backends import SoupBackend
+
+
+CORPUS = Corpus.load()
+
+BACKENDS = ('lxml', 'strainer', 'lxml-strainer')
+
+
+@pytest.mark.parametrize('backend_name', BACKENDS)
+@pytest.mark.parametrize('page_name', CORPUS.articles)
+def test_article_extraction_matches_html_parser(page_name: str, backend_name: str):
+    html = CORPUS.articles[page_name]
+
+    expected = ArticleExtractor.extract(html, 'html.parser')
+
+    assert expected['article_text']
+    assert ArticleExtractor.extract(html, backend_name) == expected
+
+
+@pytest.mark.parametrize('backend_name', BACKENDS)
+@pytest.mark.parametrize('page_name', CORPUS.hubs)
+def test_hab_extraction_matches_html_parser(page_name: str, backend_name: str):
+    html = CORPUS.hubs[page_name]
+
+    expected = HabExtractor.extract(html, 'html.parser')
+
+    assert expected
+    assert HabExtractor.extract(html, backend_name) == expected
+
+
+@pytest.mark.parametrize('backend_name', ('strainer', 'lxml-strainer'))
+def test_page_without_author_is_parsed_once(monkeypatch, backend_name: str):
+    html = CORPUS.articles['short_post.html'].replace('tm-user-info__username', 'tm-user-info__deleted')
+    calls = []
+    make_soup = SoupBackend.make_soup
+
+    def counting_make_soup(self, *args, **kwargs):
+        calls.append(args)
+        return make_soup(self, *args, **kwargs)
+
+    monkeypatch.setattr(SoupBackend, 'make_soup', counting_make_soup)
+    record = ArticleExtractor.extract(html, backend_name)
+
+    assert (record['author_link'], record['author_name']) == (None, None)
+    assert record['article_text']
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('backend_name', ('strainer', 'lxml-strainer'))
+def test_page_without_article_is_parsed_whole(backend_name: str):
+    html = CORPUS.articles['short_post.html'].replace('tm-article-presenter__content', 'tm-article-presenter__body')
+
+    assert ArticleExtractor.extract(html, backend_name) == ArticleExtractor.extract(html, 'html.parser')
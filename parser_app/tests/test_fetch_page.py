@@ -0,0 +1,138 @@
+"""Fetching of Habrs' pages from the local stub of habr.com: conditional requests, size cap, deadline, errors"""
+
+
+import asyncio
+
+import pytest
+
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.benchmarks.stub_server import StubProcess
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+from parser_app.logger.standard_logger import STDLogger
+from parser_app.parsers.habs_parser.h_parser import HabsParser
+from parser_app.parsers.http_validators import ValidatorStore
+from parser_app.parsers.retry_policy import RetryPolicy
+
+
+@pytest.fixture(scope='module')
+def stub_url() -> str:
+    stub = StubProcess(hub_pages=1, latency=0, compress=True, etags=True)
+    yield stub.start()
+    stub.stop()
+
+
+@pytest.fixture(scope='module')
+def plain_stub_url() -> str:
+    stub = StubProcess(hub_pages=1, latency=0, compress=False)
+    yield stub.start()
+    stub.stop()
+
+
+@pytest.fixture(scope='module')
+def slow_stub_url() -> str:
+    stub = StubProcess(hub_pages=1, latency=2, compress=True)
+    yield stub.start()
+    stub.stop()
+
+
+def parse_habr(scratch_db: ScratchDB,
+               connector: SQLiteFromFileConnector,
+               url: str,
+               validators: ValidatorStore = None,
+               **settings) -> str:
+    """Parses a Habr once and returns its status"""
+
+    habrs = connector.get_hubs_to_do()
+    if not habrs:
+        scratch_db.add_habrs([url])
+        habrs = connector.get_hubs_to_do()
+
+    logger = STDLogger(connector)
+    parser = HabsParser(habrs, logger, connector, validators=validators)
+    for name, value in settings.items():
+        setattr(parser, name, value)
+    parser.parse()
+    logger.flush()
+
+    return connector._cur.execute(f'SELECT last_status FROM {scratch_db.habs_table}').fetchone()[0]
+
+
+def test_page_is_requested_conditionally_after_it_is_saved(scratch_db, connector, stub_url):
+    url = f'{stub_url}/ru/hubs/1/articles/'
+    validators = ValidatorStore()
+
+    assert parse_habr(scratch_db, connector, url, validators) == 'Success!'
+    assert 'If-None-Match' in validators.get_headers(url)
+    articles = scratch_db.count(scratch_db.articles_table)
+    assert articles > 0
+
+    assert parse_habr(scratch_db, connector, url, validators) == 'Not modified'
+    assert scratch_db.count(scratch_db.articles_table) == articles
+
+
+def test_validators_are_not_kept_if_page_is_not_saved(scratch_db, connector, stub_url, monkeypatch):
+    url = f'{stub_url}/ru/hubs/2/articles/'
+    validators = ValidatorStore()
+
+    monkeypatch.setattr(connector, 'bulk_insert_or_ignore', lambda data: False)
+    parse_habr(scratch_db, connector, url, validators)
+
+    assert validators.get_headers(url) == {}
+
+    # Page is loaded in full next time, so its articles are not lost
+    monkeypatch.undo()
+    assert parse_habr(scratch_db, connector, url, validators) == 'Success!'
+    assert scratch_db.count(scratch_db.articles_table) > 0
+    assert 'If-None-Match' in validators.get_headers(url)
+
+
+@pytest.mark.parametrize('compressed', (True, False))
+def test_too_big_page_is_not_loaded(scratch_db, connector, stub_url, plain_stub_url, compressed: bool):
+    # Compressed page is read chunk by chunk, size of not compressed one is known from Content-Length
+    url = f'{stub_url if compressed else plain_stub_url}/ru/hubs/3/articles/'
+
+    status = parse_habr(scratch_db, connector, url, max_page_size=1000)
+
+    assert status == 'Page is bigger than 1000 bytes'
+    assert scratch_db.count(scratch_db.articles_table) == 0
+
+
+def test_slow_page_is_abandoned_at_deadline(scratch_db, connector, slow_stub_url):
+    url = f'{slow_stub_url}/ru/hubs/4/articles/'
+    policy = RetryPolicy(retries=3, deadline=0.5, backoff_base=0.1, backoff_max=0.1)
+
+    status = parse_habr(scratch_db, connector, url, retry_policy=policy)
+
+    assert status == 'Timeout, page was not loaded in 0.5 seconds'
+    assert scratch_db.count(scratch_db.articles_table) == 0
+
+
+def test_page_that_failed_to_be_extracted_gets_status(scratch_db, connector, plain_stub_url):
+    url = f'{plain_stub_url}/ru/hubs/5/articles/'
+
+    def broken_extractor(html: str) -> None:
+        raise ValueError('Unexpected markup')
+
+    status = parse_habr(scratch_db, connector, url, streaming=True, extractor=broken_extractor)
+
+    assert status == 'Extraction error (ValueError)'
+    assert scratch_db.count(scratch_db.articles_table) == 0
+
+
+def test_cancellation_of_extraction_is_not_swallowed(scratch_db, connector):
+    parser = HabsParser({}, STDLogger(connector), connector)
+
+    def cancelled_extractor(html: str) -> None:
+        raise asyncio.CancelledError
+
+    parser.extractor = cancelled_extractor
+
+    async def extract() -> None:
+        fetched_pages = asyncio.Queue()
+        await fetched_pages.put({'url': 'https://habr.com/ru/hubs/python/articles/', 'html': '<html></html>'})
+        await fetched_pages.put(None)
+        await parser._extract_worker(fetched_pages)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(extract())
+    assert parser._failed == []
@@ -0,0 +1,218 @@
+"""Per-host throttle: token bucket keeps the rate, adaptive limiter follows the server (AIMD), circuit breaker pauses
+a failing host and lets one trial request go after cooldown (another one, if the trial was cancelled)"""
+
+
+import asyncio
+import time
+
+import pytest
+
+from parser_app.parsers.fetch_throttle import AdaptiveLimiter, CircuitBreaker, FetchThrottle, TokenBucket
+
+
+URL = 'https://habr.com/ru/hubs/python/articles/'
+"""URL of the throttled host"""
+
+
+def make_throttle(**settings) -> FetchThrottle:
+    defaults = {'floor': 1, 'ceiling': 1, 'initial': 1, 'rate': 0, 'burst': 1, 'latency_target': 10,
+                'decrease_factor': 0.5, 'failure_threshold': 1, 'cooldown': 0}
+
+    return FetchThrottle(**{**defaults, **settings})
+
+
+def test_trial_cancelled_while_waiting_for_slot_is_given_back():
+    async def run() -> None:
+        throttle = make_throttle()
+        async with throttle.slot(URL) as slot:
+            slot.failed = True
+        _, limiter, _ = throttle._get_host('habr.com')
+        await limiter.acquire()
+
+        assert throttle.allows(URL)
+        assert not throttle.allows(URL)
+
+        async def fetch() -> None:
+            async with throttle.slot(URL):
+                pass
+
+        waiter = asyncio.create_task(fetch())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release(0, False)
+
+        assert waiter.cancelled()
+        assert throttle.allows(URL)
+
+    asyncio.run(run())
+
+
+def test_limiter_grows_additively_and_is_cut_multiplicatively():
+    limiter = AdaptiveLimiter(floor=1, ceiling=4, initial=2, latency_target=10, decrease_factor=0.5)
+
+    async def run() -> None:
+        for _ in range(2):
+            await limiter.acquire()
+            limiter.release(latency=0.1, congested=False)
+
+    asyncio.run(run())
+    # 2 + 1/2 + 1/2.5
+    assert limiter.limit == pytest.approx(2.9)
+
+    limiter.in_flight = 1
+    limiter.release(latency=0.1, congested=True)
+    assert limiter.limit == pytest.approx(1.45)
+
+    # Requests, that failed together, cut limit once
+    limiter.in_flight = 1
+    limiter.release(latency=0.1, congested=True)
+    assert limiter.limit == pytest.approx(1.45)
+
+    # Slow response is a sign of overload too, but limit is not cut below floor
+    limiter._last_decrease = 0.0
+    limiter.in_flight = 1
+    limiter.release(latency=11, congested=False)
+    assert limiter.limit == 1
+
+
+def test_limiter_does_not_grow_above_ceiling():
+    limiter = AdaptiveLimiter(floor=1, ceiling=3, initial=3, latency_target=10, decrease_factor=0.5)
+    limiter.in_flight = 1
+
+    limiter.release(latency=0.1, congested=False)
+
+    assert limiter.limit == 3
+
+
+def test_limiter_lets_waiters_go_as_slots_are_released():
+    async def run() -> None:
+        limiter = AdaptiveLimiter(floor=1, ceiling=1, initial=1, latency_target=10, decrease_factor=0.5)
+        order = []
+
+        async def fetch(number: int) -> None:
+            await limiter.acquire()
+            order.append(number)
+
+        await limiter.acquire()
+        waiters = [asyncio.create_task(fetch(number)) for number in range(3)]
+        await asyncio.sleep(0)
+        assert order == []
+
+        # Cancelled waiter leaves the queue, without taking anyone's slot
+        waiters[0].cancel()
+        await asyncio.sleep(0)
+        limiter.release(latency=0.1, congested=False)
+        await asyncio.sleep(0)
+        assert order == [1]
+
+        limiter.release(latency=0.1, congested=False)
+        await asyncio.sleep(0)
+        assert order == [1, 2]
+
+        assert waiters[0].cancelled()
+        assert limiter.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_slot_of_cancelled_waiter_is_passed_to_the_next_one():
+    async def run() -> None:
+        limiter = AdaptiveLimiter(floor=1, ceiling=1, initial=1, latency_target=10, decrease_factor=0.5)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Slot is given to the first waiter, but it is cancelled before it takes it
+        limiter.release(latency=0.1, congested=False)
+        first.cancel()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert first.cancelled()
+        assert second.done()
+        assert limiter.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_bucket_gives_burst_at_once_and_then_keeps_rate():
+    async def run() -> list[float]:
+        bucket = TokenBucket(rate=20, burst=2)
+        started = time.monotonic()
+        waits = []
+        for _ in range(4):
+            await bucket.acquire()
+            waits.append(time.monotonic() - started)
+
+        return waits
+
+    waits = asyncio.run(run())
+
+    assert waits[1] < 0.02
+    assert waits[2] >= 0.04
+    assert waits[3] >= 0.09
+
+
+def test_paused_bucket_gives_no_tokens():
+    async def run() -> float:
+        bucket = TokenBucket(rate=0, burst=1)
+        await bucket.acquire()
+        bucket.pause(0.2)
+        started = time.monotonic()
+        await bucket.acquire()
+
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.19
+
+
+def test_circuit_opens_after_failures_in_a_row():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+
+    for failed in (True, True, False, True, True):
+        assert breaker.allows()
+        breaker.record(failed)
+    assert breaker.allows()
+    breaker.record(failed=True)
+
+    assert breaker.failures == 3
+    assert not breaker.allows()
+
+
+def test_one_trial_is_allowed_after_cooldown():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0.1)
+    breaker.record(failed=True)
+    assert not breaker.allows()
+
+    time.sleep(0.1)
+    assert breaker.allows()
+    assert not breaker.allows()
+
+    # Failed trial opens circuit for another cooldown
+    breaker.record(failed=True)
+    assert not breaker.allows()
+
+    time.sleep(0.1)
+    assert breaker.allows()
+    breaker.record(failed=False)
+
+    assert breaker.failures == 0
+    assert breaker.allows()
+    assert breaker.allows()
+
+
+def test_host_is_paused_after_failures():
+    async def run() -> None:
+        throttle = make_throttle(failure_threshold=2, cooldown=60)
+        for status in (503, 429):
+            assert throttle.allows(URL)
+            async with throttle.slot(URL) as slot:
+                slot.status = status
+
+        assert not throttle.allows(URL)
+        # Other hosts are not paused
+        assert throttle.allows('https://example.com/')
+
+    asyncio.run(run())
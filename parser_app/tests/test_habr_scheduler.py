@@ -0,0 +1,71 @@
+"""Schedule of Habrs: the earliest Habr is on top of the heap, entries of rescheduled or removed Habrs are skipped,
+when they are popped"""
+
+
+import datetime
+
+from parser_app.controllers.habr_scheduler import HabrScheduler
+
+
+NOW = datetime.datetime(2024, 1, 1, 12, 0)
+"""Current DT of tests"""
+
+
+def make_habr(minutes_ago: int = None, interval: int = 60) -> dict:
+    """Makes Habr's data, as it is loaded from DB (never parsed, if minutes_ago is None)"""
+
+    last_parsed = None if minutes_ago is None else str(NOW - datetime.timedelta(minutes=minutes_ago))
+
+    return {'url': 'https://habr.com/ru/hubs/python/articles/', 'last_parsed': last_parsed,
+            'parse_interval_minutes': interval}
+
+
+def test_habrs_are_due_in_order_of_their_next_parsing():
+    scheduler = HabrScheduler()
+    scheduler.load({'python': make_habr(50), 'go': make_habr(30), 'rust': make_habr(70), 'java': make_habr(10)})
+
+    assert scheduler.next_due() == NOW - datetime.timedelta(minutes=10)
+    assert list(scheduler.pop_due(NOW)) == ['rust']
+    assert scheduler.seconds_until_next(NOW, max_seconds=3600) == 600
+    assert scheduler.seconds_until_next(NOW, max_seconds=60) == 60
+
+    assert list(scheduler.pop_due(NOW + datetime.timedelta(minutes=40))) == ['python', 'go']
+    assert scheduler.next_due() == NOW + datetime.timedelta(minutes=50)
+
+
+def test_rescheduled_habr_is_due_only_at_its_new_time():
+    scheduler = HabrScheduler()
+    scheduler.load({'python': make_habr(50), 'go': make_habr(40)})
+
+    # Habrs are parsed earlier, than they are due (e.g. they were due, when another worker took them)
+    scheduler.reschedule({'python': make_habr(50)}, parsed_at=NOW)
+    scheduler.postpone({'go': make_habr(40)}, due=NOW + datetime.timedelta(minutes=5))
+
+    # Old entries are still in the heap, but are skipped
+    assert len(scheduler._heap) == 4
+    assert scheduler.next_due() == NOW + datetime.timedelta(minutes=5)
+    assert scheduler.pop_due(NOW + datetime.timedelta(minutes=20)) == {'go': make_habr(40)}
+    assert scheduler.pop_due(NOW + datetime.timedelta(minutes=59)) == {}
+    assert list(scheduler.pop_due(NOW + datetime.timedelta(minutes=60))) == ['python']
+    assert scheduler.next_due() is None
+
+
+def test_removed_habr_is_not_scheduled():
+    scheduler = HabrScheduler()
+    scheduler.load({'python': make_habr(60), 'go': make_habr(30)})
+    due = scheduler.pop_due(NOW)
+    assert list(due) == ['python']
+
+    # Habr was turned off in admin-panel, while it was parsed
+    scheduler.load({'go': make_habr(30)})
+    scheduler.reschedule(due, parsed_at=NOW)
+
+    assert scheduler.next_due() == NOW + datetime.timedelta(minutes=30)
+    assert scheduler.pop_due(NOW + datetime.timedelta(days=1)) == {'go': make_habr(30)}
+
+
+def test_new_habr_is_due_right_away():
+    scheduler = HabrScheduler()
+    scheduler.load({'python': make_habr()})
+
+    assert list(scheduler.pop_due(datetime.datetime.now())) == ['python']
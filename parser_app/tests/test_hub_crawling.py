@@ -0,0 +1,92 @@
+"""Crawling of Habrs' pages from the local stub of habr.com: new Habr is crawled up to backfill_max_pages (or up to its
+last page), parsed one stops at the first page without new articles"""
+
+
+import pytest
+
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.benchmarks.stub_server import StubProcess
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+from parser_app.logger.standard_logger import STDLogger
+from parser_app.parsers.habs_parser.h_parser import HabsParser
+from parser_app.utils.constants import HUB_MAX_PAGES
+
+
+HUB_PAGES = 4
+"""Number of pages of each Habr in the stub"""
+
+
+@pytest.fixture(scope='module')
+def stub_url() -> str:
+    stub = StubProcess(hub_pages=HUB_PAGES, latency=0, compress=False)
+    yield stub.start()
+    stub.stop()
+
+
+def crawl(connector: SQLiteFromFileConnector, backfill_max_pages: int) -> None:
+    """Parses all Habrs, that are to do, once"""
+
+    logger = STDLogger(connector)
+    parser = HabsParser(connector.get_hubs_to_do(), logger, connector)
+    parser.backfill_max_pages = backfill_max_pages
+    parser.parse()
+    logger.flush()
+
+
+def count_pages(scratch_db: ScratchDB, hub: int) -> list[int]:
+    """Tells, which pages of a Habr articles were saved from (stub puts '[hub:page]' into articles' headers)"""
+
+    return [page for page in range(1, HUB_PAGES + 2)
+            if scratch_db.count(scratch_db.articles_table, f"header LIKE '[{hub}:{page}]%'")]
+
+
+def test_new_habr_is_crawled_up_to_backfill_max_pages(scratch_db, connector, stub_url):
+    scratch_db.add_habrs([f'{stub_url}/ru/hubs/1/articles/'])
+
+    crawl(connector, backfill_max_pages=2)
+
+    assert count_pages(scratch_db, 1) == [1, 2]
+
+
+def test_crawling_stops_at_the_last_page(scratch_db, connector, stub_url):
+    scratch_db.add_habrs([f'{stub_url}/ru/hubs/2/articles/'])
+
+    crawl(connector, backfill_max_pages=10)
+
+    assert count_pages(scratch_db, 2) == list(range(1, HUB_PAGES + 1))
+    # Missing page only stops crawling, Habr itself was parsed
+    assert connector._cur.execute(f'SELECT last_status FROM {scratch_db.habs_table}').fetchone()[0] == 'Success!'
+
+
+def test_crawling_stops_at_the_first_page_without_new_articles(scratch_db, connector, stub_url):
+    scratch_db.add_habrs([f'{stub_url}/ru/hubs/3/articles/'])
+    crawl(connector, backfill_max_pages=1)
+    articles = scratch_db.count(scratch_db.articles_table)
+
+    # Deeper pages have new articles, but they are not looked for, since the first page has none
+    crawl(connector, backfill_max_pages=HUB_PAGES)
+
+    assert count_pages(scratch_db, 3) == [1]
+    assert scratch_db.count(scratch_db.articles_table) == articles
+
+
+def test_next_page_is_limited_by_the_first_one(connector):
+    parser = HabsParser({}, STDLogger(connector), connector)
+    parser.backfill_max_pages = 2
+    new_habr = {'hab_id': 1, 'url': 'https://habr.com/ru/hubs/python/articles/', 'last_parsed': None}
+    parsed_habr = {'hab_id': 2, 'url': 'https://habr.com/ru/hubs/go/articles/', 'last_parsed': '2024-01-01 00:00:00'}
+
+    parser._add_next_page(new_habr)
+    parser._add_next_page(parsed_habr)
+
+    assert parser._next_pages == {
+        '1:2': {'hab_id': 1, 'hub_url': new_habr['url'], 'url': f'{new_habr["url"]}page2/', 'page': 2, 'max_pages': 2},
+        '2:2': {'hab_id': 2, 'hub_url': parsed_habr['url'], 'url': f'{parsed_habr["url"]}page2/', 'page': 2,
+                'max_pages': HUB_MAX_PAGES},
+    }
+
+    # The last allowed page does not add the next one
+    last_page = parser._next_pages['1:2']
+    parser._next_pages = {}
+    parser._add_next_page(last_page)
+    assert parser._next_pages == {}
@@ -0,0 +1,121 @@
+"""Handoff of new articles from Habrs' parser to Articles' parser through JobFeed: articles are leased to the worker
+and put into the feed, as soon as they are saved, Articles' parser takes them, until the feed is closed"""
+
+
+import asyncio
+import datetime
+
+import pytest
+
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.benchmarks.stub_server import StubProcess
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+from parser_app.logger.standard_logger import STDLogger
+from parser_app.parsers.articles_parser.a_parser import ArticleParser
+from parser_app.parsers.habs_parser.h_parser import HabsParser
+from parser_app.parsers.job_feed import JobFeed
+
+
+LEASE = datetime.timedelta(minutes=5)
+"""Time, fed articles are leased for"""
+
+
+@pytest.fixture(scope='module')
+def stub_url() -> str:
+    stub = StubProcess(hub_pages=1, latency=0, compress=False)
+    yield stub.start()
+    stub.stop()
+
+
+def crawl_habr(connector: SQLiteFromFileConnector, feed: JobFeed) -> dict:
+    """Parses all Habrs, that are to do, closes the feed and takes all its jobs"""
+
+    async def crawl() -> dict:
+        logger = STDLogger(connector)
+        parser = HabsParser(connector.get_hubs_to_do(), logger, connector, article_feed=feed)
+        try:
+            await parser.aparse()
+        finally:
+            feed.close()
+        logger.flush()
+
+        return await feed.get_all()
+
+    return asyncio.run(crawl())
+
+
+def test_every_consumer_gets_jobs_until_feed_is_closed():
+    async def run() -> None:
+        feed = JobFeed('worker-1', LEASE)
+
+        async def consume() -> list[str]:
+            urls = []
+            while (job := await feed.get()) is not None:
+                urls.append(job['url'])
+                await asyncio.sleep(0)
+            return urls
+
+        consumers = [asyncio.create_task(consume()) for _ in range(2)]
+        for number in range(6):
+            feed.put({'url': f'https://habr.com/ru/articles/{number}/'})
+            await asyncio.sleep(0)
+        feed.close()
+        feed.close()
+
+        taken = await asyncio.gather(*consumers)
+        assert sorted(url for urls in taken for url in urls) == [f'https://habr.com/ru/articles/{number}/'
+                                                                 for number in range(6)]
+        assert await feed.get() is None
+
+    asyncio.run(run())
+
+
+def test_saved_articles_are_leased_and_fed(scratch_db, connector, stub_url):
+    scratch_db.add_habrs([f'{stub_url}/ru/hubs/1/articles/'])
+    feed = JobFeed('worker-1', LEASE)
+
+    jobs = crawl_habr(connector, feed)
+
+    rows = connector._cur.execute(f'SELECT url, id, lease_owner FROM {scratch_db.articles_table}').fetchall()
+    assert rows
+    assert {url: job['article_id'] for url, job in jobs.items()} == {url: article_id for url, article_id, _ in rows}
+    assert {lease_owner for _, _, lease_owner in rows} == {'worker-1'}
+
+
+def test_articles_saved_by_another_worker_are_not_fed(scratch_db, connector, stub_url, monkeypatch):
+    scratch_db.add_habrs([f'{stub_url}/ru/hubs/2/articles/'])
+    crawl_habr(connector, JobFeed('worker-1', LEASE))
+    articles = scratch_db.count(scratch_db.articles_table)
+
+    # Another worker saved the same articles after they were checked, so inserts of this one are ignored
+    monkeypatch.setattr(connector, 'get_known_article_urls', lambda urls: set())
+    jobs = crawl_habr(connector, JobFeed('worker-2', LEASE))
+
+    assert jobs == {}
+    assert scratch_db.count(scratch_db.articles_table) == articles
+    assert scratch_db.count(scratch_db.articles_table, "lease_owner = 'worker-2'") == 0
+
+
+def test_articles_parser_takes_jobs_until_feed_is_closed(scratch_db: ScratchDB, connector, stub_url):
+    habr_ids = scratch_db.add_habrs(['https://habr.com/ru/hubs/python/articles/'])
+    urls = [f'{stub_url}/ru/articles/{number}/' for number in range(3)]
+    scratch_db.add_articles(urls, habr_ids[0])
+    # Articles are leased, as Habrs' parser leases them, before they are fed
+    jobs = next(connector.iter_articles_to_do(10, 'worker-1', LEASE))
+    feed = JobFeed('worker-1', LEASE)
+
+    async def run() -> None:
+        logger = STDLogger(connector)
+        parser = ArticleParser({}, logger, connector, job_feed=feed)
+        parsing = asyncio.create_task(parser.aparse())
+        for job in jobs.values():
+            await asyncio.sleep(0.05)
+            feed.put(job)
+        feed.close()
+        await asyncio.wait_for(parsing, 10)
+        logger.flush()
+
+    asyncio.run(run())
+
+    assert len(jobs) == len(urls)
+    assert scratch_db.count(scratch_db.articles_table, "last_status = 'Success!' AND parse_this = 0") == len(urls)
@@ -0,0 +1,66 @@
+"""Indexes of saved articles: a set knows them for sure, a Bloom filter checks 'probably known' ones in DB, so its false
+positives never make a new article look saved"""
+
+
+import pytest
+
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.parsers.known_articles import KnownArticlesBloomFilter, KnownArticlesFactory, KnownArticlesSet
+
+
+SAVED = [f'https://habr.com/ru/articles/{number}/' for number in range(100)]
+"""URLs of articles, that are saved into DB"""
+
+NEW = [f'https://habr.com/ru/articles/{number}/' for number in range(100, 200)]
+"""URLs of articles, that are not saved"""
+
+
+@pytest.fixture
+def saved_db(scratch_db: ScratchDB) -> ScratchDB:
+    habr_ids = scratch_db.add_habrs(['https://habr.com/ru/hubs/python/articles/'])
+    scratch_db.add_articles(SAVED, habr_ids[0])
+    return scratch_db
+
+
+def test_set_finds_only_saved_articles():
+    index = KnownArticlesSet()
+    index.update(SAVED)
+
+    assert index.find_known(SAVED[:10] + NEW[:10]) == set(SAVED[:10])
+    assert len(index) == len(SAVED)
+
+
+def test_bloom_filter_checks_probably_known_articles_in_db(saved_db, connector):
+    # Filter is much smaller, than it should be, so almost every URL is a false positive
+    index = KnownArticlesBloomFilter(connector, capacity=10, false_positive_rate=0.5)
+    index.update(SAVED)
+    false_positives = [url for url in NEW if index._might_contain(url)]
+    assert false_positives
+
+    assert index.find_known(SAVED + NEW) == set(SAVED)
+
+
+def test_bloom_filter_does_not_query_db_for_new_articles(connector, monkeypatch):
+    index = KnownArticlesBloomFilter(connector, capacity=1000, false_positive_rate=0.001)
+    index.update(SAVED)
+    new = [url for url in NEW if not index._might_contain(url)]
+    assert new
+
+    def fail(urls: list[str]) -> set[str]:
+        raise AssertionError('New articles were checked in DB')
+
+    monkeypatch.setattr(connector, 'get_known_article_urls', fail)
+
+    assert index.find_known(new) == set()
+    assert len(index) == len(SAVED)
+
+
+def test_factory_makes_index_with_its_own_settings(connector, monkeypatch):
+    monkeypatch.setenv('KNOWN_ARTICLES_CAPACITY', '1000')
+    monkeypatch.setenv('KNOWN_ARTICLES_FP_RATE', '0.01')
+
+    assert type(KnownArticlesFactory.make_index('set', connector)) is KnownArticlesSet
+    bloom = KnownArticlesFactory.make_index('bloom', connector)
+    assert bloom.connector is connector
+    assert bloom.size == 9585
+    assert isinstance(KnownArticlesFactory.make_index('trie', connector), LookupError)
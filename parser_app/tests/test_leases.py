@@ -0,0 +1,124 @@
+"""Workers in separate processes share one SQLite-file: every article and Habr is leased to a single worker, leases of
+a killed worker expire, released rows are taken by others"""
+
+
+import datetime
+import multiprocessing
+import os
+import signal
+import time
+
+from multiprocessing.synchronize import Event
+from pathlib import Path
+
+import pytest
+
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+
+
+ARTICLES = 300
+"""Number of articles, workers compete for"""
+
+WORKERS = 3
+"""Number of workers' processes"""
+
+
+def claim_all(path: Path, worker_id: str, start: Event, results: multiprocessing.Queue) -> None:
+    """Worker's process: claims Habrs and articles chunk by chunk, until there are none left, and reports their ids"""
+
+    connector = SQLiteFromFileConnector(path)
+    lease = datetime.timedelta(minutes=5)
+    start.wait()
+
+    habrs = connector.claim_habrs(connector.get_hubs_to_do(), worker_id, lease)
+    article_ids = [article['article_id']
+                   for chunk in connector.iter_articles_to_do(7, worker_id, lease)
+                   for article in chunk.values()]
+    results.put((worker_id, sorted(habrs), article_ids))
+    connector.close()
+
+
+def claim_and_hang(path: Path, lease_seconds: float, claimed: multiprocessing.Queue) -> None:
+    """Worker's process: claims the first chunk of articles and hangs, until it is killed"""
+
+    connector = SQLiteFromFileConnector(path)
+    chunk = next(connector.iter_articles_to_do(10, 'doomed', datetime.timedelta(seconds=lease_seconds)))
+    claimed.put([article['article_id'] for article in chunk.values()])
+    time.sleep(3600)
+
+
+def claim_ids(connector: SQLiteFromFileConnector, worker_id: str, lease_seconds: float = 300) -> list[int]:
+    lease = datetime.timedelta(seconds=lease_seconds)
+    return [article['article_id']
+            for chunk in connector.iter_articles_to_do(50, worker_id, lease)
+            for article in chunk.values()]
+
+
+@pytest.fixture(autouse=True)
+def db(scratch_db: ScratchDB) -> ScratchDB:
+    """Scratch DB with Habrs and articles, that every test here competes for"""
+
+    habr_ids = scratch_db.add_habrs([f'https://habr.com/ru/hubs/{number}/articles/' for number in range(10)])
+    scratch_db.add_articles([f'https://habr.com/ru/articles/{number}/' for number in range(ARTICLES)], habr_ids[0])
+    return scratch_db
+
+
+def test_every_row_is_claimed_by_one_worker(db: ScratchDB):
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=claim_all, args=(db.path, f'worker-{number}', start, results))
+                 for number in range(WORKERS)]
+    for process in processes:
+        process.start()
+    start.set()
+
+    reports = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(timeout=60)
+
+    article_ids = [article_id for _, _, ids in reports for article_id in ids]
+    habrs = [habr for _, claimed, _ in reports for habr in claimed]
+    assert len(article_ids) == len(set(article_ids)) == ARTICLES
+    assert len(habrs) == len(set(habrs)) == 10
+    assert db.count(db.articles_table, 'lease_owner IS NULL') == 0
+
+
+def test_lease_of_killed_worker_is_claimed_after_it_expires(db: ScratchDB, connector: SQLiteFromFileConnector):
+    claimed = multiprocessing.Queue()
+    process = multiprocessing.Process(target=claim_and_hang, args=(db.path, 2, claimed))
+    process.start()
+    doomed_ids = claimed.get(timeout=60)
+    os.kill(process.pid, signal.SIGKILL)
+    process.join()
+
+    assert not set(doomed_ids) & set(claim_ids(connector, 'survivor'))
+
+    time.sleep(2.5)
+    assert sorted(claim_ids(connector, 'survivor')) == sorted(doomed_ids)
+
+
+def test_renewed_lease_does_not_expire(connector: SQLiteFromFileConnector):
+    first_ids = claim_ids(connector, 'first', lease_seconds=1)
+    connector.renew_leases('first', datetime.timedelta(minutes=5))
+
+    time.sleep(1.5)
+    assert claim_ids(connector, 'second') == []
+    assert len(first_ids) == ARTICLES
+
+
+def test_released_rows_are_claimed_by_another_worker(connector: SQLiteFromFileConnector):
+    first_ids = claim_ids(connector, 'first')
+    habrs = connector.get_hubs_to_do()
+    assert len(connector.claim_habrs(habrs, 'first', datetime.timedelta(minutes=5))) == 10
+
+    connector.release_articles(first_ids[:20], 'second')
+    assert claim_ids(connector, 'second') == []
+
+    connector.release_articles(first_ids[:20], 'first')
+    assert claim_ids(connector, 'second') == first_ids[:20]
+    assert connector.claim_habrs(habrs, 'second', datetime.timedelta(minutes=5)) == {}
+
+    connector.release_leases('first')
+    assert claim_ids(connector, 'second') == first_ids[20:]
+    assert len(connector.claim_habrs(habrs, 'second', datetime.timedelta(minutes=5))) == 10
@@ -0,0 +1,51 @@
+"""Controller stops everything it started, even if it fails to start, so the next start gets the same port"""
+
+
+import socket
+import threading
+
+import pytest
+
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.controllers.main_controller import MainController
+from parser_app.logger.standard_logger import STDLogger
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_failed_start_stops_what_was_started(scratch_db: ScratchDB, monkeypatch):
+    port = free_port()
+    monkeypatch.setenv('DB_TYPE', 'sqlite')
+    monkeypatch.setenv('DB_FILE_PATH', str(scratch_db.path))
+    monkeypatch.setenv('METRICS_ENABLED', '1')
+    monkeypatch.setenv('METRICS_PORT', str(port))
+    served = []
+
+    def fail(controller: MainController) -> None:
+        served.append(controller.metrics_server._started)
+        raise RuntimeError('Index is not loaded')
+
+    monkeypatch.setattr(MainController, '_get_known_articles', fail)
+
+    for _ in range(2):
+        controller = MainController(3, STDLogger)
+        with pytest.raises(RuntimeError, match='Index is not loaded'):
+            controller.start()
+        assert controller.loop.is_closed()
+
+    assert served == [True, True]
+    assert not [thread for thread in threading.enumerate() if thread.name in ('db-connector', 'metrics-server')]
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', port))
+
+
+def test_start_fails_before_anything_is_started(monkeypatch):
+    monkeypatch.setenv('DB_TYPE', 'unknown')
+    monkeypatch.setenv('METRICS_ENABLED', '0')
+
+    with pytest.raises(LookupError, match='unknown'):
+        MainController(3, STDLogger).start()
@@ -0,0 +1,144 @@
+"""PostgreSQL-connector: logs are saved with COPY, duplicates are skipped with ON CONFLICT, big reads go through a
+server-side cursor, and data version counts only changes of other connections. Skipped without PARSER_TEST_PG_DSN"""
+
+
+import datetime
+import os
+import threading
+import time
+
+import pytest
+
+# psycopg raises ImportError (not ModuleNotFoundError) also when it is installed, but libpq is not
+psycopg = pytest.importorskip('psycopg', exc_type=ImportError)
+
+from parser_app.db_connector.postgres.postgres_connector import PostgresConnector
+from parser_app.tests.test_connector_contract import add_articles, add_habrs, execute_postgres
+
+
+@pytest.fixture
+def connector(pg_db: str) -> PostgresConnector:
+    connector = PostgresConnector(pg_db)
+    yield connector
+    connector.close()
+
+
+def wait_for_version(connector: PostgresConnector, version: int) -> int:
+    """Notifications come asynchronously, so data version is polled for a while, until it differs from the given one"""
+
+    deadline = time.monotonic() + 5
+    while (current := connector.get_data_version()) == version and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    return current
+
+
+def test_logs_are_copied(connector: PostgresConnector, pg_db: str, monkeypatch):
+    copies = []
+    copy = psycopg.Cursor.copy
+
+    def spy(cur: psycopg.Cursor, query: str, *args, **kwargs):
+        copies.append(query)
+        return copy(cur, query, *args, **kwargs)
+
+    monkeypatch.setattr(psycopg.Cursor, 'copy', spy)
+    logged_at = datetime.datetime.now()
+
+    assert connector.bulk_insert({'table_name': os.getenv('LOGS_TABLE'),
+                                  'data': [{'parser_name': 'Test', 'log_dt': logged_at, 'log_text': f'log {number}'}
+                                           for number in range(100)] + [{'parser_name': 'Test', 'log_dt': None,
+                                                                         'log_text': 'Tab\tand\nnew line'}]})
+
+    assert copies == [f"COPY {os.getenv('LOGS_TABLE')} (parser_name, log_dt, log_text) FROM STDIN"]
+    with psycopg.connect(pg_db) as conn:
+        rows = conn.execute(f"SELECT log_dt, log_text FROM {os.getenv('LOGS_TABLE')} ORDER BY id").fetchall()
+    assert len(rows) == 101
+    assert rows[0][0].astimezone().replace(tzinfo=None) == logged_at
+    assert rows[-1] == (None, 'Tab\tand\nnew line')
+
+
+def test_failed_copy_leaves_connection_usable(connector: PostgresConnector):
+    habr_id = add_habrs(connector, 1)['Habr 0']['hab_id']
+
+    assert connector.bulk_insert({'table_name': os.getenv('ARTICLES_TABLE'),
+                                  'data': [{'url': 'https://habr.com/ru/articles/1/', 'header': 'Same',
+                                            'parse_this': True, 'habr_id': habr_id}] * 2}) is False
+    assert connector.get_known_article_urls(['https://habr.com/ru/articles/1/']) == set()
+
+
+def test_conflicting_rows_are_skipped(connector: PostgresConnector, pg_db: str, monkeypatch):
+    habr_id = add_habrs(connector, 1)['Habr 0']['hab_id']
+    add_articles(connector, habr_id, range(3))
+    statements = []
+    executemany = psycopg.Cursor.executemany
+
+    def spy(cur: psycopg.Cursor, query: str, params, **kwargs):
+        statements.append(query)
+        return executemany(cur, query, params, **kwargs)
+
+    monkeypatch.setattr(psycopg.Cursor, 'executemany', spy)
+    add_articles(connector, habr_id, range(2, 6))
+
+    assert statements and all(statement.endswith('ON CONFLICT DO NOTHING') for statement in statements)
+    with psycopg.connect(pg_db) as conn:
+        assert conn.execute(f"SELECT COUNT(*) FROM {os.getenv('ARTICLES_TABLE')}").fetchone()[0] == 6
+
+
+def test_big_reads_use_server_side_cursor(connector: PostgresConnector, pg_db: str):
+    habr_id = add_habrs(connector, 1)['Habr 0']['hab_id']
+    urls = add_articles(connector, habr_id, range(25))
+    chunks = connector.iter_article_urls(10)
+
+    assert next(chunks) == urls[:10]
+    with psycopg.connect(pg_db) as conn:
+        queries = [row[0] for row in conn.execute("SELECT query FROM pg_stat_activity "
+                                                  "WHERE query LIKE '%parser_app_cursor%' AND pid <> pg_backend_pid()")]
+    assert queries and all('FETCH' in query or 'DECLARE' in query for query in queries)
+    # Connector's own connection is free, while the cursor is open
+    assert connector.get_known_article_urls(urls[:1]) == set(urls[:1])
+    assert [url for chunk in chunks for url in chunk] == urls[10:]
+
+
+def test_data_version_counts_only_changes_of_other_connections(connector: PostgresConnector, pg_db: str):
+    habrs = add_habrs(connector, 2)
+    # Changes, made before connector listens, are unknown, so the first call counts as a change
+    version = connector.get_data_version()
+    assert version == 1
+
+    # Connector's own change notifies it too, but is not counted
+    assert connector.bulk_update({'table_name': os.getenv('HABS_TABLE'),
+                                  'rows': [{'where': {'id': habrs['Habr 0']['hab_id']}, 'data': {'is_active': False}}]})
+    time.sleep(0.2)
+    assert connector.get_data_version() == version
+
+    execute_postgres(pg_db, f"UPDATE {os.getenv('HABS_TABLE')} SET is_active = false "
+                            f"WHERE id = {habrs['Habr 1']['hab_id']}")
+    assert wait_for_version(connector, version) == version + 1
+    assert connector.get_data_version() == version + 1
+
+
+def test_idle_worker_is_woken_only_by_other_connections(connector: PostgresConnector, pg_db: str):
+    habrs = add_habrs(connector, 2)
+    version = connector.get_data_version()
+
+    assert connector.bulk_update({'table_name': os.getenv('HABS_TABLE'),
+                                  'rows': [{'where': {'id': habrs['Habr 0']['hab_id']}, 'data': {'is_active': False}}]})
+    started = time.monotonic()
+    connector.wait_for_changes(version, 0.5, 0.1)
+    assert time.monotonic() - started >= 0.5
+    assert connector.get_data_version() == version
+
+    query = f"UPDATE {os.getenv('HABS_TABLE')} SET is_active = false WHERE id = {habrs['Habr 1']['hab_id']}"
+    threading.Timer(0.2, execute_postgres, (pg_db, query)).start()
+    started = time.monotonic()
+    connector.wait_for_changes(version, 10, 0.1)
+    assert time.monotonic() - started < 5
+    assert connector.get_data_version() == version + 1
+
+    # Changes, received before waiting, end it at once
+    execute_postgres(pg_db, query.replace('false', 'true'))
+    time.sleep(0.2)
+    started = time.monotonic()
+    connector.wait_for_changes(version + 1, 10, 0.1)
+    assert time.monotonic() - started < 1
+    assert connector.get_data_version() == version + 2
@@ -0,0 +1,91 @@
+"""Retries of failed requests: delays grow exponentially up to a cap, attempts stop, when retries are exhausted or when
+the next one would start after the page's deadline"""
+
+
+import asyncio
+import random
+import time
+
+import aiohttp
+import pytest
+
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+from parser_app.logger.standard_logger import STDLogger
+from parser_app.parsers.fetch_throttle import FetchThrottle
+from parser_app.parsers.habs_parser.h_parser import HabsParser
+from parser_app.parsers.retry_policy import RetryPolicy
+from parser_app.parsers.single_flight import SingleFlight
+
+
+URL = 'https://habr.com/ru/hubs/python/articles/'
+"""URL of the page, that can not be loaded"""
+
+
+def load_failing_page(connector: SQLiteFromFileConnector,
+                      policy: RetryPolicy,
+                      monkeypatch,
+                      status: int = None) -> tuple[dict, int]:
+    """Loads a page, every attempt to load which fails, and returns job and number of attempts"""
+
+    parser = HabsParser({}, STDLogger(connector), connector)
+    parser.retry_policy = policy
+    parser.throttle = FetchThrottle(floor=1, ceiling=1, initial=1, rate=0, burst=1, latency_target=10,
+                                    decrease_factor=0.5, failure_threshold=100, cooldown=0)
+    parser.single_flight = SingleFlight()
+    attempts = 0
+
+    async def fetch_page(session: aiohttp.ClientSession, job_data: dict) -> None:
+        nonlocal attempts
+        attempts += 1
+        if status is None:
+            raise aiohttp.ClientConnectionError()
+        job_data['status'] = status
+        job_data['error'] = f'HTTP {status}'
+
+    monkeypatch.setattr(parser, 'fetch_page', fetch_page)
+    job = asyncio.run(parser.process_url(None, {'url': URL}))
+
+    return job, attempts
+
+
+@pytest.mark.parametrize('attempt, longest', ((0, 1), (1, 2), (2, 4), (3, 5), (10, 5)))
+def test_backoff_grows_exponentially_up_to_max(monkeypatch, attempt: int, longest: float):
+    policy = RetryPolicy(retries=10, deadline=60, backoff_base=1, backoff_max=5)
+
+    monkeypatch.setattr(random, 'uniform', lambda low, high: high)
+    assert policy.backoff(attempt) == longest
+
+    # Full jitter: any delay from 0 up to the longest one
+    monkeypatch.setattr(random, 'uniform', lambda low, high: low)
+    assert policy.backoff(attempt) == 0
+
+
+def test_failed_request_is_retried_until_retries_are_exhausted(connector, monkeypatch):
+    policy = RetryPolicy(retries=2, deadline=10, backoff_base=0.01, backoff_max=0.01)
+
+    job, attempts = load_failing_page(connector, policy, monkeypatch)
+
+    assert attempts == 3
+    assert job['error'] == 'Connection error (ClientConnectionError)'
+
+
+def test_permanent_failure_is_not_retried(connector, monkeypatch):
+    policy = RetryPolicy(retries=2, deadline=10, backoff_base=0.01, backoff_max=0.01)
+
+    job, attempts = load_failing_page(connector, policy, monkeypatch, status=404)
+
+    assert attempts == 1
+    assert job['error'] == 'HTTP 404'
+
+
+def test_retry_is_not_made_after_deadline(connector, monkeypatch):
+    policy = RetryPolicy(retries=5, deadline=0.5, backoff_base=0.3, backoff_max=0.3)
+    monkeypatch.setattr(random, 'uniform', lambda low, high: high)
+
+    started = time.monotonic()
+    job, attempts = load_failing_page(connector, policy, monkeypatch, status=503)
+
+    # Attempts at 0 and 0.3 seconds, the next one would start at 0.6
+    assert attempts == 2
+    assert time.monotonic() - started < 0.5
+    assert job['error'] == 'HTTP 503'
@@ -0,0 +1,92 @@
+"""Collapsing of concurrent loads: callers of the same key share one load, its result or error, a cancelled leader is
+replaced by one of the waiting callers, and finished loads are not cached"""
+
+
+import asyncio
+
+import pytest
+
+from parser_app.parsers.single_flight import SingleFlight
+
+
+def test_concurrent_loads_of_the_same_key_are_collapsed():
+    async def run() -> None:
+        single_flight = SingleFlight()
+        loads = []
+
+        async def load(key: str) -> str:
+            loads.append(key)
+            await asyncio.sleep(0.05)
+            return f'page of {key}'
+
+        results = await asyncio.gather(*(single_flight.do(key, lambda key=key: load(key))
+                                         for key in ('a', 'a', 'b', 'a')))
+
+        assert results == ['page of a', 'page of a', 'page of b', 'page of a']
+        assert sorted(loads) == ['a', 'b']
+        assert single_flight.stats() == {'loads': 2, 'collapsed': 2}
+
+        # Result is not cached
+        assert await single_flight.do('a', lambda: load('a')) == 'page of a'
+        assert single_flight.stats()['loads'] == 3
+
+    asyncio.run(run())
+
+
+def test_error_of_the_load_is_raised_to_every_caller():
+    async def run() -> None:
+        single_flight = SingleFlight()
+
+        async def load() -> None:
+            await asyncio.sleep(0.05)
+            raise ValueError('Page is broken')
+
+        results = await asyncio.gather(single_flight.do('a', load), single_flight.do('a', load),
+                                       return_exceptions=True)
+
+        assert [type(result) for result in results] == [ValueError, ValueError]
+        assert single_flight.stats() == {'loads': 1, 'collapsed': 1}
+
+    asyncio.run(run())
+
+
+def test_waiting_caller_loads_the_key_if_leader_is_cancelled():
+    async def run() -> None:
+        single_flight = SingleFlight()
+
+        async def load() -> str:
+            await asyncio.sleep(0.05)
+            return 'page'
+
+        leader = asyncio.create_task(single_flight.do('a', load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(single_flight.do('a', load))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == 'page'
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert single_flight.stats() == {'loads': 2, 'collapsed': 1}
+
+    asyncio.run(run())
+
+
+def test_cancelled_follower_does_not_cancel_the_load():
+    async def run() -> None:
+        single_flight = SingleFlight()
+
+        async def load() -> str:
+            await asyncio.sleep(0.05)
+            return 'page'
+
+        leader = asyncio.create_task(single_flight.do('a', load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(single_flight.do('a', load))
+        await asyncio.sleep(0)
+        follower.cancel()
+
+        assert await leader == 'page'
+        assert follower.cancelled()
+
+    asyncio.run(run())
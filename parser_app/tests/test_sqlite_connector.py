@@ -0,0 +1,114 @@
+"""SQLite-connector reconnects only, when its connection is closed, and prints diagnostics once per process"""
+
+
+import datetime
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from parser_app.benchmarks.scratch_db import ScratchDB
+from parser_app.db_connector.sqlite.sqlite_connector import SQLiteFromFileConnector
+
+
+def test_closed_connection_is_recreated(connector: SQLiteFromFileConnector):
+    connector.get_hubs_to_do()
+    connector._conn.close()
+
+    assert connector.get_hubs_to_do() == {}
+
+
+def test_mistake_in_query_is_not_retried(connector: SQLiteFromFileConnector, monkeypatch):
+    reconnects = []
+    monkeypatch.setattr(connector, '_reconnect', lambda: reconnects.append(1))
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        connector._with_reconnect(lambda: connector._cur.execute('SELECT ?', (1, 2)))
+
+    assert not reconnects
+
+
+def test_diagnostics_are_printed_once_per_process(scratch_db: ScratchDB, capsys):
+    SQLiteFromFileConnector._diagnosed_files.discard(str(scratch_db.path))
+    connector = SQLiteFromFileConnector(scratch_db.path)
+
+    connector.get_hubs_to_do()
+    connector._conn.close()
+    connector.get_hubs_to_do()
+    SQLiteFromFileConnector(scratch_db.path).get_hubs_to_do()
+
+    output = capsys.readouterr().out
+    assert output.count('SQLite pragmas in effect') == 1
+    assert output.count('Connection to DB is broken') == 1
+
+
+def test_data_version_changes_only_with_users_changes(connector: SQLiteFromFileConnector, scratch_db: ScratchDB):
+    habr_id = scratch_db.add_habrs(['https://habr.com/ru/hubs/python/articles/'])[0]
+    scratch_db.add_articles(['https://habr.com/ru/articles/1/'], habr_id)
+    version = connector.get_data_version()
+
+    # Parsing: leases, statuses, new articles and logs
+    habrs = connector.get_hubs_to_do()
+    connector.claim_habrs(habrs, 'worker', datetime.timedelta(minutes=5))
+    articles = next(connector.iter_articles_to_do(10, 'worker', datetime.timedelta(minutes=5)))
+    article_id = next(iter(articles.values()))['article_id']
+    connector.bulk_update({'table_name': scratch_db.habs_table,
+                           'rows': [{'where': {'id': habr_id},
+                                     'data': {'last_parsed': datetime.datetime.now(), 'last_status': 'Success!'}}]})
+    connector.bulk_update({'table_name': scratch_db.articles_table,
+                           'rows': [{'where': {'id': article_id}, 'data': {'parse_this': False}}]})
+    connector.bulk_insert_or_ignore({'table_name': scratch_db.articles_table,
+                                     'data': [{'url': 'https://habr.com/ru/articles/2/', 'parse_this': True,
+                                               'header': 'New article', 'habr_id': habr_id}]})
+    connector.bulk_insert({'table_name': scratch_db.logs_table,
+                           'data': [{'parser_name': 'Test', 'log_dt': datetime.datetime.now(), 'log_text': 'log'}]})
+    connector.release_leases('worker')
+
+    assert connector.get_data_version() == version
+
+    # User: turns Habr off, marks article to be parsed again, adds Habr
+    with sqlite3.connect(scratch_db.path) as conn:
+        conn.execute(f'UPDATE {scratch_db.habs_table} SET is_active = 0 WHERE id = ?', (habr_id, ))
+    assert connector.get_data_version() == version + 1
+
+    with sqlite3.connect(scratch_db.path) as conn:
+        conn.execute(f'UPDATE {scratch_db.articles_table} SET parse_this = 1 WHERE id = ?', (article_id, ))
+    assert connector.get_data_version() == version + 2
+
+    with sqlite3.connect(scratch_db.path) as conn:
+        conn.execute(f'INSERT INTO {scratch_db.habs_table} (name, url, parse_interval_minutes, is_active) '
+                     f"VALUES ('Go', 'https://habr.com/ru/hubs/go/articles/', 60, 1)")
+    assert connector.get_data_version() == version + 3
+
+
+def test_data_version_is_unknown_before_migration(connector: SQLiteFromFileConnector, scratch_db: ScratchDB):
+    with sqlite3.connect(scratch_db.path) as conn:
+        conn.execute('DROP TABLE db_manager_changes')
+
+    assert connector.get_data_version() is None
+    assert connector.get_hubs_to_do() == {}
+
+
+def test_wait_for_changes_polls_data_version(connector: SQLiteFromFileConnector, scratch_db: ScratchDB):
+    habr_id = scratch_db.add_habrs(['https://habr.com/ru/hubs/python/articles/'])[0]
+    version = connector.get_data_version()
+
+    started = time.monotonic()
+    connector.wait_for_changes(version, 0.3, 0.1)
+    assert time.monotonic() - started >= 0.3
+
+    def turn_off() -> None:
+        with sqlite3.connect(scratch_db.path) as conn:
+            conn.execute(f'UPDATE {scratch_db.habs_table} SET is_active = 0 WHERE id = ?', (habr_id, ))
+
+    threading.Timer(0.2, turn_off).start()
+    started = time.monotonic()
+    connector.wait_for_changes(version, 10, 0.1)
+    assert time.monotonic() - started < 5
+    assert connector.get_data_version() == version + 1
+
+    # Changes, made before waiting, end it at once
+    started = time.monotonic()
+    connector.wait_for_changes(version, 10, 0.1)
+    assert time.monotonic() - started < 1
@@ -1,4 +1,7 @@
+import datetime
+
 from typing import TypedDict, Any, TypeVar
+
 from parser_app.parsers.pasrser_interface import ParserInterface
 
 
@@ -17,4 +20,41 @@ class InsertIgnoreDict(TypedDict):
     data: dict[str, Any]
 
 
+class UpdateRowDict(TypedDict):
+    """Explains the structure of a dict, that describes one row to update in a bulk update"""
+
+    where: dict[str, Any]
+    data: dict[str, Any]
+
+
+class BulkUpdateDict(TypedDict):
+    """Explains the structure of a dict, to update many rows of a table with connector"""
+
+    table_name: str
+    rows: list[UpdateRowDict]
+
+
+class BulkInsertIgnoreDict(TypedDict):
+    """Explains the structure of a dict, to insert or ignore many rows into a table with connector"""
+
+    table_name: str
+    data: list[dict[str, Any]]
+
+
+class ArticleRecord(TypedDict):
+    """Explains the structure of a dict with data, extracted from Article's HTML-page"""
+
+    publication_dt: datetime.datetime | None
+    author_link: str | None
+    author_name: str | None
+    article_text: str
+
+
+class ArticleLinkRecord(TypedDict):
+    """Explains the structure of a dict with Article's data, extracted from Habr's HTML-page"""
+
+    article_header: str
+    article_url: str
+
+
 PARSER_INTERFACE = TypeVar('PARSER_INTERFACE', bound=ParserInterface)
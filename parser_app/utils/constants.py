@@ -1,5 +1,183 @@
-PARSER_DB_CHECK_INTERVAL = 3
-"""Interval, that will be used by MainController to check DB for updates"""
+PARSER_DB_CHECK_INTERVAL = 30.0
+"""Default number of seconds between two checks of DB for User's changes, while MainController waits for the next Habr.
+Used only with SQLite: PostgreSQL notifies the waiting controller about changes right away"""
 
 ENV_FILE_PATH = '../.env'
 """Path to .env file"""
+
+PARSER_STREAMING = True
+"""Default mode of parsers: True to extract and save pages as soon as they are fetched, False to wait for a whole batch"""
+
+PARSER_QUEUE_SIZE = 20
+"""Default max number of fetched pages, waiting for extraction (in streaming mode). Fetching pauses, when it is full"""
+
+EXTRACTION_WORKERS = 0
+"""Default number of processes, that extract data from HTML. 0 to use all cores"""
+
+EXTRACTION_BACKEND = 'html.parser'
+"""Default backend to build soup from HTML: 'html.parser', 'lxml', 'strainer' or 'lxml-strainer' (see SoupBackendFactory)"""
+
+WRITE_BATCH_SIZE = 20
+"""Default max number of extracted pages, that are saved into DB in one transaction"""
+
+LOG_BUFFER_SIZE = 1000
+"""Default max number of log-records, waiting to be saved into DB"""
+
+LOG_FLUSH_SIZE = 50
+"""Default number of buffered log-records, that triggers saving them into DB"""
+
+LOG_FLUSH_INTERVAL = 5.0
+"""Default number of seconds, after which buffered log-records are saved into DB, even if there are only few of them"""
+
+LOG_OVERFLOW_POLICY = 'drop_oldest'
+"""Default action, when log-buffer is full: 'drop_oldest', 'drop_newest' or 'flush' (see BufferedLogSink)"""
+
+SQLITE_JOURNAL_MODE = 'WAL'
+"""Default journal mode for SQLite. WAL lets admin-panel read and write, while parser writes"""
+
+SQLITE_BUSY_TIMEOUT = 5000
+"""Default number of milliseconds, SQLite-connection waits for a lock, before failing with 'database is locked'"""
+
+SQLITE_SYNCHRONOUS = 'NORMAL'
+"""Default 'synchronous' pragma for SQLite"""
+
+SQLITE_MMAP_SIZE = 268435456
+"""Default number of bytes of SQLite DB-file, that are read through memory-mapping"""
+
+SQLITE_CACHE_SIZE = -65536
+"""Default size of SQLite page-cache (negative value is in KiB)"""
+
+SQLITE_TEMP_STORE = 'MEMORY'
+"""Default place for SQLite temporary tables and indexes"""
+
+ARTICLES_CHUNK_SIZE = 200
+"""Default number of articles, loaded from DB and parsed at once"""
+
+HTTP_LIMIT = 100
+"""Default max number of connections, that HTTP-client keeps open at once (to all hosts)"""
+
+HTTP_LIMIT_PER_HOST = 10
+"""Default max number of connections, that HTTP-client keeps open to a single host"""
+
+HTTP_KEEPALIVE_TIMEOUT = 60.0
+"""Default number of seconds, idle connection is kept open to be reused"""
+
+HTTP_DNS_CACHE_TTL = 300
+"""Default number of seconds, resolved addresses are cached"""
+
+HTTP_CONNECT_TIMEOUT = 10.0
+"""Default number of seconds to wait for a new connection (including waiting for a free one in the pool)"""
+
+HTTP_READ_TIMEOUT = 30.0
+"""Default number of seconds to wait for the next part of a response"""
+
+HTTP_TOTAL_TIMEOUT = 60.0
+"""Default max number of seconds for the whole request"""
+
+MAX_PAGE_SIZE = 10485760
+"""Default max number of bytes of a (decompressed) page. Loading of bigger pages is aborted"""
+
+READ_CHUNK_SIZE = 65536
+"""Number of bytes, read from response at once"""
+
+ACCEPT_ENCODING = 'gzip, deflate'
+"""Compressions, that server is allowed to use for responses (they are decompressed by AIOHttp)"""
+
+FETCH_CONCURRENCY_FLOOR = 1
+"""Default min number of requests in flight to a single host"""
+
+FETCH_CONCURRENCY_CEILING = 10
+"""Default max number of requests in flight to a single host (should not be bigger than HTTP_LIMIT_PER_HOST)"""
+
+FETCH_CONCURRENCY_INITIAL = 5
+"""Default number of requests in flight to a host, parser starts with"""
+
+FETCH_RATE = 10.0
+"""Default max number of requests per second to a single host, 0 for no limit"""
+
+FETCH_BURST = 10
+"""Default max number of requests, that can be sent to a single host at once"""
+
+FETCH_LATENCY_TARGET = 2.0
+"""Default number of seconds. Slower responses are treated as a sign of host's overload"""
+
+FETCH_DECREASE_FACTOR = 0.5
+"""Default factor, number of requests in flight is multiplied by, when host is overloaded"""
+
+FETCH_RETRIES = 2
+"""Default max number of repeated attempts to load a page after a transient failure"""
+
+FETCH_DEADLINE = 60.0
+"""Default number of seconds for all attempts to load a page"""
+
+FETCH_BACKOFF_BASE = 1.0
+"""Default max number of seconds before the first repeated attempt (is doubled for every next one)"""
+
+FETCH_BACKOFF_MAX = 15.0
+"""Default max number of seconds between attempts"""
+
+CIRCUIT_FAILURE_THRESHOLD = 5
+"""Default number of failed requests in a row, after which host is paused"""
+
+CIRCUIT_COOLDOWN = 60.0
+"""Default number of seconds, failing host is paused for"""
+
+HUB_BACKFILL_MAX_PAGES = 10
+"""Default max number of pages, loaded from a Habr, that is parsed for the first time. Later only new pages are loaded:
+crawling stops at the first page, where all articles are already known"""
+
+HUB_MAX_PAGES = 50
+"""Max number of pages, loaded from a Habr in one parsing (Habr does not show more)"""
+
+KNOWN_ARTICLES_INDEX = 'set'
+"""Default type of in-memory index of saved articles: 'set' (exact) or 'bloom' (Bloom filter, takes less memory on big
+archives, but some new articles are checked in DB)"""
+
+KNOWN_ARTICLES_CAPACITY = 1000000
+"""Default number of articles, Bloom filter is sized for"""
+
+KNOWN_ARTICLES_FP_RATE = 0.01
+"""Default share of new articles, that Bloom filter reports as probably saved (they are checked in DB)"""
+
+KNOWN_ARTICLES_CHUNK_SIZE = 10000
+"""Number of URLs, loaded from DB at once, when index of saved articles is filled"""
+
+LEASE_DURATION = 300.0
+"""Default number of seconds, Habrs and articles are leased to a worker for. Lease is renewed, while worker parses them,
+so it expires only if worker stops"""
+
+DB_GROUP_COMMIT_SIZE = 100
+"""Default max number of writes, that are queued at the same time and are committed together by DB's thread"""
+
+PG_HOST = 'localhost'
+"""Default host of PostgreSQL (or a directory with its socket), used with DB_TYPE='postgres'"""
+
+PG_PORT = 5432
+"""Default port of PostgreSQL"""
+
+PG_NAME = 'habr_parser'
+"""Default name of PostgreSQL database"""
+
+PG_USER = 'postgres'
+"""Default user of PostgreSQL"""
+
+PG_PASSWORD = ''
+"""Default password of PostgreSQL user"""
+
+PG_POOL_MIN_SIZE = 1
+"""Default number of connections, that PostgreSQL connector's pool keeps open"""
+
+PG_POOL_MAX_SIZE = 4
+"""Default max number of connections in PostgreSQL connector's pool"""
+
+PG_CURSOR_ITERSIZE = 2000
+"""Default number of rows, that PostgreSQL server-side cursor sends at once"""
+
+METRICS_ENABLED = True
+"""Default switch of metrics: True to collect them and serve them on METRICS_HOST:METRICS_PORT/metrics"""
+
+METRICS_HOST = '127.0.0.1'
+"""Default host, metrics are served on ('0.0.0.0' to let Prometheus scrape them from another machine)"""
+
+METRICS_PORT = 8001
+"""Default port, metrics are served on"""
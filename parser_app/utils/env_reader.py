@@ -0,0 +1,72 @@
+"""Reader for typed environmental variables"""
+
+
+import os
+
+
+class EnvReader:
+    """Reads environmental variables (set by EnvSetter from .env) and converts them into required types"""
+
+    @staticmethod
+    def get_str(name: str, default: str) -> str:
+        """Reads a string variable
+
+        Args:
+            name: Name of the variable
+            default: Value to be used, in case variable is not set or empty
+        Returns:
+            Value of the variable or default"""
+
+        value = os.getenv(name)
+        if value is None or value == '':
+            return default
+
+        return value
+
+    @staticmethod
+    def get_int(name: str, default: int) -> int:
+        """Reads an integer variable
+
+        Args:
+            name: Name of the variable
+            default: Value to be used, in case variable is not set or can not be converted
+        Returns:
+            Value of the variable or default"""
+
+        try:
+            return int(EnvReader.get_str(name, str(default)))
+        except ValueError:
+            print(f'Variable "{name}" is not an integer, using default value {default}')
+            return default
+
+    @staticmethod
+    def get_float(name: str, default: float) -> float:
+        """Reads a float variable
+
+        Args:
+            name: Name of the variable
+            default: Value to be used, in case variable is not set or can not be converted
+        Returns:
+            Value of the variable or default"""
+
+        try:
+            return float(EnvReader.get_str(name, str(default)))
+        except ValueError:
+            print(f'Variable "{name}" is not a number, using default value {default}')
+            return default
+
+    @staticmethod
+    def get_bool(name: str, default: bool) -> bool:
+        """Reads a boolean variable. '1', 'true', 'yes' and 'on' (any case) are treated as True
+
+        Args:
+            name: Name of the variable
+            default: Value to be used, in case variable is not set
+        Returns:
+            Value of the variable or default"""
+
+        value = os.getenv(name)
+        if value is None or value == '':
+            return default
+
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
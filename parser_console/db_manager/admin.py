@@ -1,7 +1,58 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR
+from django.db.models import Case, IntegerField, TextField, Value, When
+from django.utils.safestring import mark_safe
 
+from .article_search import search_articles, highlight
 from .models import Habrs, Articles
 
 
+ADMIN_SEARCH_LIMIT = 200
+"""Max number of best matches, that admin-panel shows for a search"""
+
+
+class SearchChangeList(ChangeList):
+    """List of Articles, that shows best matches of a search first, unless operator sorts it by a column"""
+
+    def get_ordering(self, request, queryset):
+        if 'search_rank' in queryset.query.annotations and ORDER_VAR not in self.params:
+            return ['search_rank', '-pk']
+
+        return super().get_ordering(request, queryset)
+
+
+class ArticlesAdmin(admin.ModelAdmin):
+    """Articles' admin, that searches with full-text index instead of LIKE-scans and shows best matches first, with
+    snippets"""
+
+    list_display = ('__str__', 'search_snippet')
+    search_fields = ('header', 'article_text')
+    search_help_text = 'Слова статьи (слово* – поиск по началу слова)'
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+
+        found = search_articles(search_term, ADMIN_SEARCH_LIMIT)
+        queryset = queryset.filter(pk__in=[article['id'] for article in found]).annotate(
+            search_rank=Case(*[When(pk=article['id'], then=Value(position)) for position, article in enumerate(found)],
+                             default=Value(len(found)),
+                             output_field=IntegerField()),
+            search_highlight=Case(*[When(pk=article['id'], then=Value(highlight(article['snippet'])))
+                                    for article in found],
+                                  default=Value(''),
+                                  output_field=TextField())
+        )
+
+        return queryset, False
+
+    def get_changelist(self, request, **kwargs):
+        return SearchChangeList
+
+    @admin.display(description='Фрагмент')
+    def search_snippet(self, obj):
+        return mark_safe(getattr(obj, 'search_highlight', ''))
+
+
 admin.site.register(Habrs)
-admin.site.register(Articles)
+admin.site.register(Articles, ArticlesAdmin)
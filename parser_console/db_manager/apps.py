@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class DbManagerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'db_manager'
+
+    def ready(self):
+        from .sqlite_pragmas import apply_sqlite_pragmas
+
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='db_manager_sqlite_pragmas')
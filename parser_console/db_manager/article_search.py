@@ -0,0 +1,122 @@
+"""Full-text search over Articles' headers and texts (see migration 0011): FTS5-table in SQLite, tsvector-column in
+PostgreSQL. Results are ranked, header's matches weigh more than text's ones"""
+
+
+import html
+import re
+
+from django.db import connection
+
+
+SNIPPET_START = '\x02'
+"""Marks the start of a matched word in a snippet (replaced with <mark>, after snippet is escaped)"""
+
+SNIPPET_STOP = '\x03'
+"""Marks the end of a matched word in a snippet"""
+
+SNIPPET_WORDS = 24
+"""Max number of words in a snippet"""
+
+SQLITE_SEARCH = (
+    'SELECT a.id, a.header, a.url, a.habr_id, a.author_name, a.article_date, db_manager_articles_fts.rank, '
+    "snippet(db_manager_articles_fts, -1, %s, %s, '…', %s) "
+    'FROM db_manager_articles_fts JOIN db_manager_articles AS a ON a.id = db_manager_articles_fts.rowid '
+    'WHERE db_manager_articles_fts MATCH %s '
+    'ORDER BY db_manager_articles_fts.rank '
+    'LIMIT %s OFFSET %s'
+)
+"""Ranked search in SQLite (rank is bm25 with weights, configured in migration, the lower the better)"""
+
+SQLITE_COUNT = 'SELECT count(*) FROM db_manager_articles_fts WHERE db_manager_articles_fts MATCH %s'
+"""Number of matches in SQLite"""
+
+POSTGRES_SEARCH = (
+    'SELECT a.id, a.header, a.url, a.habr_id, a.author_name, a.article_date, ts_rank(a.search_vector, query) AS rank, '
+    "ts_headline('russian', coalesce(a.article_text, ''), query, %s) "
+    "FROM db_manager_articles AS a, websearch_to_tsquery('russian', %s) AS query "
+    'WHERE a.search_vector @@ query '
+    'ORDER BY rank DESC '
+    'LIMIT %s OFFSET %s'
+)
+"""Ranked search in PostgreSQL (headline is made only for returned rows)"""
+
+POSTGRES_COUNT = "SELECT count(*) FROM db_manager_articles WHERE search_vector @@ websearch_to_tsquery('russian', %s)"
+"""Number of matches in PostgreSQL"""
+
+RESULT_COLUMNS = ('id', 'header', 'url', 'habr_id', 'author_name', 'article_date', 'rank', 'snippet')
+"""Keys of a found Article"""
+
+
+def to_fts5_query(query: str) -> str:
+    """Turns operator's input into FTS5-query: every word is quoted, so punctuation and FTS5's operators in input do not
+    break the query. Words must all be found, word with '*' at the end is searched as a prefix
+
+    Args:
+        query: Input, e.g. 'python async*'
+    Returns:
+        FTS5-query, e.g. '"python" "async"*', empty string, if there are no words"""
+
+    return ' '.join(f'"{word}"{star}' for word, star in re.findall(r'(\w+)(\*?)', query))
+
+
+def search_articles(query: str, limit: int, offset: int = 0) -> list[dict]:
+    """Finds Articles, best matches first
+
+    Args:
+        query: Words to search
+        limit: Max number of Articles to return
+        offset: Number of best matches to skip
+    Returns:
+        Dicts with found Articles, their ranks and snippets (see highlight)"""
+
+    if connection.vendor == 'sqlite':
+        fts5_query = to_fts5_query(query)
+        if not fts5_query:
+            return []
+        sql, params = SQLITE_SEARCH, [SNIPPET_START, SNIPPET_STOP, SNIPPET_WORDS, fts5_query, limit, offset]
+    elif connection.vendor == 'postgresql':
+        options = f'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords={SNIPPET_WORDS}, MinWords=8'
+        sql, params = POSTGRES_SEARCH, [options, query, limit, offset]
+    else:
+        raise LookupError(f'Full-text search is not supported for "{connection.vendor}"')
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [dict(zip(RESULT_COLUMNS, row)) for row in rows]
+
+
+def count_articles(query: str) -> int:
+    """Counts Articles, that match a query
+
+    Args:
+        query: Words to search
+    Returns:
+        Number of matches"""
+
+    if connection.vendor == 'sqlite':
+        fts5_query = to_fts5_query(query)
+        if not fts5_query:
+            return 0
+        sql, params = SQLITE_COUNT, [fts5_query]
+    elif connection.vendor == 'postgresql':
+        sql, params = POSTGRES_COUNT, [query]
+    else:
+        raise LookupError(f'Full-text search is not supported for "{connection.vendor}"')
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+        return cursor.fetchone()[0]
+
+
+def highlight(snippet: str) -> str:
+    """Escapes snippet and wraps matched words into <mark>
+
+    Args:
+        snippet: Snippet, made by search_articles
+    Returns:
+        HTML"""
+
+    return html.escape(snippet or '').replace(SNIPPET_START, '<mark>').replace(SNIPPET_STOP, '</mark>')
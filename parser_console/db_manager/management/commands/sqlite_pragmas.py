@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from db_manager.sqlite_pragmas import get_pragmas, read_sqlite_pragmas
+
+
+class Command(BaseCommand):
+    help = 'Shows SQLite pragmas, that are actually in effect, and compares them with settings.SQLITE_PRAGMAS'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write(f'Database is not SQLite ({connection.vendor}), nothing to check')
+            return
+
+        requested = get_pragmas()
+        in_effect = read_sqlite_pragmas(connection)
+
+        for pragma, value in in_effect.items():
+            expected = requested[pragma]
+            if str(value).upper() == str(expected).upper():
+                self.stdout.write(self.style.SUCCESS(f'{pragma} = {value}'))
+            else:
+                self.stdout.write(self.style.WARNING(f'{pragma} = {value} (requested {expected})'))
@@ -0,0 +1,30 @@
+# Partial covering indexes for queries, that parser_app runs on every DB check
+# (GET_ARTICLE_TO_DO and GET_HUB_TO_DO in parser_app/db_connector/sqlite/queries.py).
+#
+# SQLite uses a partial index only if WHERE of a query contains the same term, as WHERE of the index. That is why
+# indexes are created with raw SQL: conditions here must stay exactly the same as in parser's queries.
+# Columns of the condition are included into indexes, so queries are answered from indexes alone.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_manager', '0005_alter_articles_author_url'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS db_manager_articles_to_do_idx '
+                'ON db_manager_articles (id, habr_id, url, header, parse_this) '
+                'WHERE parse_this = 1',
+            reverse_sql='DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS db_manager_habrs_active_idx '
+                'ON db_manager_habrs (id, name, url, last_parsed, parse_interval_minutes, is_active) '
+                'WHERE is_active = true',
+            reverse_sql='DROP INDEX IF EXISTS db_manager_habrs_active_idx',
+        ),
+    ]
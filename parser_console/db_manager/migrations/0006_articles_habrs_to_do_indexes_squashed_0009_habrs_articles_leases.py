@@ -0,0 +1,119 @@
+# Migrations 0006-0009 in one, with indexes, that PostgreSQL can build.
+#
+# Raw SQL of 0006, 0007 and 0009 compares a boolean with 1, which PostgreSQL rejects, and builds index rows wider than
+# it allows. Those migrations are left as they were applied, and this one replaces them: a DB, where they are already
+# applied, only records this one as applied too, while a new DB runs this one instead of them. SQLite gets exactly the
+# same SQL, as in 0006-0009, PostgreSQL indexes articles to do by id (and lease_expires) only
+# (parser_app/db_connector/postgres/queries.py).
+
+from django.db import migrations, models
+
+from db_manager.vendor_sql import VendorRunSQL
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ('db_manager', '0006_articles_habrs_to_do_indexes'),
+        ('db_manager', '0007_articles_content_hash'),
+        ('db_manager', '0008_articles_url_index'),
+        ('db_manager', '0009_habrs_articles_leases'),
+    ]
+
+    dependencies = [
+        ('db_manager', '0005_alter_articles_author_url'),
+    ]
+
+    operations = [
+        # 0006
+        VendorRunSQL(
+            sql='CREATE INDEX IF NOT EXISTS db_manager_articles_to_do_idx '
+                'ON db_manager_articles (id, habr_id, url, header, parse_this) '
+                'WHERE parse_this = 1',
+            reverse_sql='DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+            vendor_sql={
+                'postgresql': ('CREATE INDEX IF NOT EXISTS db_manager_articles_to_do_idx '
+                               'ON db_manager_articles (id) '
+                               'WHERE parse_this = true',
+                               'DROP INDEX IF EXISTS db_manager_articles_to_do_idx'),
+            },
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS db_manager_habrs_active_idx '
+                'ON db_manager_habrs (id, name, url, last_parsed, parse_interval_minutes, is_active) '
+                'WHERE is_active = true',
+            reverse_sql='DROP INDEX IF EXISTS db_manager_habrs_active_idx',
+        ),
+        # 0007
+        migrations.AddField(
+            model_name='articles',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        VendorRunSQL(
+            sql=['DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+                 'CREATE INDEX db_manager_articles_to_do_idx '
+                 'ON db_manager_articles (id, habr_id, url, header, content_hash, parse_this) '
+                 'WHERE parse_this = 1'],
+            reverse_sql=['DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+                         'CREATE INDEX db_manager_articles_to_do_idx '
+                         'ON db_manager_articles (id, habr_id, url, header, parse_this) '
+                         'WHERE parse_this = 1'],
+            # PostgreSQL's index does not cover other columns
+            vendor_sql={
+                'postgresql': (migrations.RunSQL.noop, migrations.RunSQL.noop),
+            },
+        ),
+        # 0008
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS db_manager_articles_url_idx ON db_manager_articles (url)',
+            reverse_sql='DROP INDEX IF EXISTS db_manager_articles_url_idx',
+        ),
+        # 0009
+        migrations.AddField(
+            model_name='habrs',
+            name='lease_owner',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='habrs',
+            name='lease_expires',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='articles',
+            name='lease_owner',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='articles',
+            name='lease_expires',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        VendorRunSQL(
+            sql=['DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+                 'CREATE INDEX db_manager_articles_to_do_idx '
+                 'ON db_manager_articles (id, habr_id, url, header, content_hash, lease_expires, parse_this) '
+                 'WHERE parse_this = 1'],
+            reverse_sql=['DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+                         'CREATE INDEX db_manager_articles_to_do_idx '
+                         'ON db_manager_articles (id, habr_id, url, header, content_hash, parse_this) '
+                         'WHERE parse_this = 1'],
+            vendor_sql={
+                'postgresql': (['DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+                                'CREATE INDEX db_manager_articles_to_do_idx '
+                                'ON db_manager_articles (id, lease_expires) '
+                                'WHERE parse_this = true'],
+                               ['DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+                                'CREATE INDEX db_manager_articles_to_do_idx '
+                                'ON db_manager_articles (id) '
+                                'WHERE parse_this = true']),
+            },
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS db_manager_articles_lease_idx '
+                'ON db_manager_articles (lease_owner) '
+                'WHERE lease_owner IS NOT NULL',
+            reverse_sql='DROP INDEX IF EXISTS db_manager_articles_lease_idx',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Articles' to-do index (see 0006) is recreated with content_hash, so it still covers parser's queries.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_manager', '0006_articles_habrs_to_do_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articles',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunSQL(
+            sql=['DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+                 'CREATE INDEX db_manager_articles_to_do_idx '
+                 'ON db_manager_articles (id, habr_id, url, header, content_hash, parse_this) '
+                 'WHERE parse_this = 1'],
+            reverse_sql=['DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+                         'CREATE INDEX db_manager_articles_to_do_idx '
+                         'ON db_manager_articles (id, habr_id, url, header, parse_this) '
+                         'WHERE parse_this = 1'],
+        ),
+    ]
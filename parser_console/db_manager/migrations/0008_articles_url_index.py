@@ -0,0 +1,20 @@
+# Index on articles' URLs, so parser can quickly check, which articles, found on a Habr's page, are already saved
+# (GET_KNOWN_ARTICLE_URLS_TEMPLATE in parser_app/db_connector/sqlite/queries.py).
+#
+# Index is created with raw SQL (as in 0006), so the table is not rebuilt and indexes from 0006 and 0007 are kept.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_manager', '0007_articles_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS db_manager_articles_url_idx ON db_manager_articles (url)',
+            reverse_sql='DROP INDEX IF EXISTS db_manager_articles_url_idx',
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Leases, so several parser's workers can share Habrs and articles without parsing the same ones
+# (CLAIM_HABR and CLAIM_ARTICLES_CHUNK in parser_app/db_connector/sqlite/queries.py).
+#
+# Articles' to-do index (see 0006 and 0007) is recreated with lease_expires, so it still covers parser's queries.
+# Leased articles are found with a small partial index, that holds only leased rows.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_manager', '0008_articles_url_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='habrs',
+            name='lease_owner',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='habrs',
+            name='lease_expires',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='articles',
+            name='lease_owner',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='articles',
+            name='lease_expires',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            sql=['DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+                 'CREATE INDEX db_manager_articles_to_do_idx '
+                 'ON db_manager_articles (id, habr_id, url, header, content_hash, lease_expires, parse_this) '
+                 'WHERE parse_this = 1'],
+            reverse_sql=['DROP INDEX IF EXISTS db_manager_articles_to_do_idx',
+                         'CREATE INDEX db_manager_articles_to_do_idx '
+                         'ON db_manager_articles (id, habr_id, url, header, content_hash, parse_this) '
+                         'WHERE parse_this = 1'],
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS db_manager_articles_lease_idx '
+                'ON db_manager_articles (lease_owner) '
+                'WHERE lease_owner IS NOT NULL',
+            reverse_sql='DROP INDEX IF EXISTS db_manager_articles_lease_idx',
+        ),
+    ]
@@ -0,0 +1,40 @@
+# PostgreSQL has no "PRAGMA data_version", so Habrs and articles notify parser's workers about changes instead
+# (get_data_version in parser_app/db_connector/postgres/postgres_connector.py). Worker ignores notifications, sent by
+# its own connection, so only changes of others (admin-panel, other workers) make it reload its schedule.
+#
+# SQLite needs nothing here.
+
+from django.db import migrations
+
+from db_manager.vendor_sql import VendorRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_manager', '0009_habrs_articles_leases'),
+    ]
+
+    operations = [
+        VendorRunSQL(
+            sql=migrations.RunSQL.noop,
+            reverse_sql=migrations.RunSQL.noop,
+            vendor_sql={
+                'postgresql': (['CREATE OR REPLACE FUNCTION db_manager_notify_change() RETURNS trigger AS $$ '
+                                'BEGIN '
+                                "PERFORM pg_notify('db_manager_changes', TG_TABLE_NAME); "
+                                'RETURN NULL; '
+                                'END; '
+                                '$$ LANGUAGE plpgsql',
+                                'CREATE TRIGGER db_manager_habrs_notify_change '
+                                'AFTER INSERT OR UPDATE OR DELETE ON db_manager_habrs '
+                                'FOR EACH STATEMENT EXECUTE FUNCTION db_manager_notify_change()',
+                                'CREATE TRIGGER db_manager_articles_notify_change '
+                                'AFTER INSERT OR UPDATE OR DELETE ON db_manager_articles '
+                                'FOR EACH STATEMENT EXECUTE FUNCTION db_manager_notify_change()'],
+                               ['DROP TRIGGER IF EXISTS db_manager_articles_notify_change ON db_manager_articles',
+                                'DROP TRIGGER IF EXISTS db_manager_habrs_notify_change ON db_manager_habrs',
+                                'DROP FUNCTION IF EXISTS db_manager_notify_change()']),
+            },
+        ),
+    ]
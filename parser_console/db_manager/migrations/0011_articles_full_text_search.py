@@ -0,0 +1,67 @@
+# Full-text index over articles' headers and texts, so admin-panel and search API (db_manager/article_search.py) do not
+# scan the whole table with LIKE.
+#
+# SQLite: FTS5-table with external content (texts are not stored twice), kept in sync by triggers, so neither parser's
+# connectors nor admin-panel need to know about it. Update-trigger fires only when header or text really change, so
+# leases and statuses are updated as fast, as before. Existing articles are indexed by 'rebuild'. Header weighs 10 times
+# more, than text, in ranking. Note: a migration, that rebuilds db_manager_articles (e.g. AlterField), drops triggers,
+# so it must create them again.
+#
+# PostgreSQL: generated tsvector-column (header weighs more, than text) with GIN-index, filled for existing articles,
+# when the column is added.
+
+from django.db import migrations
+
+from db_manager.vendor_sql import VendorRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_manager', '0010_pg_change_notifications'),
+    ]
+
+    operations = [
+        VendorRunSQL(
+            sql=migrations.RunSQL.noop,
+            reverse_sql=migrations.RunSQL.noop,
+            vendor_sql={
+                'sqlite': (["CREATE VIRTUAL TABLE db_manager_articles_fts USING fts5("
+                            "header, article_text, "
+                            "content='db_manager_articles', content_rowid='id', "
+                            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+                            "INSERT INTO db_manager_articles_fts(db_manager_articles_fts, rank) "
+                            "VALUES ('rank', 'bm25(10.0, 1.0)')",
+                            'CREATE TRIGGER db_manager_articles_fts_insert AFTER INSERT ON db_manager_articles BEGIN '
+                            'INSERT INTO db_manager_articles_fts(rowid, header, article_text) '
+                            'VALUES (new.id, new.header, new.article_text); '
+                            'END',
+                            'CREATE TRIGGER db_manager_articles_fts_delete AFTER DELETE ON db_manager_articles BEGIN '
+                            'INSERT INTO db_manager_articles_fts(db_manager_articles_fts, rowid, header, article_text) '
+                            "VALUES ('delete', old.id, old.header, old.article_text); "
+                            'END',
+                            'CREATE TRIGGER db_manager_articles_fts_update '
+                            'AFTER UPDATE OF header, article_text ON db_manager_articles '
+                            'WHEN old.header IS NOT new.header OR old.article_text IS NOT new.article_text BEGIN '
+                            'INSERT INTO db_manager_articles_fts(db_manager_articles_fts, rowid, header, article_text) '
+                            "VALUES ('delete', old.id, old.header, old.article_text); "
+                            'INSERT INTO db_manager_articles_fts(rowid, header, article_text) '
+                            'VALUES (new.id, new.header, new.article_text); '
+                            'END',
+                            "INSERT INTO db_manager_articles_fts(db_manager_articles_fts) VALUES ('rebuild')"],
+                           ['DROP TRIGGER IF EXISTS db_manager_articles_fts_update',
+                            'DROP TRIGGER IF EXISTS db_manager_articles_fts_delete',
+                            'DROP TRIGGER IF EXISTS db_manager_articles_fts_insert',
+                            'DROP TABLE IF EXISTS db_manager_articles_fts']),
+                'postgresql': (['ALTER TABLE db_manager_articles ADD COLUMN search_vector tsvector '
+                                'GENERATED ALWAYS AS ('
+                                "setweight(to_tsvector('russian', coalesce(header, '')), 'A') || "
+                                "setweight(to_tsvector('russian', coalesce(article_text, '')), 'B')"
+                                ') STORED',
+                                'CREATE INDEX db_manager_articles_search_idx ON db_manager_articles '
+                                'USING GIN (search_vector)'],
+                               ['DROP INDEX IF EXISTS db_manager_articles_search_idx',
+                                'ALTER TABLE db_manager_articles DROP COLUMN IF EXISTS search_vector']),
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Parser's workers reload their schedules only when User changes, what and when should be parsed
+# (get_data_version in parser_app/db_connector/sqlite/sqlite_connector.py and postgres/postgres_connector.py).
+#
+# Changes are: Habrs are added or removed, their names, URLs, intervals or On/Off are updated, or an article is marked
+# to be parsed again. Workers themselves never write these columns (they write statuses, parsing DTs and leases), so
+# parsing, done by other workers, and logs do not make workers reload.
+#
+# SQLite: a one-row table with a counter, that triggers increment.
+#
+# PostgreSQL: notifications of 0010 are sent only for these changes.
+#
+# Depends on 0010 only, so full-text search (0011) can be reverted or skipped on its own (see 0013).
+
+from django.db import migrations
+
+from db_manager.vendor_sql import VendorRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_manager', '0010_pg_change_notifications'),
+    ]
+
+    operations = [
+        VendorRunSQL(
+            sql=migrations.RunSQL.noop,
+            reverse_sql=migrations.RunSQL.noop,
+            vendor_sql={
+                'sqlite': (['CREATE TABLE db_manager_changes ('
+                            'id integer NOT NULL PRIMARY KEY CHECK (id = 1), '
+                            'version integer NOT NULL)',
+                            'INSERT INTO db_manager_changes (id, version) VALUES (1, 0)',
+                            'CREATE TRIGGER db_manager_habrs_insert_change AFTER INSERT ON db_manager_habrs BEGIN '
+                            'UPDATE db_manager_changes SET version = version + 1; '
+                            'END',
+                            'CREATE TRIGGER db_manager_habrs_delete_change AFTER DELETE ON db_manager_habrs BEGIN '
+                            'UPDATE db_manager_changes SET version = version + 1; '
+                            'END',
+                            'CREATE TRIGGER db_manager_habrs_update_change '
+                            'AFTER UPDATE OF name, url, parse_interval_minutes, is_active ON db_manager_habrs BEGIN '
+                            'UPDATE db_manager_changes SET version = version + 1; '
+                            'END',
+                            'CREATE TRIGGER db_manager_articles_parse_change '
+                            'AFTER UPDATE OF parse_this ON db_manager_articles '
+                            'WHEN new.parse_this AND NOT old.parse_this BEGIN '
+                            'UPDATE db_manager_changes SET version = version + 1; '
+                            'END'],
+                           ['DROP TRIGGER IF EXISTS db_manager_articles_parse_change',
+                            'DROP TRIGGER IF EXISTS db_manager_habrs_update_change',
+                            'DROP TRIGGER IF EXISTS db_manager_habrs_delete_change',
+                            'DROP TRIGGER IF EXISTS db_manager_habrs_insert_change',
+                            'DROP TABLE IF EXISTS db_manager_changes']),
+                'postgresql': (['DROP TRIGGER IF EXISTS db_manager_articles_notify_change ON db_manager_articles',
+                                'DROP TRIGGER IF EXISTS db_manager_habrs_notify_change ON db_manager_habrs',
+                                'CREATE TRIGGER db_manager_habrs_notify_change '
+                                'AFTER INSERT OR DELETE OR UPDATE OF name, url, parse_interval_minutes, is_active '
+                                'ON db_manager_habrs '
+                                'FOR EACH STATEMENT EXECUTE FUNCTION db_manager_notify_change()',
+                                'CREATE TRIGGER db_manager_articles_notify_change '
+                                'AFTER UPDATE OF parse_this ON db_manager_articles '
+                                'FOR EACH ROW WHEN (new.parse_this AND NOT old.parse_this) '
+                                'EXECUTE FUNCTION db_manager_notify_change()'],
+                               ['DROP TRIGGER IF EXISTS db_manager_articles_notify_change ON db_manager_articles',
+                                'DROP TRIGGER IF EXISTS db_manager_habrs_notify_change ON db_manager_habrs',
+                                'CREATE TRIGGER db_manager_habrs_notify_change '
+                                'AFTER INSERT OR UPDATE OR DELETE ON db_manager_habrs '
+                                'FOR EACH STATEMENT EXECUTE FUNCTION db_manager_notify_change()',
+                                'CREATE TRIGGER db_manager_articles_notify_change '
+                                'AFTER INSERT OR UPDATE OR DELETE ON db_manager_articles '
+                                'FOR EACH STATEMENT EXECUTE FUNCTION db_manager_notify_change()']),
+            },
+        ),
+    ]
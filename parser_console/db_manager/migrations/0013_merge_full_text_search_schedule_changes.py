@@ -0,0 +1,16 @@
+# Joins full-text search (0011) and schedule's changes (0012), that both follow 0010 and do not depend on each other.
+# To go without full-text search (e.g. SQLite is built without FTS5), migrate db_manager to 0012_schedule_changes
+# instead of the latest migration. To remove it later, migrate db_manager to 0010 and then to 0012_schedule_changes.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db_manager', '0011_articles_full_text_search'),
+        ('db_manager', '0012_schedule_changes'),
+    ]
+
+    operations = [
+    ]
@@ -10,7 +10,9 @@ class Habrs(models.Model):
         last_parsed: DateTime, represents last DT when this Habr was parsed
         last_status: Represents last status of last parsing (success/failed)
         parse_interval_minutes: Interval of parsing in minutes
-        is_active: True, if this Habr should be parsed, False to turn it off from parsing"""
+        is_active: True, if this Habr should be parsed, False to turn it off from parsing
+        lease_owner: Id of the parser's worker, that is parsing this Habr now
+        lease_expires: DT, after which another worker can take this Habr, unless lease is renewed"""
 
     name = models.CharField(unique=True, max_length=100, verbose_name='Название Хабра')
     url = models.URLField()
@@ -18,6 +20,8 @@ class Habrs(models.Model):
     last_status = models.CharField(max_length=100, null=True, blank=True, verbose_name='Статус последнего парсинга')
     parse_interval_minutes = models.PositiveIntegerField(default=10, verbose_name='Интервал парсинга (минуты)')
     is_active = models.BooleanField(default=False, verbose_name='On/Off')
+    lease_owner = models.CharField(max_length=100, null=True, blank=True, editable=False)
+    lease_expires = models.DateTimeField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.name
@@ -37,7 +41,10 @@ class Articles(models.Model):
         article_text: Main text for this article
         article_date: Date of the article
         author_name: Name of the author for this article
-        author_url: URL to a page of the author of this article"""
+        author_url: URL to a page of the author of this article
+        content_hash: Fingerprint of article's content at the last parsing, to skip articles, that were not changed
+        lease_owner: Id of the parser's worker, that is parsing this article now
+        lease_expires: DT, after which another worker can take this article, unless lease is renewed"""
 
     habr = models.ForeignKey(Habrs, on_delete=models.CASCADE)
     url = models.URLField()
@@ -51,6 +58,9 @@ class Articles(models.Model):
     article_date = models.DateTimeField(null=True, blank=True, verbose_name='Дата публикации')
     author_name = models.CharField(max_length=100, null=True, blank=True, verbose_name='Автор')
     author_url = models.URLField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    lease_owner = models.CharField(max_length=100, null=True, blank=True, editable=False)
+    lease_expires = models.DateTimeField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.header} - {self.habr}"
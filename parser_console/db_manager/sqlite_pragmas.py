@@ -0,0 +1,68 @@
+"""Applies SQLite connection profile (settings.SQLITE_PRAGMAS) to Django's connections"""
+
+
+from django.conf import settings
+
+
+CHOICES = {
+    'journal_mode': ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'),
+    'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+    'temp_store': ('DEFAULT', 'FILE', 'MEMORY'),
+}
+"""Allowed values for pragmas, that are not numbers"""
+
+
+def get_pragmas() -> dict:
+    """Returns checked profile from settings (pragmas can not be parametrized, so values are checked before they get
+    into SQL)
+
+    Returns:
+        Dict with pragmas and their values"""
+
+    pragmas = {}
+    for pragma, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        if pragma in CHOICES:
+            value = str(value).upper()
+            if value not in CHOICES[pragma]:
+                raise LookupError(f'Value "{value}" is not allowed for SQLite pragma "{pragma}"')
+        else:
+            value = int(value)
+        pragmas[pragma] = value
+
+    return pragmas
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs) -> None:
+    """Applies profile to a new connection. Receiver for 'connection_created' signal
+
+    Args:
+        sender: Connection's class
+        connection: New connection"""
+
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        for pragma, value in get_pragmas().items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+
+
+def read_sqlite_pragmas(connection) -> dict:
+    """Reads pragmas, that are actually in effect for a connection
+
+    Args:
+        connection: Django's connection to SQLite
+    Returns:
+        Dict with pragmas and their values"""
+
+    in_effect = {}
+    with connection.cursor() as cursor:
+        for pragma in get_pragmas():
+            cursor.execute(f'PRAGMA {pragma}')
+            row = cursor.fetchone()
+            value = row[0] if row else None
+            if pragma in CHOICES and isinstance(value, int):
+                value = CHOICES[pragma][value]
+            in_effect[pragma] = value
+
+    return in_effect
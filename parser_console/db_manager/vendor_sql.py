@@ -0,0 +1,43 @@
+"""Raw SQL for migrations, that differs from one database's vendor to another"""
+
+
+from django.db import migrations, router
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """RunSQL, that runs SQL, written for the vendor of migrated database (e.g. partial indexes are written for parser's
+    queries, which differ between SQLite and PostgreSQL). SQL for vendors, that are not listed, is sql/reverse_sql
+
+    Attributes:
+        vendor_sql: Tuples (sql, reverse_sql) by vendors, e.g. {'postgresql': (...)}"""
+
+    def __init__(self, sql, reverse_sql=None, vendor_sql: dict = None, **kwargs):
+        """Init
+
+        Args:
+            sql: SQL for vendors, that are not listed in vendor_sql
+            reverse_sql: Reverse SQL for vendors, that are not listed in vendor_sql
+            vendor_sql: Tuples (sql, reverse_sql) by vendors
+            kwargs: Other arguments of RunSQL"""
+
+        super().__init__(sql, reverse_sql, **kwargs)
+        self.vendor_sql: dict = vendor_sql or {}
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        if self.vendor_sql:
+            kwargs['vendor_sql'] = self.vendor_sql
+
+        return name, args, kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if router.allow_migrate(schema_editor.connection.alias, app_label, **self.hints):
+            sql, _ = self.vendor_sql.get(schema_editor.connection.vendor, (self.sql, self.reverse_sql))
+            self._run_sql(schema_editor, sql)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        sql, reverse_sql = self.vendor_sql.get(schema_editor.connection.vendor, (self.sql, self.reverse_sql))
+        if reverse_sql is None:
+            raise NotImplementedError('You cannot reverse this operation')
+        if router.allow_migrate(schema_editor.connection.alias, app_label, **self.hints):
+            self._run_sql(schema_editor, reverse_sql)
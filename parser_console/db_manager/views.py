@@ -1,3 +1,43 @@
-from django.shortcuts import render
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from .article_search import search_articles, count_articles, highlight
+
+
+SEARCH_DEFAULT_LIMIT = 20
+"""Number of Articles, that search API returns, if limit is not set"""
+
+SEARCH_MAX_LIMIT = 100
+"""Max number of Articles, that search API returns at once"""
+
+
+@require_GET
+def articles_search(request):
+    """Full-text search over Articles: GET /api/articles/search/?q=words&limit=20&offset=0. Best matches go first, each
+    one with a snippet, where matched words are wrapped into <mark>
+
+    Args:
+        request: Request with query in 'q'
+    Returns:
+        JSON with total number of matches and found Articles"""
+
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'error': 'Parameter "q" is required'}, status=400)
+
+    try:
+        limit = min(max(int(request.GET.get('limit', SEARCH_DEFAULT_LIMIT)), 1), SEARCH_MAX_LIMIT)
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except ValueError:
+        return JsonResponse({'error': 'Parameters "limit" and "offset" must be numbers'}, status=400)
+
+    found = search_articles(query, limit, offset)
+    for article in found:
+        article['snippet'] = highlight(article['snippet'])
+
+    return JsonResponse({'query': query,
+                         'total': count_articles(query),
+                         'limit': limit,
+                         'offset': offset,
+                         'results': found},
+                        json_dumps_params={'ensure_ascii': False})
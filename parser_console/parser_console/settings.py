@@ -10,12 +10,28 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
+
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+# Variables from .env, shared with parser_app (repo root in development mode, project root in Docker).
+# Variables, already set in environment, are not overridden. Comments, empty lines and lines without '=' are skipped
+
+for env_file_path in (BASE_DIR.parent / '.env', BASE_DIR / '.env'):
+    if env_file_path.is_file():
+        with open(env_file_path, 'r', encoding='utf-8') as env_file:
+            for line in env_file:
+                line = line.strip()
+                if not line or line.startswith('#') or '=' not in line:
+                    continue
+                name, value = line.split('=', 1)
+                os.environ.setdefault(name.strip(), value.strip().strip("'"))
+
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
 
@@ -78,9 +94,39 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Seconds to wait for a lock, while parser writes
+            'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000')) / 1000,
+        },
     }
 }
 
+# PostgreSQL, the same one parser_app uses with DB_TYPE='postgres'
+if os.getenv('DB_TYPE') == 'postgres':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'HOST': os.getenv('PG_HOST', 'localhost'),
+        'PORT': os.getenv('PG_PORT', '5432'),
+        'NAME': os.getenv('PG_NAME', 'habr_parser'),
+        'USER': os.getenv('PG_USER', 'postgres'),
+        'PASSWORD': os.getenv('PG_PASSWORD', ''),
+        # Connections are kept between requests instead of being opened for each one
+        'CONN_MAX_AGE': int(os.getenv('PG_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+    }
+
+# SQLite connection profile, the same one parser_app uses. Applied to each new connection by db_manager
+# (see db_manager/sqlite_pragmas.py), check it with "python manage.py sqlite_pragmas"
+
+SQLITE_PRAGMAS = {
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000')),
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', '268435456')),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-65536')),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
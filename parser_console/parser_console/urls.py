@@ -2,8 +2,11 @@ from django.contrib import admin
 from django.urls import path, re_path
 from django.views.generic import RedirectView
 
+from db_manager import views
+
 urlpatterns = [
-    path('admin/', admin.site.urls)
+    path('admin/', admin.site.urls),
+    path('api/articles/search/', views.articles_search, name='articles_search')
 ]
 
 